@@ -0,0 +1,72 @@
+# Jules for Hugging Face - Plan Memory Benchmark
+#
+# Compares the memory held by a plan as nested dicts (what json.load returns) with the same plan
+# as slotted plan nodes. Run from the repository root:
+#
+#     python -m benchmarks.plan_memory [--tasks 1000000]
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from jules_hf.core.plan_model import Plan
+
+STATUSES = ("Completed", "Ready", "In Progress", "Blocked")
+
+def synthetic_plan_json(tasks: int, tasks_per_feature: int = 50, features_per_milestone: int = 10,
+                        milestones_per_epic: int = 10) -> str:
+    """
+    Returns the JSON text of a synthetic plan with the given number of tasks.
+    """
+    per_epic = tasks_per_feature * features_per_milestone * milestones_per_epic
+    epics = []
+    for e in range(max(1, -(-tasks // per_epic))):
+        milestones = []
+        for m in range(milestones_per_epic):
+            features = []
+            for f in range(features_per_milestone):
+                base = ((e * milestones_per_epic + m) * features_per_milestone + f) * tasks_per_feature
+                features.append({"id": f"F{e}.{m}.{f}", "description": "Synthetic feature", "tasks": [
+                    {"id": f"T{base + t}", "title": f"Task {base + t}", "status": STATUSES[(base + t) % len(STATUSES)]}
+                    for t in range(tasks_per_feature) if base + t < tasks
+                ]})
+            milestones.append({"id": f"M{e}.{m}", "goal": "Synthetic milestone", "status": "In Progress",
+                               "features": features})
+        epics.append({"id": f"E{e}", "goal": "Synthetic epic", "status": "In Progress", "milestones": milestones})
+    return json.dumps({"project_name": "Benchmark", "epics": epics})
+
+def measure(build):
+    """
+    Returns (result, bytes held by the result, seconds to build it).
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plan memory as dicts and as plan nodes.")
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="number of tasks in the synthetic plan")
+    args = parser.parse_args()
+
+    text = synthetic_plan_json(args.tasks)
+    print(f"Synthetic plan: {args.tasks:,} tasks, {len(text) / 1e6:.1f} MB of JSON")
+
+    plan, dict_bytes, dict_seconds = measure(lambda: json.loads(text))
+    del plan
+    nodes, node_bytes, node_seconds = measure(lambda: Plan.from_dict(json.loads(text)))
+    del nodes
+
+    print(f"{'representation':<16}{'memory':>12}{'per task':>12}{'load time':>12}")
+    for name, held, seconds in (("dicts", dict_bytes, dict_seconds), ("plan nodes", node_bytes, node_seconds)):
+        print(f"{name:<16}{held / 1e6:>10.1f}MB{held / args.tasks:>11.0f}B{seconds:>11.2f}s")
+    print(f"plan nodes use {node_bytes / dict_bytes:.0%} of the memory of dicts")
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,19 @@ class ToolExecutionError(JulesHFError):
 class LLMError(JulesHFError):
     """Raised for errors related to the Large Language Model."""
     pass
+
+class LLMResponseError(LLMError):
+    """Raised when the LLM answers but its output is unusable (malformed JSON or an invalid action)."""
+    pass
+
+class ToolCancelledError(ToolExecutionError):
+    """Raised when a tool call is cancelled before it finishes."""
+    pass
+
+class ToolTimeoutError(ToolCancelledError):
+    """Raised when a tool call runs past its deadline."""
+    pass
+
+class ToolBusyError(ToolExecutionError):
+    """Raised when a call that must not wait finds every concurrency slot of its tool taken."""
+    pass
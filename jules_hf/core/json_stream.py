@@ -0,0 +1,126 @@
+# Jules for Hugging Face - Incremental JSON Parsing
+
+import json
+from typing import Optional
+
+class IncrementalJSONObjectParser:
+    """
+    Incrementally scans a streamed JSON object, one chunk at a time.
+
+    The parser tracks just enough structure to know when the top-level object closes
+    and to surface top-level string fields (such as "action") as soon as their value
+    is complete, without waiting for the rest of the document. Any text before the
+    opening brace (e.g. stray whitespace from the model) is ignored.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.complete = False
+
+        self._chunks = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_buffer = []
+        self._pending_key = None
+        self._expecting_key = False
+        self._capture_value = False
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consumes the next chunk of streamed text.
+        Returns True once the top-level object has closed; any trailing text is discarded.
+        """
+        if self.complete or not chunk:
+            return self.complete
+
+        start = 0
+        if not self._started:
+            start = chunk.find("{")
+            if start == -1:
+                return False
+
+        for index in range(start, len(chunk)):
+            if self._consume(chunk[index]):
+                self._chunks.append(chunk[start:index + 1])
+                self.complete = True
+                return True
+
+        self._chunks.append(chunk[start:])
+        return False
+
+    def field(self, name: str) -> Optional[str]:
+        """
+        Returns a completed top-level string field, or None if it has not been seen yet.
+        """
+        return self.fields.get(name)
+
+    @property
+    def text(self) -> str:
+        """
+        The JSON text consumed so far.
+        """
+        return "".join(self._chunks)
+
+    def result(self) -> dict:
+        """
+        Parses the completed object. Raises json.JSONDecodeError if the object is malformed or incomplete.
+        """
+        return json.loads(self.text)
+
+    def _consume(self, char: str) -> bool:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+                self._string_buffer.append(char)
+            elif char == "\\":
+                self._escaped = True
+                self._string_buffer.append(char)
+            elif char == '"':
+                self._in_string = False
+                self._end_string()
+            else:
+                self._string_buffer.append(char)
+            return False
+
+        if char == '"':
+            self._in_string = True
+            self._string_buffer = []
+        elif char in "{[":
+            if not self._started:
+                self._started = True
+                self._expecting_key = True
+            self._depth += 1
+            self._capture_value = False
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                return True
+        elif self._depth == 1:
+            if char == ":":
+                self._capture_value = self._pending_key is not None
+            elif char == ",":
+                self._expecting_key = True
+                self._pending_key = None
+                self._capture_value = False
+        return False
+
+    def _end_string(self):
+        if self._depth != 1:
+            return
+        value = self._decode_string("".join(self._string_buffer))
+        if self._expecting_key:
+            self._pending_key = value
+            self._expecting_key = False
+        elif self._capture_value:
+            self.fields[self._pending_key] = value
+            self._capture_value = False
+
+    @staticmethod
+    def _decode_string(raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            # Leave malformed escapes for the final json.loads to report.
+            return raw
@@ -0,0 +1,310 @@
+# Jules for Hugging Face - LLM Response Cache
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from .config import config
+from .llm_provider import LLMProvider
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+class LLMResponseCache:
+    """
+    A two-level, content-addressed cache for structured LLM responses.
+    Entries live in an in-memory LRU and are persisted as one JSON file per key on disk,
+    so identical prompts are served locally across restarts.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256, ttl_seconds: Optional[float] = 86400,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()  # key -> (stored_at, response)
+        self._disk_index = OrderedDict()  # key -> (stored_at, size), oldest first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan_disk()
+
+    @staticmethod
+    def make_key(model_id: str, prompt: str) -> str:
+        """
+        Returns the content address for a prompt sent to a given model.
+        """
+        digest = hashlib.sha256()
+        digest.update(model_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns a copy of the cached response for a key, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_expired(entry[0]):
+                    self._remove(key)
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+
+            if key in self._disk_index:
+                entry = self._read_entry(key)
+                if entry is not None and not self._is_expired(entry[0]):
+                    self._remember(key, entry[0], entry[1])
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                self._remove(key)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: dict):
+        """
+        Stores a response in memory and on disk, evicting old entries to stay within budget.
+        """
+        stored_at = time.time()
+        try:
+            payload = json.dumps({"stored_at": stored_at, "response": response}, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Response for key '{key}' is not JSON-serializable and will not be cached: {e}")
+            return
+
+        with self._lock:
+            self._remember(key, stored_at, copy.deepcopy(response))
+            try:
+                self._write_entry(key, payload)
+            except OSError as e:
+                logger.warning(f"Failed to persist LLM cache entry '{key}': {e}")
+                return
+
+            size = len(payload.encode("utf-8"))
+            old = self._disk_index.pop(key, None)
+            if old is not None:
+                self._disk_bytes -= old[1]
+            self._disk_index[key] = (stored_at, size)
+            self._disk_bytes += size
+
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+                oldest_key = next(iter(self._disk_index))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        """
+        Removes a single entry from both cache levels.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """
+        Removes every entry from both cache levels.
+        """
+        with self._lock:
+            for key in list(self._disk_index):
+                self._remove(key)
+            self._memory.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and current cache sizes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, response: dict):
+        self._memory[key] = (stored_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _remove(self, key: str):
+        self._memory.pop(key, None)
+        entry = self._disk_index.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove LLM cache entry '{key}': {e}")
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_entry(self, key: str) -> Optional[tuple]:
+        try:
+            with open(self._entry_path(key), "r") as f:
+                data = json.load(f)
+            return data["stored_at"], data["response"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable LLM cache entry '{key}': {e}")
+            return None
+
+    def _write_entry(self, key: str, payload: str):
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _scan_disk(self):
+        """
+        Indexes existing on-disk entries by modification time so size eviction can drop the oldest first.
+        """
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if not item.name.endswith(".json"):
+                    continue
+                stat = item.stat()
+                entries.append((stat.st_mtime, item.name[:-len(".json")], stat.st_size))
+
+        for mtime, key, size in sorted(entries):
+            self._disk_index[key] = (mtime, size)
+            self._disk_bytes += size
+        logger.debug(f"LLM cache loaded {len(self._disk_index)} entries from {self.cache_dir}")
+
+
+class CachingLLMProvider(LLMProvider):
+    """
+    An LLM provider that serves byte-identical prompts from an LLMResponseCache
+    and only delegates misses to the wrapped provider.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: LLMResponseCache, model_id: Optional[str] = None):
+        self.provider = provider
+        self.cache = cache
+        self.model_id = model_id or str(getattr(provider, "model_id", type(provider).__name__))
+        # Cache key of the latest single-prompt response, recorded in session checkpoints.
+        self.last_key = None
+
+    @classmethod
+    def from_config(cls, provider: LLMProvider) -> LLMProvider:
+        """
+        Wraps a provider according to the `llm.cache` configuration section.
+        Returns the provider unchanged when caching is disabled.
+        """
+        cache_config = config.get("llm", {}).get("cache", {})
+        if not cache_config.get("enabled", False):
+            return provider
+
+        cache_dir = os.path.join(config.get("user_data_dir", ".jules_hf"), cache_config.get("directory", "llm_cache"))
+        cache = LLMResponseCache(
+            cache_dir,
+            max_entries=cache_config.get("max_entries", 256),
+            ttl_seconds=cache_config.get("ttl_seconds", 86400),
+            max_disk_bytes=cache_config.get("max_disk_bytes", 64 * 1024 * 1024),
+        )
+        return cls(provider, cache)
+
+    def get_structured_response(self, prompt: str) -> dict:
+        """
+        Returns the cached response for the prompt, calling the wrapped provider on a miss.
+        """
+        key = LLMResponseCache.make_key(self.model_id, prompt)
+        self.last_key = key
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        response = self.provider.get_structured_response(prompt)
+        self.cache.put(key, response)
+        return response
+
+    async def aget_structured_response(self, prompt: str) -> dict:
+        """
+        Asynchronous variant of `get_structured_response`.
+        """
+        key = LLMResponseCache.make_key(self.model_id, prompt)
+        self.last_key = key
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        response = await self.provider.aget_structured_response(prompt)
+        self.cache.put(key, response)
+        return response
+
+    def get_structured_responses(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                                 return_exceptions: bool = False) -> list:
+        """
+        Serves cached prompts locally and sends only the distinct misses to the wrapped provider as one batch.
+        """
+        keys = [LLMResponseCache.make_key(self.model_id, prompt) for prompt in prompts]
+        results = {}
+        misses = {}
+        for key, prompt in zip(keys, prompts):
+            if key in results or key in misses:
+                continue
+            response = self.cache.get(key)
+            if response is None:
+                misses[key] = prompt
+            else:
+                results[key] = response
+
+        if misses:
+            responses = self.provider.get_structured_responses(list(misses.values()), max_concurrency, return_exceptions)
+            for key, response in zip(misses, responses):
+                if not isinstance(response, Exception):
+                    self.cache.put(key, response)
+                results[key] = response
+
+        return [copy.deepcopy(results[key]) if not isinstance(results[key], Exception) else results[key] for key in keys]
+
+    def stream_structured_response(self, prompt: str, action_validator: Optional[Callable[[str], bool]] = None) -> dict:
+        """
+        Streaming variant of `get_structured_response`. Cached responses are checked against
+        `action_validator` like any other response.
+        """
+        key = LLMResponseCache.make_key(self.model_id, prompt)
+        self.last_key = key
+        response = self.cache.get(key)
+        if response is None:
+            response = self.provider.stream_structured_response(prompt, action_validator)
+            self.cache.put(key, response)
+        elif action_validator is not None and isinstance(response, dict) and "action" in response:
+            if not action_validator(response["action"]):
+                self.cache.invalidate(key)
+            self._check_action(response["action"], action_validator)
+        return response
+
+    def invalidate(self, prompt: str):
+        """
+        Drops the cached response for a prompt, e.g. after it failed validation.
+        """
+        self.cache.invalidate(LLMResponseCache.make_key(self.model_id, prompt))
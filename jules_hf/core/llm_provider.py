@@ -1,10 +1,21 @@
 # Jules for Hugging Face - LLM Provider Interface
 
 from abc import ABC, abstractmethod
+import asyncio
 import json
-from huggingface_hub import InferenceClient
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Optional
 from ..core.config import config
-from ..core.exceptions import LLMError
+from ..core.exceptions import LLMError, LLMResponseError
+from ..core.json_stream import IncrementalJSONObjectParser
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+if TYPE_CHECKING:
+    from huggingface_hub import AsyncInferenceClient
+
+DEFAULT_BATCH_CONCURRENCY = 8
 
 class LLMProvider(ABC):
     """
@@ -17,6 +28,64 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def aget_structured_response(self, prompt: str) -> dict:
+        """
+        Asynchronously sends a prompt to the LLM and returns a parsed JSON object.
+        Providers without native async support fall back to running the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_structured_response, prompt)
+
+    def stream_structured_response(self, prompt: str, action_validator: Optional[Callable[[str], bool]] = None) -> dict:
+        """
+        Sends a prompt to the LLM and returns a parsed JSON object, raising LLMError as soon as
+        its "action" field is rejected by `action_validator`.
+        Providers without streaming support validate the action once the full response has arrived.
+        """
+        response = self.get_structured_response(prompt)
+        if action_validator is not None and isinstance(response, dict) and "action" in response:
+            self._check_action(response["action"], action_validator)
+        return response
+
+    def get_structured_responses(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                                 return_exceptions: bool = False) -> list:
+        """
+        Sends several prompts with at most `max_concurrency` in flight and returns the parsed
+        responses in input order. With `return_exceptions`, a failed prompt yields its exception
+        in place of a response instead of failing the whole batch.
+        """
+        if not prompts:
+            return []
+
+        def call(prompt):
+            try:
+                return self.get_structured_response(prompt)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        workers = min(len(prompts), max_concurrency or DEFAULT_BATCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(call, prompts))
+
+    async def aget_structured_responses(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                                        return_exceptions: bool = False) -> list:
+        """
+        Asynchronous variant of `get_structured_responses`.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_BATCH_CONCURRENCY)
+
+        async def call(prompt):
+            async with semaphore:
+                return await self.aget_structured_response(prompt)
+
+        return list(await asyncio.gather(*(call(prompt) for prompt in prompts), return_exceptions=return_exceptions))
+
+    @staticmethod
+    def _check_action(action: str, action_validator: Callable[[str], bool]):
+        if not action_validator(action):
+            raise LLMResponseError(f"LLM chose an invalid action '{action}'.")
+
 class MockLLMProvider(LLMProvider):
     """
     A mock LLM provider for testing purposes.
@@ -33,17 +102,47 @@ class MockLLMProvider(LLMProvider):
         logger.info("--- Mock LLM Prompt ---\\n%s\\n-----------------------", prompt)
         return self.response
 
+    async def aget_structured_response(self, prompt: str) -> dict:
+        """
+        Returns the mock response without blocking the event loop.
+        """
+        return self.get_structured_response(prompt)
+
+    def get_structured_responses(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                                 return_exceptions: bool = False) -> list:
+        """
+        Returns the mock response once per prompt, in order.
+        """
+        responses = []
+        for prompt in prompts:
+            try:
+                responses.append(self.get_structured_response(prompt))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                responses.append(e)
+        return responses
+
 class HuggingFaceLLMProvider(LLMProvider):
     """
     An LLM provider that uses the Hugging Face Inference API.
     """
     def __init__(self):
-        model_id = config.get("llm", {}).get("model_id")
+        llm_config = config.get("llm", {})
+        model_id = llm_config.get("model_id")
         if not model_id:
             raise LLMError("LLM model_id is not specified in the configuration.")
 
+        # huggingface_hub is slow to import, so it is only loaded once a provider is created.
+        from huggingface_hub import InferenceClient
         self.client = InferenceClient()
         self.model_id = model_id
+        self.max_concurrent_requests = llm_config.get("max_concurrent_requests", 16)
+
+        # The async client is created lazily because it is bound to the event loop it first runs on.
+        self._async_client = None
+        self._async_loop = None
+        self._async_semaphore = None
 
     def get_structured_response(self, prompt: str) -> dict:
         """
@@ -55,15 +154,153 @@ class HuggingFaceLLMProvider(LLMProvider):
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
             )
+            return self._parse_response(response)
+
+        except LLMError:
+            raise
+        except json.JSONDecodeError as e:
+            raise LLMResponseError(f"Failed to parse JSON response from LLM: {e}") from e
+        except Exception as e:
+            # General catch for API errors or other issues
+            raise LLMError(f"An error occurred with the Hugging Face API: {e}") from e
+
+    def stream_structured_response(self, prompt: str, action_validator: Optional[Callable[[str], bool]] = None) -> dict:
+        """
+        Streams a completion from the Hugging Face Inference API and parses it incrementally.
+        Generation is cancelled as soon as the "action" field is known to be invalid, and the
+        response is returned as soon as the top-level JSON object closes.
+        """
+        parser = IncrementalJSONObjectParser()
+        stream = None
+        action_checked = action_validator is None
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model_id,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                complete = parser.feed(chunk.choices[0].delta.content or "")
+
+                if not action_checked and parser.field("action") is not None:
+                    action_checked = True
+                    self._check_action(parser.field("action"), action_validator)
 
-            content = response.choices[0].message.content
-            if not content:
-                raise LLMError("LLM returned an empty response.")
+                if complete:
+                    break
 
-            return json.loads(content)
+            if not parser.text:
+                raise LLMResponseError("LLM returned an empty response.")
+            return parser.result()
 
+        except LLMError:
+            raise
         except json.JSONDecodeError as e:
-            raise LLMError(f"Failed to parse JSON response from LLM: {e}") from e
+            raise LLMResponseError(f"Failed to parse JSON response from LLM: {e}") from e
+        except Exception as e:
+            raise LLMError(f"An error occurred with the Hugging Face API: {e}") from e
+        finally:
+            # Closing the stream aborts the HTTP response so no further tokens are generated or billed.
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+    async def aget_structured_response(self, prompt: str) -> dict:
+        """
+        Asynchronously sends a prompt to the Hugging Face Inference API.
+        Requests share one keep-alive connection pool, and at most `max_concurrent_requests` are in flight at once.
+        """
+        client = await self._get_async_client()
+        try:
+            async with self._async_semaphore:
+                response = await client.chat.completions.create(
+                    model=self.model_id,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"},
+                )
+            return self._parse_response(response)
+
+        except LLMError:
+            raise
+        except json.JSONDecodeError as e:
+            raise LLMResponseError(f"Failed to parse JSON response from LLM: {e}") from e
         except Exception as e:
-            # General catch for API errors or other issues
             raise LLMError(f"An error occurred with the Hugging Face API: {e}") from e
+
+    def get_structured_responses(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                                 return_exceptions: bool = False) -> list:
+        """
+        Sends a batch of prompts concurrently over the pooled async client and returns the responses in input order.
+        """
+        if not prompts:
+            return []
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Already inside an event loop: callers there should await aget_structured_responses instead.
+            return super().get_structured_responses(prompts, max_concurrency, return_exceptions)
+
+        async def run_batch():
+            try:
+                return await self.aget_structured_responses(
+                    prompts, max_concurrency or self.max_concurrent_requests, return_exceptions
+                )
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run_batch())
+
+    async def aclose(self):
+        """
+        Closes the pooled async HTTP session, if one was opened.
+        """
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+            self._async_semaphore = None
+
+    async def _get_async_client(self) -> "AsyncInferenceClient":
+        """
+        Returns the async client for the running event loop, creating it on first use.
+        A client left over from another event loop is closed before it is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if self._async_client is not None:
+                await self._close_stale_async_client(self._async_client, self._async_loop)
+            from huggingface_hub import AsyncInferenceClient
+            self._async_client = AsyncInferenceClient()
+            self._async_loop = loop
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._async_client
+
+    @staticmethod
+    async def _close_stale_async_client(client: "AsyncInferenceClient", loop: asyncio.AbstractEventLoop):
+        """
+        Closes a client bound to another event loop: on that loop if it is still running,
+        otherwise on the current one, since its own loop can no longer run the close.
+        """
+        try:
+            if loop.is_running() and not loop.is_closed():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), loop))
+            else:
+                await client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close the async client of a previous event loop: {e}")
+
+    def _parse_response(self, response) -> dict:
+        """
+        Extracts the message content from a chat completion and parses it as JSON.
+        """
+        content = response.choices[0].message.content
+        if not content:
+            raise LLMResponseError("LLM returned an empty response.")
+
+        return json.loads(content)
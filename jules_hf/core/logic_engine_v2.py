@@ -2,15 +2,24 @@
 
 from .llm_provider import LLMProvider
 from .exceptions import LLMError
-import json
+from .prompt_builder import IncrementalPromptBuilder
+from typing import Callable, List, Optional
 
 class LogicEngineV2:
     """
     The second iteration of the core logic engine, designed for production readiness.
     """
 
-    def __init__(self, llm_provider: LLMProvider):
+    VALID_ACTIONS = ("execute_tool", "execute_tools", "ask_user", "complete_task")
+
+    def __init__(self, llm_provider: LLMProvider, stream_responses: bool = False,
+                 parameter_validator: Optional[Callable[[str, dict], List[str]]] = None):
         self.llm_provider = llm_provider
+        # When enabled, responses are parsed while they stream so invalid actions are rejected early.
+        self.stream_responses = stream_responses
+        # Checks tool parameters (e.g. ToolAbstractionLayer.validate_parameters) so bad calls never reach dispatch.
+        self.parameter_validator = parameter_validator
+        self.prompt_builder = IncrementalPromptBuilder()
 
     def get_next_action(self, state: dict) -> dict:
         """
@@ -19,55 +28,144 @@ class LogicEngineV2:
         prompt = self._construct_prompt(state)
 
         try:
-            response = self.llm_provider.get_structured_response(prompt)
+            if self.stream_responses:
+                response = self.llm_provider.stream_structured_response(prompt, self._is_valid_action)
+            else:
+                response = self.llm_provider.get_structured_response(prompt)
         except Exception as e:
             raise LLMError(f"Error getting response from LLM provider: {e}") from e
 
-        if not self._validate_response(response):
-            raise LLMError("Invalid response format from LLM.")
+        errors = self._response_errors(response)
+        if errors:
+            self._discard_cached_response(prompt)
+            raise LLMError(f"Invalid response format from LLM: {'; '.join(errors)}")
+
+        return response
+
+    def get_next_actions(self, states: List[dict], max_concurrency: Optional[int] = None,
+                         return_exceptions: bool = False) -> list:
+        """
+        Evaluates several states in one batch and returns their next actions in input order.
+        With `return_exceptions`, a state whose response fails yields an LLMError in place of an action.
+        """
+        prompts = [self._construct_prompt(state) for state in states]
+
+        try:
+            responses = self.llm_provider.get_structured_responses(prompts, max_concurrency, return_exceptions)
+        except Exception as e:
+            raise LLMError(f"Error getting batched responses from LLM provider: {e}") from e
+
+        actions = []
+        for index, (prompt, response) in enumerate(zip(prompts, responses)):
+            if isinstance(response, Exception):
+                error = LLMError(f"Error getting response from LLM provider for state {index}: {response}")
+                error.__cause__ = response
+                actions.append(error)
+                continue
+
+            errors = self._response_errors(response)
+            if errors:
+                self._discard_cached_response(prompt)
+                error = LLMError(f"Invalid response format from LLM for state {index}: {'; '.join(errors)}")
+                if not return_exceptions:
+                    raise error
+                actions.append(error)
+                continue
+
+            actions.append(response)
+
+        return actions
+
+    async def aget_next_action(self, state: dict) -> dict:
+        """
+        Asynchronous variant of `get_next_action` that does not block the event loop while the LLM responds.
+        """
+        prompt = self._construct_prompt(state)
+
+        try:
+            response = await self.llm_provider.aget_structured_response(prompt)
+        except Exception as e:
+            raise LLMError(f"Error getting response from LLM provider: {e}") from e
+
+        errors = self._response_errors(response)
+        if errors:
+            self._discard_cached_response(prompt)
+            raise LLMError(f"Invalid response format from LLM: {'; '.join(errors)}")
 
         return response
 
     def _construct_prompt(self, state: dict) -> str:
         """
         Constructs a detailed prompt for the LLM based on the current state.
+        Unchanged parts of the prompt are reused from previous turns by the incremental builder.
         """
-        # This is a simplified example. A real implementation would be more sophisticated.
-        prompt = f"""
-You are Jules, a skilled software engineering assistant. Your goal is to complete the following task:
-**Task:** {state.get('current_task', {}).get('title', 'No task specified.')}
+        return self.prompt_builder.build(state)
 
-**Available Tools:**
-{json.dumps(state.get('available_tools', []), indent=2)}
-
-**Conversation History:**
-{json.dumps(state.get('short_term_memory', []), indent=2)}
+    def _discard_cached_response(self, prompt: str):
+        """
+        Ensures a caching provider does not replay a response that failed validation.
+        """
+        invalidate = getattr(self.llm_provider, "invalidate", None)
+        if invalidate is not None:
+            invalidate(prompt)
 
-Based on the task and history, what is the next logical action? Your response must be a single JSON object with one of the following structures:
-1. To execute a tool: {{"action": "execute_tool", "tool_name": "...", "parameters": {{...}}}}
-2. To ask the user a question: {{"action": "ask_user", "question": "..."}}
-3. To complete the task: {{"action": "complete_task", "final_message": "..."}}
-"""
-        return prompt.strip()
+    def _is_valid_action(self, action) -> bool:
+        """
+        Returns True if the action type is one the engine knows how to execute.
+        """
+        return action in self.VALID_ACTIONS
 
     def _validate_response(self, response: dict) -> bool:
         """
         Validates the structure of the LLM's response.
         """
+        return not self._response_errors(response)
+
+    def _response_errors(self, response: dict) -> List[str]:
+        """
+        Returns the reasons a response cannot be executed, or an empty list if it is valid.
+        """
         if not isinstance(response, dict):
-            return False
+            return ["response is not a JSON object"]
 
         action = response.get("action")
-        if action not in ["execute_tool", "ask_user", "complete_task"]:
-            return False
-
-        if action == "execute_tool" and ("tool_name" not in response or "parameters" not in response):
-            return False
+        if not self._is_valid_action(action):
+            return [f"unknown action {action!r}"]
+
+        if action == "execute_tool":
+            if "tool_name" not in response or "parameters" not in response:
+                return ["execute_tool requires 'tool_name' and 'parameters'"]
+            return self._tool_call_errors(response)
+
+        if action == "execute_tools":
+            calls = response.get("tool_calls")
+            if not isinstance(calls, list) or not calls:
+                return ["execute_tools requires a non-empty 'tool_calls' list"]
+            errors = []
+            for index, call in enumerate(calls):
+                if not isinstance(call, dict) or "tool_name" not in call or "parameters" not in call:
+                    errors.append(f"tool_calls[{index}] requires 'tool_name' and 'parameters'")
+                else:
+                    errors.extend(f"tool_calls[{index}]: {error}" for error in self._tool_call_errors(call))
+            return errors
 
         if action == "ask_user" and "question" not in response:
-            return False
+            return ["ask_user requires 'question'"]
 
         if action == "complete_task" and "final_message" not in response:
-            return False
+            return ["complete_task requires 'final_message'"]
 
-        return True
+        return []
+
+    def _tool_call_errors(self, call: dict) -> List[str]:
+        """
+        Returns the reasons a single tool call (its 'tool_name' and 'parameters') cannot be executed.
+        """
+        errors = []
+        if not isinstance(call["tool_name"], str):
+            errors.append(f"'tool_name' must be a string, not {type(call['tool_name']).__name__}")
+        if not isinstance(call["parameters"], dict):
+            errors.append(f"'parameters' must be an object, not {type(call['parameters']).__name__}")
+        if errors or self.parameter_validator is None:
+            return errors
+        return self.parameter_validator(call["tool_name"], call["parameters"])
@@ -0,0 +1,226 @@
+# Jules for Hugging Face - Short-Term Memory
+
+import json
+from collections import deque
+from itertools import islice
+from typing import Optional
+from .config import config
+
+def _entry_size(entry: dict) -> int:
+    return len(json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+def _clip(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} chars truncated]"
+
+class ShortTermMemory:
+    """
+    Bounded conversation memory for the agent loop.
+
+    Recent entries are kept verbatim in a ring-buffer window whose serialized size stays within
+    `max_bytes`. Entries pushed out of the window are folded into a rolling summary of one line per
+    entry, which is itself capped at `summary_max_bytes` by collapsing its oldest lines into a count.
+    Memory use and prompt size therefore stay flat no matter how long the session runs.
+
+    The class behaves like an append-only list of the entries in the window, so existing callers
+    that append, iterate or index `short_term_memory` keep working.
+    """
+
+    def __init__(self, max_bytes: int = 32768, max_observation_chars: int = 4096, summary_max_bytes: int = 2048):
+        self.max_bytes = max_bytes
+        self.max_observation_chars = max_observation_chars
+        self.summary_max_bytes = summary_max_bytes
+
+        self._window = deque()  # (entry, size)
+        self._window_bytes = 0
+        self._summary_lines = deque()
+        self._summary_bytes = 0
+        self._omitted = 0
+
+        # Monotonic counters let consumers such as the prompt builder process only what changed.
+        self.appended_count = 0
+        self.evicted_count = 0
+        self.summary_version = 0
+
+    @classmethod
+    def from_config(cls) -> "ShortTermMemory":
+        """
+        Creates a memory sized according to the `memory` configuration section.
+        """
+        memory_config = config.get("memory", {})
+        return cls(
+            max_bytes=memory_config.get("max_bytes", 32768),
+            max_observation_chars=memory_config.get("max_observation_chars", 4096),
+            summary_max_bytes=memory_config.get("summary_max_bytes", 2048),
+        )
+
+    def append(self, entry: dict):
+        """
+        Adds an entry to the window, truncating oversized observations and evicting old entries as needed.
+        """
+        entry = self._bound_entry(entry)
+        size = _entry_size(entry)
+        self._window.append((entry, size))
+        self._window_bytes += size
+        self.appended_count += 1
+
+        # Always keep the newest entry, even if it alone exceeds the budget.
+        while self._window_bytes > self.max_bytes and len(self._window) > 1:
+            evicted, evicted_size = self._window.popleft()
+            self._window_bytes -= evicted_size
+            self.evicted_count += 1
+            self._add_summary_line(self._summarize(evicted))
+
+    def extend(self, entries):
+        """
+        Appends several entries in order.
+        """
+        for entry in entries:
+            self.append(entry)
+
+    def entries_since(self, position: int) -> list:
+        """
+        Returns the window entries whose absolute append position is at least `position`.
+        """
+        offset = max(position - self.evicted_count, 0)
+        return [entry for entry, _ in islice(self._window, offset, None)]
+
+    @property
+    def summary(self) -> str:
+        """
+        The rolling summary of entries evicted from the window, or an empty string.
+        """
+        if not self._summary_lines and not self._omitted:
+            return ""
+        lines = list(self._summary_lines)
+        if self._omitted:
+            lines.insert(0, f"({self._omitted} earlier entries omitted)")
+        return "\n".join(lines)
+
+    def to_list(self) -> list:
+        """
+        Returns the summary (as a leading system entry, if any) followed by the window entries.
+        """
+        entries = [{"role": "system", "summary": self.summary}] if self.summary else []
+        entries.extend(entry for entry, _ in self._window)
+        return entries
+
+    def to_state(self) -> dict:
+        """
+        Returns everything needed to rebuild this memory exactly with `load_state`.
+        """
+        return self.state_since(None)
+
+    def state_since(self, checkpoint: Optional[dict]) -> dict:
+        """
+        Returns the changes since the state described by `checkpoint` (as returned by this method
+        or `to_state`), or the full state if it is None: the entries appended since, the eviction
+        counter and, only if it changed, the summary.
+        """
+        since = checkpoint["appended_count"] if checkpoint else None
+        state = {
+            "appended": self.entries_since(self.evicted_count if since is None else since),
+            "appended_count": self.appended_count,
+            "evicted_count": self.evicted_count,
+            "summary_version": self.summary_version,
+        }
+        if checkpoint is None or checkpoint["summary_version"] != self.summary_version:
+            state["summary"] = {"lines": list(self._summary_lines), "omitted": self._omitted}
+        return state
+
+    def load_state(self, state: dict, delta: bool = False):
+        """
+        Restores a state from `to_state`, or with `delta=True` applies one from `state_since` on top
+        of the current contents. Entries are restored as they were, without evicting again.
+        """
+        if not delta:
+            self._window.clear()
+            self._window_bytes = 0
+            self.evicted_count = state["appended_count"] - len(state["appended"])
+        for entry in state["appended"]:
+            size = _entry_size(entry)
+            self._window.append((entry, size))
+            self._window_bytes += size
+        while len(self._window) > state["appended_count"] - state["evicted_count"]:
+            _, size = self._window.popleft()
+            self._window_bytes -= size
+        self.appended_count = state["appended_count"]
+        self.evicted_count = state["evicted_count"]
+        self.summary_version = state["summary_version"]
+
+        summary = state.get("summary")
+        if summary is not None:
+            self._summary_lines = deque(summary["lines"])
+            self._summary_bytes = sum(len(line.encode("utf-8")) + 1 for line in self._summary_lines)
+            self._omitted = summary["omitted"]
+
+    def clear(self):
+        """
+        Drops the window and the summary.
+        """
+        self._window.clear()
+        self._window_bytes = 0
+        self._summary_lines.clear()
+        self._summary_bytes = 0
+        self._omitted = 0
+        self.evicted_count = self.appended_count
+        self.summary_version += 1
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Serialized size of the window plus the summary.
+        """
+        return self._window_bytes + self._summary_bytes
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def __iter__(self):
+        return (entry for entry, _ in self._window)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [entry for entry, _ in list(self._window)[index]]
+        return self._window[index][0]
+
+    def __bool__(self) -> bool:
+        return bool(self._window)
+
+    def _bound_entry(self, entry: dict) -> dict:
+        observation = entry.get("observation")
+        if observation is None:
+            return entry
+        if not isinstance(observation, str):
+            observation = json.dumps(observation, ensure_ascii=False, default=str)
+        if len(observation) <= self.max_observation_chars:
+            return entry if observation is entry["observation"] else dict(entry, observation=observation)
+        return dict(entry, observation=_clip(observation, self.max_observation_chars))
+
+    def _summarize(self, entry: dict) -> str:
+        role = entry.get("role", "unknown")
+        if "action" in entry:
+            action = entry["action"]
+            if not isinstance(action, dict):
+                return f"{role}: {_clip(str(action), 80)}"
+            target = action.get("tool_name") or action.get("question") or action.get("final_message") or ""
+            parameters = action.get("parameters")
+            if isinstance(parameters, dict) and parameters.get("operation"):
+                target = f"{target}.{parameters['operation']}"
+            return f"{role}: {action.get('action', 'action')} {_clip(str(target), 80)}".rstrip()
+        if "observation" in entry:
+            lines = str(entry["observation"]).strip().splitlines()
+            return f"{role}: observed {_clip(lines[0] if lines else '', 120)}"
+        if "summary" in entry:
+            return f"{role}: {_clip(str(entry['summary']), 120)}"
+        return f"{role}: {_clip(json.dumps(entry, ensure_ascii=False, default=str), 120)}"
+
+    def _add_summary_line(self, line: str):
+        self._summary_lines.append(line)
+        self._summary_bytes += len(line.encode("utf-8")) + 1
+        while self._summary_bytes > self.summary_max_bytes and len(self._summary_lines) > 1:
+            dropped = self._summary_lines.popleft()
+            self._summary_bytes -= len(dropped.encode("utf-8")) + 1
+            self._omitted += 1
+        self.summary_version += 1
@@ -1,17 +1,27 @@
 # Jules for Hugging Face - Methodology Engine
 
+import copy
 import json
 import os
 import shutil
 from importlib import resources
+from typing import List, Optional
 from .config import config
+from .exceptions import ConfigurationError
 from .logging import get_logger
+from .plan_journal import atomic_write_text
+from .plan_model import json_default
+from .plan_store import JSONPlanStore, PlanStore, SQLitePlanStore, load_plan_file
 
 logger = get_logger(__name__)
 
 class MethodologyEngine:
     """
-    Loads and tracks the project's methodology from a user-writable plan file.
+    Loads and tracks the project's methodology from a user-writable plan store.
+
+    The store is chosen by `plan_store.backend`: "json" (the default) keeps the plan in memory,
+    backed by `plan.json` and a journal, optionally parsing only its active branches at startup;
+    "sqlite" keeps it in an indexed SQLite file seeded from `plan.json` on first use.
     """
 
     def __init__(self):
@@ -24,9 +34,59 @@ class MethodologyEngine:
         plan_filename = config.get("plan_filename", "plan.json")
         self.user_dir = user_dir
         self.plan_file_path = os.path.join(self.user_dir, plan_filename)
-        self.plan = self._load_plan()
+        self.lease_seconds = config.get("worker_pool", {}).get("lease_seconds", 300)
+        self.store = self._open_store(config.get("plan_store", {}))
         logger.info("MethodologyEngine initialized.")
 
+    def _open_store(self, store_config: dict) -> PlanStore:
+        """
+        Opens the configured plan store, seeding it from the JSON plan when it is new.
+        """
+        self._ensure_user_dir_exists()
+        backend = store_config.get("backend", "json")
+
+        if backend == "json":
+            copied = self._ensure_plan_file()
+            journal_config = store_config.get("journal", {})
+            write_behind_config = store_config.get("write_behind", {})
+            return JSONPlanStore(
+                self.plan_file_path,
+                fsync_batch=journal_config.get("fsync_batch", 32),
+                fsync_interval=journal_config.get("fsync_interval", 1.0),
+                compact_after=journal_config.get("compact_after", 1000),
+                discard_journal=copied,
+                lazy=store_config.get("lazy_load", False),
+                compact_nodes=store_config.get("compact_nodes", False),
+                write_behind=write_behind_config.get("enabled", False),
+                flush_interval=write_behind_config.get("interval", 0.5),
+                flush_max_pending=write_behind_config.get("max_pending", 256),
+            )
+
+        if backend == "sqlite":
+            sqlite_config = store_config.get("sqlite", {})
+            default_path = os.path.splitext(self.plan_file_path)[0] + ".sqlite3"
+            store = SQLitePlanStore(sqlite_config.get("path", default_path),
+                                    busy_timeout=sqlite_config.get("busy_timeout", 30.0))
+            if store.is_empty():
+                self._ensure_plan_file()
+                if store.seed_plan(load_plan_file(self.plan_file_path)):
+                    logger.info(f"Seeded plan database {store.db_path} from {self.plan_file_path}.")
+            return store
+
+        raise ConfigurationError(f"Unknown plan_store backend '{backend}'. Expected 'json' or 'sqlite'.")
+
+    @property
+    def plan(self) -> dict:
+        """
+        The live plan of the "json" backend, which keeps it in memory. Changes made to it in place
+        are seen by later reads and saved when the store next compacts; to also reach the indexes and
+        the journal, change tasks through the engine's methods. Other backends keep no plan in
+        memory and raise AttributeError; use `export_plan()` there.
+        """
+        if not isinstance(self.store, JSONPlanStore):
+            raise AttributeError(f"The '{type(self.store).__name__}' backend keeps no live plan; use export_plan().")
+        return self.store.export_plan()
+
     def _ensure_user_dir_exists(self):
         """
         Ensures the user-writable directory exists.
@@ -35,23 +95,16 @@ class MethodologyEngine:
             logger.info(f"User directory not found. Creating at: {self.user_dir}")
             os.makedirs(self.user_dir)
 
-    def _load_plan(self) -> dict:
+    def _ensure_plan_file(self) -> bool:
         """
-        Loads the project plan from the user-writable directory.
+        Copies the default plan into the user directory if there is no plan file yet.
+        Returns True if the default plan was copied.
         """
-        self._ensure_user_dir_exists()
-
-        if not os.path.exists(self.plan_file_path):
-            logger.info(f"Plan file not found at {self.plan_file_path}. Copying default plan.")
-            self._copy_default_plan()
-
-        logger.debug(f"Loading plan from {self.plan_file_path}")
-        try:
-            with open(self.plan_file_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to load plan file: {e}", exc_info=True)
-            return {"error": str(e)}
+        if os.path.exists(self.plan_file_path):
+            return False
+        logger.info(f"Plan file not found at {self.plan_file_path}. Copying default plan.")
+        self._copy_default_plan()
+        return True
 
     def _copy_default_plan(self):
         """
@@ -70,61 +123,116 @@ class MethodologyEngine:
     def get_current_task(self) -> dict:
         """
         Finds and returns the current 'Ready' or 'In Progress' task from the plan.
+        The current task is a runnable one under an 'In Progress' epic and milestone, with every task in
+        its `depends_on` list completed. The task with the longest critical path (the sum of `estimate`,
+        default 1, along its longest chain of dependents) wins, then the first in document order.
         """
         logger.debug("Searching for the current task...")
-        # ... (rest of the method is unchanged)
-        for epic in self.plan.get("epics", []):
-            if epic.get("status") == "In Progress":
-                for milestone in epic.get("milestones", []):
-                    if milestone.get("status") == "In Progress":
-                        for feature in milestone.get("features", []):
-                            for task in feature.get("tasks", []):
-                                if task.get("status") in ["Ready", "In Progress"]:
-                                    logger.debug(f"Current task found: {task.get('id')}")
-                                    return {
-                                        "epic": epic.get("id"),
-                                        "milestone": milestone.get("id"),
-                                        "task": task
-                                    }
-        logger.warning("No current task found in the plan.")
-        return {"task": {"id": None, "title": "No current task found."}}
-
-    def update_task_status(self, task_id: str, status: str) -> bool:
-        """
-        Updates the status of a specific task and saves the plan.
+        return self.store.get_current_task()
+
+    def get_runnable_tasks(self, limit: Optional[int] = None) -> List[dict]:
+        """
+        Returns up to `limit` runnable, unleased tasks in scheduling order. None of them depends on
+        another, so they can be dispatched to workers in parallel.
+        """
+        return self.store.get_runnable_tasks(limit)
+
+    def get_task(self, task_id: str) -> Optional[dict]:
+        """
+        Returns a task together with the ids of its epic, milestone and feature and its version,
+        or None if it does not exist.
+        """
+        return self.store.get_task(task_id)
+
+    def get_tasks_by_status(self, status: str) -> List[dict]:
+        """
+        Returns all tasks currently in the given status.
+        """
+        return self.store.get_tasks_by_status(status)
+
+    def query_tasks(self, status: Optional[str] = None, epic_id: Optional[str] = None,
+                    milestone_id: Optional[str] = None) -> List[dict]:
+        """
+        Returns the tasks matching every given filter (status, epic id, milestone id) in document order.
+        A milestone given without its epic is the first milestone with that id.
+        """
+        return self.store.query_tasks(status, epic_id, milestone_id)
+
+    def get_progress(self, epic_id: Optional[str] = None, milestone_id: Optional[str] = None,
+                     include_children: bool = False) -> Optional[dict]:
+        """
+        Returns task counts by status and percent complete for the plan, an epic or a milestone, or
+        None if it does not exist. With `include_children`, the same figures are listed for each
+        epic of the plan or milestone of the epic. Counts are maintained on every status update, so
+        this does not walk the plan.
+        """
+        return self.store.get_progress(epic_id, milestone_id, include_children)
+
+    def update_task_status(self, task_id: str, status: str, expected_version: Optional[int] = None) -> bool:
+        """
+        Updates the status of a specific task and persists the change.
+        If `expected_version` is given, the update only applies if the task is still at that version.
         """
         logger.debug(f"Attempting to update task '{task_id}' to status '{status}'.")
-        task_found = False
-        # ... (loop logic is unchanged)
-        for epic in self.plan.get("epics", []):
-            for milestone in epic.get("milestones", []):
-                for feature in milestone.get("features", []):
-                    for task in feature.get("tasks", []):
-                        if task.get("id") == task_id:
-                            task["status"] = status
-                            task_found = True
-                            break
-                    if task_found: break
-                if task_found: break
-            if task_found: break
-
-        if task_found:
-            logger.info(f"Task '{task_id}' status updated to '{status}'. Saving plan.")
-            self._save_plan()
-        else:
-            logger.warning(f"Task '{task_id}' not found. Could not update status.")
-
-        return task_found
-
-    def _save_plan(self):
-        """
-        Saves the current plan back to the user-writable file.
-        """
-        logger.debug(f"Saving plan to {self.plan_file_path}")
-        self._ensure_user_dir_exists()
-        try:
-            with open(self.plan_file_path, 'w') as f:
-                json.dump(self.plan, f, indent=4)
-            logger.info("Plan saved successfully.")
-        except IOError as e:
-            logger.error(f"Failed to save plan: {e}", exc_info=True)
+        if not self.store.set_task_status(task_id, status, expected_version):
+            logger.warning(f"Task '{task_id}' not found or changed concurrently. Could not update status.")
+            return False
+        logger.info(f"Task '{task_id}' status updated to '{status}'.")
+        return True
+
+    def claim_task(self, owner: str, lease_seconds: Optional[float] = None) -> Optional[dict]:
+        """
+        Leases the next runnable task no other worker holds to `owner` and marks it 'In Progress'.
+        Returns it in the shape of `get_current_task` plus its version, or None if no task is free.
+        """
+        return self.store.claim_task(owner, lease_seconds or self.lease_seconds)
+
+    def renew_lease(self, task_id: str, owner: str, lease_seconds: Optional[float] = None) -> bool:
+        """
+        Extends `owner`'s lease on a task. Returns False if the lease was lost.
+        """
+        return self.store.renew_lease(task_id, owner, lease_seconds or self.lease_seconds)
+
+    def release_task(self, task_id: str, owner: str, status: Optional[str] = None) -> bool:
+        """
+        Ends `owner`'s lease on a task, optionally setting its final status in the same step.
+        """
+        return self.store.release_task(task_id, owner, status)
+
+    def export_plan(self, path: Optional[str] = None) -> dict:
+        """
+        Returns a copy of the plan in the nested JSON shape of `plan.json`, from any backend, and
+        writes it to `path` if one is given. Changing the copy does not change the plan. Building it
+        reads the whole plan, so it is meant for exports, not lookups.
+        """
+        plan = self.store.export_plan()
+        # The "json" backend hands out its live plan; the others build a new one on every call.
+        if isinstance(self.store, JSONPlanStore):
+            plan = copy.deepcopy(plan)
+        if path is not None:
+            atomic_write_text(path, json.dumps(plan, indent=4, default=json_default))
+            logger.info(f"Plan exported to {path}")
+        return plan
+
+    def import_plan(self, path: str):
+        """
+        Replaces the stored plan with the JSON plan in the given file.
+        """
+        plan = load_plan_file(path)
+        if "error" in plan:
+            raise ConfigurationError(f"Could not import plan from {path}: {plan['error']}")
+        self.store.import_plan(plan)
+        logger.info(f"Plan imported from {path}")
+
+    def flush(self):
+        """
+        Returns once every plan change made so far is durable, including changes still queued for
+        the write-behind thread.
+        """
+        self.store.flush()
+
+    def close(self):
+        """
+        Makes every pending plan change durable and releases the store.
+        """
+        self.store.close()
@@ -0,0 +1,450 @@
+# Jules for Hugging Face - Metrics Registry
+
+import bisect
+import json
+import math
+import os
+import threading
+import weakref
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+from .config import config
+from .logging import get_logger
+from .plan_journal import atomic_write_text
+
+logger = get_logger(__name__)
+
+# Upper bounds, in seconds, of the default latency histogram buckets.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Updates are recorded without locks. Counters and gauges keep one cell per thread, which only
+# that thread writes, and sum the cells when read; a thread's cell is folded into the base value
+# when the thread exits, so short-lived threads don't accumulate cells. Histogram observations are appended to a
+# deque, which is atomic in CPython, and folded into the buckets under a lock when read or when
+# too many are pending.
+_MAX_PENDING = 4096
+
+class _CellOwner:
+    __slots__ = ("__weakref__",)
+
+class _CounterChild:
+    __slots__ = ("_base", "_cells", "_local", "_lock")
+
+    def __init__(self):
+        self._base = 0
+        self._cells = []  # one [value] list per thread that has updated the metric
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        """
+        Adds `amount` (which must not be negative) to the counter.
+        """
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+        cell[0] += amount
+
+    @property
+    def value(self):
+        with self._lock:
+            return self._base + sum(cell[0] for cell in self._cells)
+
+    def _new_cell(self) -> list:
+        cell = self._local.cell = [0]
+        # The thread-local data is dropped when the thread exits, and the owner with it.
+        self._local.owner = owner = _CellOwner()
+        with self._lock:
+            self._cells.append(cell)
+        weakref.finalize(owner, self._retire_cell, cell)
+        return cell
+
+    def _retire_cell(self, cell: list):
+        with self._lock:
+            self._cells.remove(cell)
+            self._base += cell[0]
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1):
+        """
+        Subtracts `amount` from the gauge.
+        """
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+        cell[0] -= amount
+
+    def set(self, value: float):
+        """
+        Sets the gauge to `value`.
+        """
+        with self._lock:
+            self._base = value - sum(cell[0] for cell in self._cells)
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_pending", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # the last slot is the +Inf bucket
+        self._sum = 0.0
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """
+        Records one observation.
+        """
+        pending = self._pending
+        pending.append(value)
+        if len(pending) > _MAX_PENDING:
+            with self._lock:
+                self._fold_locked()
+
+    def snapshot(self) -> Tuple[list, float]:
+        """
+        Returns the cumulative bucket counts (ending with +Inf) and the sum of observations.
+        """
+        with self._lock:
+            self._fold_locked()
+            counts, total = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+    def _fold_locked(self):
+        pending, bounds, counts = self._pending, self._bounds, self._counts
+        for _ in range(len(pending)):
+            value = pending.popleft()
+            counts[bisect.bisect_left(bounds, value)] += 1
+            self._sum += value
+
+class Metric:
+    """
+    A named family of time series, one per combination of label values.
+
+    `labels(...)` returns the child for a combination, creating it on first use; callers on a hot
+    path should keep the child rather than look it up on every call. A metric without labels is
+    used directly (`counter.inc()`).
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._default = self.labels()
+
+    def labels(self, *values: str):
+        """
+        Returns the time series for the given label values, in the order of `label_names`.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"Metric '{self.name}' expects labels {self.label_names}, got {values}.")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def samples(self):
+        """
+        Returns (label values, child) pairs, sorted by label values.
+        """
+        with self._lock:
+            return sorted(self._children.items(), key=lambda item: item[0])
+
+    def _new_child(self):
+        raise NotImplementedError
+
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. the number of calls.
+    """
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+class Gauge(Metric):
+    """
+    A value that goes up and down, e.g. the number of calls in flight.
+    """
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+class Histogram(Metric):
+    """
+    A distribution of observations, e.g. latencies, counted into fixed buckets.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(bound for bound in buckets if bound != math.inf))
+        super().__init__(name, documentation, label_names)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and exports them in the Prometheus text exposition format, to a file
+    or a local HTTP endpoint, and as a JSON snapshot.
+
+    Recording a value is a lock-free, constant-time step; aggregation into totals and buckets,
+    and all formatting, happen when the metrics are read or exported.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """
+        Returns the counter called `name`, registering it on first use.
+        """
+        return self._register(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """
+        Returns the gauge called `name`, registering it on first use.
+        """
+        return self._register(Gauge, name, documentation, label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Returns the histogram called `name`, registering it on first use.
+        """
+        return self._register(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def to_prometheus(self) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for metric in self._sorted_metrics():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for values, child in metric.samples():
+                labels = list(zip(metric.label_names, values))
+                if isinstance(metric, Histogram):
+                    counts, total = child.snapshot()
+                    for bound, count in zip(metric.buckets + (math.inf,), counts):
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels + [('le', _format_bound(bound))])} {count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {counts[-1]}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_json(self) -> dict:
+        """
+        Returns a JSON-serializable snapshot of every metric.
+        """
+        snapshot = {}
+        for metric in self._sorted_metrics():
+            samples = []
+            for values, child in metric.samples():
+                sample = {"labels": dict(zip(metric.label_names, values))}
+                if isinstance(metric, Histogram):
+                    counts, total = child.snapshot()
+                    sample["buckets"] = {_format_bound(bound): count
+                                         for bound, count in zip(metric.buckets + (math.inf,), counts)}
+                    sample["sum"] = total
+                    sample["count"] = counts[-1]
+                else:
+                    sample["value"] = child.value
+                samples.append(sample)
+            snapshot[metric.name] = {"type": metric.type_name, "help": metric.documentation, "samples": samples}
+        return snapshot
+
+    def write_prometheus(self, path: str):
+        """
+        Atomically writes the Prometheus text format to `path`, e.g. for node_exporter's textfile collector.
+        """
+        atomic_write_text(path, self.to_prometheus())
+
+    def write_json(self, path: str):
+        """
+        Atomically writes the JSON snapshot to `path`.
+        """
+        atomic_write_text(path, json.dumps(self.to_json(), indent=2))
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """
+        Serves `/metrics` (Prometheus text) and `/metrics.json` from a background thread.
+        Returns the bound port, which is chosen by the OS when `port` is 0.
+        """
+        if self._server is not None:
+            return self._server.server_address[1]
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body, content_type = json.dumps(registry.to_json()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        bound_port = self._server.server_address[1]
+        logger.info(f"Serving metrics on http://{host}:{bound_port}/metrics")
+        return bound_port
+
+    def close(self):
+        """
+        Stops the HTTP endpoint, if it is running.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _register(self, metric_class, name: str, documentation: str, label_names: Sequence[str], **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, documentation, label_names, **kwargs)
+            elif type(metric) is not metric_class or metric.label_names != tuple(label_names):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type_name} "
+                                 f"with labels {metric.label_names}.")
+            return metric
+
+    def _sorted_metrics(self):
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+class MetricsExporter:
+    """
+    Publishes a registry according to the `metrics` configuration section: written as Prometheus
+    text and/or a JSON snapshot to files under the user data directory on every `export()`, and
+    served over HTTP on a local port. A `{pid}` in a file name is replaced by the process id, so
+    the processes of a worker pool do not overwrite each other's files.
+    """
+
+    def __init__(self, registry: MetricsRegistry, prometheus_file: Optional[str] = None,
+                 json_file: Optional[str] = None, http_port: Optional[int] = None, http_host: str = "127.0.0.1"):
+        self.registry = registry
+        self.prometheus_file = prometheus_file.format(pid=os.getpid()) if prometheus_file else None
+        self.json_file = json_file.format(pid=os.getpid()) if json_file else None
+        self.http_port = None
+        if http_port is not None:
+            try:
+                self.http_port = registry.serve(http_port, host=http_host)
+            except OSError as e:
+                logger.warning(f"Could not serve metrics on {http_host}:{http_port}: {e}")
+
+    @classmethod
+    def from_config(cls, registry: MetricsRegistry) -> Optional["MetricsExporter"]:
+        """
+        Creates an exporter according to the `metrics` configuration section, or returns None
+        when exporting is disabled.
+        """
+        metrics_config = config.get("metrics", {})
+        if not metrics_config.get("enabled", False):
+            return None
+        user_data_dir = config.get("user_data_dir", ".jules_hf")
+        os.makedirs(user_data_dir, exist_ok=True)
+
+        def path(key):
+            filename = metrics_config.get(key)
+            return os.path.join(user_data_dir, filename) if filename else None
+
+        return cls(
+            registry,
+            prometheus_file=path("prometheus_file"),
+            json_file=path("json_file"),
+            http_port=metrics_config.get("http_port"),
+            http_host=metrics_config.get("http_host", "127.0.0.1"),
+        )
+
+    def export(self):
+        """
+        Writes the configured metric files. A failed write is logged and never stops the agent.
+        """
+        try:
+            if self.prometheus_file:
+                self.registry.write_prometheus(self.prometheus_file)
+            if self.json_file:
+                self.registry.write_json(self.json_file)
+        except OSError as e:
+            logger.warning(f"Could not export metrics: {e}")
+
+    def close(self):
+        """
+        Writes the final metrics and stops the HTTP endpoint.
+        """
+        self.export()
+        self.registry.close()
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
@@ -0,0 +1,125 @@
+# Jules for Hugging Face - Plan Mutation Journal
+
+import json
+import os
+import time
+from typing import Callable, List
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+def atomic_write_text(path: str, text: str):
+    """
+    Replaces a file's contents atomically: the data is written and fsynced to a temporary file,
+    which is then renamed over the target, so readers see either the old or the new file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+def _fsync_directory(directory: str):
+    # Persists the rename itself; not supported on every platform, so failures are ignored.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class PlanJournal:
+    """
+    A write-ahead journal of plan mutations, stored as compact JSON lines.
+
+    Every append is written and flushed to the OS immediately, so it survives a process crash.
+    fsync is batched (group commit): it runs once `fsync_batch` entries have accumulated or
+    `fsync_interval` seconds have passed since the last sync, bounding what a power loss can undo.
+    """
+
+    def __init__(self, path: str, fsync_batch: int = 32, fsync_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self._clock = clock
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = clock()
+        self.entries = 0
+
+    def replay(self) -> List[dict]:
+        """
+        Returns the journaled entries in order. A torn final line left by a crash is discarded
+        and cut from the file so later appends start on a clean line.
+        """
+        if not os.path.exists(self.path):
+            self.entries = 0
+            return []
+
+        entries = []
+        good_length = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                good_length += len(line)
+
+        if good_length != os.path.getsize(self.path):
+            logger.warning(f"Discarding a torn tail from plan journal {self.path}.")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_length)
+
+        self.entries = len(entries)
+        return entries
+
+    def append(self, entry: dict):
+        """
+        Appends one mutation to the journal.
+        """
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.entries += 1
+        self._unsynced += 1
+
+        if self._unsynced >= self.fsync_batch or self._clock() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """
+        Forces all appended entries to stable storage.
+        """
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = self._clock()
+
+    def reset(self):
+        """
+        Empties the journal, e.g. after its entries have been folded into a snapshot.
+        """
+        self.close()
+        with open(self.path, "w") as f:
+            os.fsync(f.fileno())
+        self.entries = 0
+
+    def close(self):
+        """
+        Syncs and closes the journal file.
+        """
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,269 @@
+# Jules for Hugging Face - Lazy Plan Loader
+
+import json
+import mmap
+import os
+import re
+from .logging import get_logger
+from .plan_journal import atomic_write_text
+
+logger = get_logger(__name__)
+
+# A JSON string (escapes included) or a bracket. Everything else is skipped by the regex engine.
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN = re.compile(_STRING + rb'|[{}\[\]]')
+_COLON = re.compile(rb'\s*:')
+
+# Below the epic and milestone levels nothing is inspected, so whole subtrees are skipped in a single
+# regex match where possible: an object or array without nested containers (a typical task), or an
+# array whose elements are all such objects (a typical task list).
+_FLAT_BODY = rb'[^{}\[\]"]*(?:' + _STRING + rb'[^{}\[\]"]*)*'
+_FLAT_OBJECT = rb'\{' + _FLAT_BODY + rb'\}'
+_SKIPPABLE = re.compile(
+    _FLAT_OBJECT + rb'|\[' + _FLAT_BODY + rb'\]'
+    + rb'|\[\s*' + _FLAT_OBJECT + rb'(?:\s*,\s*' + _FLAT_OBJECT + rb')*\s*\]'
+)
+
+class _Span:
+    """
+    Byte range of an epic or milestone object in the plan file, with the fields needed to decide
+    whether it must be loaded eagerly.
+    """
+    __slots__ = ("start", "end", "id", "status", "children")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = None
+        self.id = None
+        self.status = None
+        self.children = []
+
+    def to_list(self) -> list:
+        return [self.start, self.end, self.id, self.status, [child.to_list() for child in self.children]]
+
+    @classmethod
+    def from_list(cls, data: list) -> "_Span":
+        span = cls(data[0])
+        span.end, span.id, span.status = data[1], data[2], data[3]
+        span.children = [cls.from_list(child) for child in data[4]]
+        return span
+
+class LazyPlanLoader:
+    """
+    Loads a plan file without parsing the branches nobody is looking at.
+
+    The file is memory-mapped and scanned once for the byte ranges of every epic and milestone,
+    skipping over everything below them without building objects. Only 'In Progress' epics and
+    their 'In Progress' milestones (the branches that can hold the current task) are parsed up
+    front; every other epic or milestone is a stub holding just its id and status until
+    `materialize` parses it from its recorded offsets.
+
+    The scan runs at roughly the speed of a full parse but with almost no memory, so its result is
+    kept in a small `<plan>.index` file next to the plan. While the plan's size and modification
+    time match it, later startups skip the scan and parse only the active branches.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = f"{path}.index"
+        self._file = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._root, self._epics_range, self._epics = self._read_index() or self._scan_and_index()
+        except Exception:
+            self.close()
+            raise
+        self._pending = []  # (container, index, span) for every stub handed out
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of branches that are still stubs.
+        """
+        return len(self._pending)
+
+    def load(self) -> dict:
+        """
+        Returns the plan with its active branches parsed and every other branch stubbed.
+        """
+        buf = self._buf
+        root_start, root_end = self._root
+        if self._epics_range is None:
+            return json.loads(buf[root_start:root_end])
+
+        epics_start, epics_end = self._epics_range
+        plan = json.loads(buf[root_start:epics_start] + b"[]" + buf[epics_end:root_end])
+
+        epics = plan["epics"]
+        for epic_span in self._epics:
+            if epic_span.status == "In Progress":
+                epics.append(self._load_epic(epic_span))
+            else:
+                epics.append(self._stub(epics, len(epics), epic_span))
+
+        logger.debug(f"Lazily loaded plan from {self.path}; {len(self._pending)} branches deferred.")
+        return plan
+
+    def materialize(self):
+        """
+        Parses every stubbed branch in place, then releases the file.
+        """
+        buf = self._buf
+        for container, index, span in self._pending:
+            container[index] = json.loads(buf[span.start:span.end])
+        logger.debug(f"Materialized {len(self._pending)} deferred plan branches.")
+        self._pending = []
+        self.close()
+
+    def close(self):
+        """
+        Unmaps and closes the plan file.
+        """
+        buf = getattr(self, "_buf", None)
+        if buf is not None:
+            buf.close()
+            self._buf = None
+        self._file.close()
+
+    def _load_epic(self, span: _Span) -> dict:
+        # Parse the epic with its inactive milestones replaced by null, then put stubs in their place.
+        buf = self._buf
+        deferred = [child for child in span.children if child.status != "In Progress"]
+        pieces = []
+        cursor = span.start
+        for child in deferred:
+            pieces.append(buf[cursor:child.start])
+            pieces.append(b"null")
+            cursor = child.end
+        pieces.append(buf[cursor:span.end])
+        epic = json.loads(b"".join(pieces))
+
+        milestones = epic.get("milestones", [])
+        deferred_ids = {id(child) for child in deferred}
+        for index, child in enumerate(span.children):
+            if id(child) in deferred_ids:
+                milestones[index] = self._stub(milestones, index, child)
+        return epic
+
+    def _signature(self) -> list:
+        stat = os.fstat(self._file.fileno())
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _read_index(self):
+        """
+        Returns the saved scan result if it was made for the current plan file, otherwise None.
+        """
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("signature") != self._signature():
+            return None
+        logger.debug(f"Using plan offset index {self.index_path}")
+        epics_range = tuple(index["epics_range"]) if index["epics_range"] else None
+        return tuple(index["root"]), epics_range, [_Span.from_list(span) for span in index["epics"]]
+
+    def _scan_and_index(self):
+        result = self._scan(self._buf)
+        root, epics_range, spans = result
+        index = {
+            "signature": self._signature(),
+            "root": root,
+            "epics_range": epics_range,
+            "epics": [span.to_list() for span in spans],
+        }
+        try:
+            atomic_write_text(self.index_path, json.dumps(index, separators=(",", ":")))
+        except OSError as e:
+            logger.warning(f"Could not save plan offset index {self.index_path}: {e}")
+        return result
+
+    def _stub(self, container: list, index: int, span: _Span) -> dict:
+        self._pending.append((container, index, span))
+        stub = {}
+        if span.id is not None:
+            stub["id"] = span.id
+        if span.status is not None:
+            stub["status"] = span.status
+        return stub
+
+    @staticmethod
+    def _scan(buf):
+        """
+        Returns the root object's byte range, the "epics" array's range (or None), and the epic spans.
+        """
+        # Each stack entry is the role of an open container: "root", "epics", "epic", "milestones",
+        # "milestone", or None below the levels that matter.
+        stack = []
+        spans = []
+        key = None
+        root = None
+        epics_range = None
+        epics_start = None
+
+        search = _TOKEN.search
+        skip = _SKIPPABLE.match
+        pos = 0
+        while True:
+            match = search(buf, pos)
+            if match is None:
+                break
+            start = match.start()
+            pos = match.end()
+            char = buf[start]
+            role = stack[-1] if stack else None
+
+            if char == 0x22:  # '"'
+                if role in ("root", "epic", "milestone"):
+                    if _COLON.match(buf, match.end()):
+                        key = json.loads(match.group())
+                        continue
+                    if key in ("id", "status") and role != "root":
+                        setattr(spans[-1], key, json.loads(match.group()))
+                key = None
+                continue
+
+            if char in (0x7B, 0x5B):  # '{' or '['
+                if not stack:
+                    new_role = "root" if char == 0x7B else None
+                elif role == "root" and key == "epics" and char == 0x5B:
+                    new_role = "epics"
+                    epics_start = start
+                elif role == "epics" and char == 0x7B:
+                    new_role = "epic"
+                    spans.append(_Span(start))
+                elif role == "epic" and key == "milestones" and char == 0x5B:
+                    new_role = "milestones"
+                elif role == "milestones" and char == 0x7B:
+                    new_role = "milestone"
+                    spans.append(_Span(start))
+                else:
+                    skipped = skip(buf, start) if stack else None
+                    if skipped is not None:
+                        pos = skipped.end()
+                        key = None
+                        continue
+                    new_role = None
+                stack.append(new_role)
+                key = None
+                continue
+
+            # '}' or ']'
+            closed = stack.pop()
+            end = match.end()
+            if closed == "milestone":
+                milestone = spans.pop()
+                milestone.end = end
+                spans[-1].children.append(milestone)
+            elif closed == "epic":
+                spans[-1].end = end
+            elif closed == "epics":
+                epics_range = (epics_start, end)
+            elif closed == "root":
+                root = (0, end)
+            key = None
+
+        if root is None or stack:
+            raise ValueError("Plan file is not a complete JSON object.")
+        return root, epics_range, spans
@@ -0,0 +1,187 @@
+# Jules for Hugging Face - Plan Object Model
+
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Iterator, Optional, Tuple
+
+# Key orders seen so far, shared by every node with the same layout.
+_LAYOUTS = {}
+
+def _layout(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _LAYOUTS.setdefault(keys, keys)
+
+def json_default(value):
+    """
+    `default` hook for json.dump(s) that serializes plan nodes one level at a time.
+    """
+    if isinstance(value, PlanNode):
+        return {key: value[key] for key in value}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class PlanNode(MutableMapping):
+    """
+    Base class for the compact, slotted representation of a plan node.
+
+    Known fields live in `__slots__` instead of a per-node dict, status values are interned, and the
+    key order is a tuple shared by all nodes with the same layout. Unknown fields are kept in a small
+    overflow dict, so converting to and from the JSON shape is lossless. Nodes implement the mapping
+    protocol, so code written against the nested-dict plan keeps working unchanged.
+    """
+    __slots__ = ("_keys", "_extra")
+
+    FIELDS: Tuple[str, ...] = ()
+    CHILD_KEY: Optional[str] = None
+    CHILD_TYPE: Optional[type] = None
+
+    def __init__(self, data: Optional[Mapping] = None, **fields):
+        self._keys = ()
+        self._extra = None
+        for key, value in (data or {}).items():
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "PlanNode":
+        """
+        Builds a node, and recursively its children, from its JSON form.
+        """
+        if isinstance(data, cls):
+            data._coerce_children()
+            return data
+
+        node = cls.__new__(cls)
+        extra = None
+        fields = cls.FIELDS
+        for key, value in data.items():
+            if key in fields:
+                if key == "status" and type(value) is str:
+                    value = sys.intern(value)
+                elif key == cls.CHILD_KEY and type(value) is list:
+                    cls._convert_children(value)
+                object.__setattr__(node, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        node._extra = extra
+        node._keys = _layout(tuple(data))
+        return node
+
+    def to_dict(self) -> dict:
+        """
+        Returns the node, and recursively its children, in its JSON form.
+        """
+        result = {}
+        for key in self._keys:
+            value = self[key]
+            if key == self.CHILD_KEY and type(value) is list:
+                value = [child.to_dict() if isinstance(child, PlanNode) else child for child in value]
+            result[key] = value
+        return result
+
+    @classmethod
+    def _convert_children(cls, children: list):
+        # Converted in place, so references to the list (e.g. held by a lazy loader) stay valid.
+        child_type = cls.CHILD_TYPE
+        for index, child in enumerate(children):
+            if isinstance(child, Mapping):
+                children[index] = child_type.from_dict(child)
+
+    def _coerce_children(self):
+        """
+        Converts any plain-dict children (e.g. branches loaded later) into nodes.
+        """
+        children = getattr(self, self.CHILD_KEY, None) if self.CHILD_KEY else None
+        if type(children) is list:
+            self._convert_children(children)
+
+    def __getitem__(self, key: str):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value):
+        if key in self.FIELDS:
+            if key == "status" and type(value) is str:
+                value = sys.intern(value)
+            elif key == self.CHILD_KEY and type(value) is list:
+                self._convert_children(value)
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        if key not in self._keys:
+            self._keys = _layout(self._keys + (key,))
+
+    def __delitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in self.FIELDS:
+            object.__delattr__(self, key)
+        else:
+            del self._extra[key]
+            if not self._extra:
+                self._extra = None
+        self._keys = _layout(tuple(k for k in self._keys if k != key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class Task(PlanNode):
+    """
+    A single unit of work.
+    """
+    FIELDS = ("id", "title", "status", "depends_on", "estimate")
+    __slots__ = FIELDS
+
+class Feature(PlanNode):
+    """
+    A group of tasks delivering one feature.
+    """
+    FIELDS = ("id", "description", "tasks")
+    __slots__ = FIELDS
+    CHILD_KEY = "tasks"
+    CHILD_TYPE = Task
+
+class Milestone(PlanNode):
+    """
+    A milestone within an epic.
+    """
+    FIELDS = ("id", "goal", "status", "features")
+    __slots__ = FIELDS
+    CHILD_KEY = "features"
+    CHILD_TYPE = Feature
+
+class Epic(PlanNode):
+    """
+    A top-level phase of the plan.
+    """
+    FIELDS = ("id", "goal", "status", "milestones")
+    __slots__ = FIELDS
+    CHILD_KEY = "milestones"
+    CHILD_TYPE = Milestone
+
+class Plan(PlanNode):
+    """
+    The root of a plan.
+    """
+    FIELDS = ("project_name", "epics")
+    __slots__ = FIELDS
+    CHILD_KEY = "epics"
+    CHILD_TYPE = Epic
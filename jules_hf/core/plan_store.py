@@ -0,0 +1,1014 @@
+# Jules for Hugging Face - Plan Stores
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import List, Optional
+from .logging import get_logger
+from .plan_loader import LazyPlanLoader
+from .plan_model import Plan, json_default
+from .plan_journal import PlanJournal, atomic_write_text
+from .scheduler import ACTIVE_STATUSES, DONE_STATUS, TaskScheduler, TaskSpec, critical_path_lengths
+from .write_behind import WriteBehind
+
+logger = get_logger(__name__)
+
+# The child collection of each level of the plan hierarchy.
+_CHILD_KEYS = {"epic": "milestones", "milestone": "features", "feature": "tasks"}
+
+def load_plan_file(path: str) -> dict:
+    """
+    Reads a plan in its JSON form. A missing or corrupt file yields a plan holding only an "error" key.
+    """
+    logger.debug(f"Loading plan from {path}")
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.error(f"Failed to load plan file: {e}", exc_info=True)
+        return {"error": str(e)}
+
+def _progress(epic_id: Optional[str], milestone_id: Optional[str], counts: dict) -> dict:
+    total = sum(counts.values())
+    completed = counts.get(DONE_STATUS, 0)
+    return {
+        "epic": epic_id,
+        "milestone": milestone_id,
+        "total": total,
+        "completed": completed,
+        "percent_complete": 100.0 * completed / total if total else 0.0,
+        "by_status": {status: count for status, count in counts.items() if count},
+    }
+
+def _no_current_task() -> dict:
+    logger.warning("No current task found in the plan.")
+    return {"task": {"id": None, "title": "No current task found."}}
+
+class PlanStore(ABC):
+    """
+    Abstract base class for the storage behind MethodologyEngine.
+
+    A store holds one plan and answers the engine's queries; the nested JSON shape of `plan.json`
+    is its interchange format, available through `export_plan` and `import_plan`.
+
+    Workers coordinate through time-bounded leases: `claim_task` hands each worker a distinct
+    runnable task, and every task carries a version that `set_task_status` can check, so a write
+    based on a stale read is rejected instead of silently overwriting a newer change.
+    """
+
+    @abstractmethod
+    def get_current_task(self) -> dict:
+        """
+        Returns the next runnable task: 'Ready' or 'In Progress', under an 'In Progress' epic and
+        milestone, with every task it `depends_on` completed. Among those, the task with the longest
+        critical path wins, then the first in document order.
+        """
+        pass
+
+    @abstractmethod
+    def get_runnable_tasks(self, limit: Optional[int] = None) -> List[dict]:
+        """
+        Returns up to `limit` runnable tasks that no worker holds a lease on, in the order
+        `get_current_task` would pick them. They do not depend on each other, so they can be
+        dispatched in parallel.
+        """
+        pass
+
+    @abstractmethod
+    def get_task(self, task_id: str) -> Optional[dict]:
+        """
+        Returns a task together with the ids of its epic, milestone and feature and its version,
+        or None if it does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def get_tasks_by_status(self, status: str) -> List[dict]:
+        """
+        Returns all tasks currently in the given status.
+        """
+        pass
+
+    @abstractmethod
+    def query_tasks(self, status: Optional[str] = None, epic_id: Optional[str] = None,
+                    milestone_id: Optional[str] = None) -> List[dict]:
+        """
+        Returns the tasks matching every given filter, in document order.
+        """
+        pass
+
+    @abstractmethod
+    def get_progress(self, epic_id: Optional[str] = None, milestone_id: Optional[str] = None,
+                     include_children: bool = False) -> Optional[dict]:
+        """
+        Returns task counts by status and percent complete for the whole plan, an epic or a milestone
+        (None if it does not exist), optionally with the same figures for each epic or milestone below it.
+        """
+        pass
+
+    @abstractmethod
+    def set_task_status(self, task_id: str, status: str, expected_version: Optional[int] = None) -> bool:
+        """
+        Durably records a task's new status. Returns False if the task does not exist or, when
+        `expected_version` is given, if the task has changed since that version was read.
+        """
+        pass
+
+    @abstractmethod
+    def claim_task(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        """
+        Leases the first runnable task that no other worker holds, marks it 'In Progress' and
+        returns it in the shape of `get_current_task` plus a "version". Returns None if nothing is free.
+        """
+        pass
+
+    @abstractmethod
+    def renew_lease(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Extends a lease held by `owner`. Returns False if the lease has expired or belongs to someone else.
+        """
+        pass
+
+    @abstractmethod
+    def release_task(self, task_id: str, owner: str, status: Optional[str] = None) -> bool:
+        """
+        Ends a lease held by `owner`, first setting the task's status if one is given.
+        Returns False (and changes nothing) if `owner` no longer holds the lease.
+        """
+        pass
+
+    @abstractmethod
+    def export_plan(self) -> dict:
+        """
+        Returns the plan in its nested JSON form.
+        """
+        pass
+
+    @abstractmethod
+    def import_plan(self, plan: dict):
+        """
+        Replaces the stored plan with the given nested JSON plan.
+        """
+        pass
+
+    def flush(self):
+        """
+        Returns once every accepted write is durable.
+        """
+        pass
+
+    def close(self):
+        """
+        Flushes pending writes and releases the store's resources.
+        """
+        pass
+
+class _TaskRef:
+    """
+    Index entry for a task: the task itself, its parent chain and its position in document order.
+    """
+    __slots__ = ("task", "feature", "milestone", "epic", "position", "in_active_branch")
+
+    def __init__(self, task: dict, feature: dict, milestone: dict, epic: dict, position: int):
+        self.task = task
+        self.feature = feature
+        self.milestone = milestone
+        self.epic = epic
+        self.position = position
+        self.in_active_branch = epic.get("status") == "In Progress" and milestone.get("status") == "In Progress"
+
+class JSONPlanStore(PlanStore):
+    """
+    Keeps the plan in memory as nested dicts backed by `plan.json`, with in-memory indexes for lookups.
+
+    Status changes are appended to a journal next to the plan file rather than rewriting it; the
+    journal is replayed on load and folded into an atomic snapshot every `compact_after` entries.
+
+    With `lazy=True` only the active branches are parsed at startup (see LazyPlanLoader); the rest
+    of the plan is loaded the first time a query or write needs it. With `compact_nodes=True` the
+    plan is held as slotted plan nodes (see plan_model) instead of dicts.
+
+    With `write_behind=True` status changes return once applied in memory; a background thread
+    journals them in batches (see WriteBehind), keeping only the latest status of a task changed
+    several times in between. Changes not yet flushed are lost if the process dies; `flush()`
+    makes them durable.
+
+    Leases and task versions are kept in memory, so they coordinate threads within one process;
+    worker pools spanning processes need the SQLite store.
+    """
+
+    def __init__(self, plan_file_path: str, fsync_batch: int = 32, fsync_interval: float = 1.0,
+                 compact_after: int = 1000, discard_journal: bool = False, lazy: bool = False,
+                 compact_nodes: bool = False, write_behind: bool = False, flush_interval: float = 0.5,
+                 flush_max_pending: int = 256):
+        self.plan_file_path = plan_file_path
+        self.compact_after = compact_after
+        self.compact_nodes = compact_nodes
+        self._lock = threading.RLock()
+        # Taken after `_lock` when both are needed; the write-behind thread journals under it alone.
+        self._journal_lock = threading.Lock()
+        self._versions = {}
+        self._leases = {}  # task id -> (owner, expires_at)
+        self._journal = PlanJournal(f"{plan_file_path}.journal", fsync_batch=fsync_batch,
+                                    fsync_interval=fsync_interval)
+        if discard_journal:
+            # A journal without its snapshot describes a different plan.
+            self._journal.reset()
+
+        self._loader = None
+        if lazy:
+            try:
+                self._loader = LazyPlanLoader(plan_file_path)
+                self.plan = self._loader.load()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Lazy loading of {plan_file_path} failed, loading it fully: {e}")
+                self._loader = None
+        if self._loader is None:
+            self.plan = load_plan_file(plan_file_path)
+        if compact_nodes:
+            self.plan = Plan.from_dict(self.plan)
+        self._build_index()
+        self._replay_journal()
+        self._writer = None
+        if write_behind:
+            self._writer = WriteBehind(self._journal_entries, interval=flush_interval,
+                                       max_pending=flush_max_pending, name="plan-write-behind")
+
+    def _ensure_loaded(self):
+        """
+        Parses any branches the lazy loader deferred and re-indexes the complete plan.
+        """
+        if self._loader is None:
+            return
+        self._loader.materialize()
+        self._loader = None
+        if self.compact_nodes:
+            # Converts the newly parsed branches; nodes that already exist are kept.
+            self.plan = Plan.from_dict(self.plan)
+        self._build_index()
+
+    def _build_index(self):
+        """
+        Indexes every task by id (with its parent chain) and by status, and builds the scheduler's
+        ready queue, so lookups and status changes never walk the plan.
+        """
+        self._task_index = {}
+        self._status_index = {}
+        # Progress aggregates per scope: () is the plan, (epic,) an epic, (epic, milestone) a milestone.
+        self._progress = {(): {}}
+        self._scope_tasks = {}
+        self._scope_children = {(): []}
+        self._milestone_scopes = {}
+
+        position = 0
+        for epic in self.plan.get("epics", []):
+            epic_scope = self._add_scope((), (epic.get("id"),))
+            for milestone in epic.get("milestones", []):
+                milestone_scope = self._add_scope(epic_scope, epic_scope + (milestone.get("id"),))
+                self._milestone_scopes.setdefault(milestone.get("id"), milestone_scope)
+                for feature in milestone.get("features", []):
+                    for task in feature.get("tasks", []):
+                        task_id = task.get("id")
+                        # Like the original nested search, the first task with a given id wins.
+                        if task_id not in self._task_index:
+                            ref = _TaskRef(task, feature, milestone, epic, position)
+                            self._task_index[task_id] = ref
+                            self._status_index.setdefault(task.get("status"), {})[task_id] = None
+                            self._scope_tasks[epic_scope].append(task_id)
+                            self._scope_tasks[milestone_scope].append(task_id)
+                            self._count(milestone_scope, task.get("status"), 1)
+                        position += 1
+
+        if self._loader is not None and any(
+            dependency not in self._task_index
+            for ref in self._task_index.values() for dependency in ref.task.get("depends_on") or ()
+        ):
+            # A dependency may sit in a deferred branch; the scheduler needs the whole graph.
+            self._ensure_loaded()
+            return
+
+        self._scheduler = TaskScheduler(
+            TaskSpec(task_id, ref.position, ref.task.get("status"), ref.task.get("depends_on"),
+                     ref.task.get("estimate", 1), ref.in_active_branch)
+            for task_id, ref in self._task_index.items()
+        )
+        logger.debug(f"Indexed {len(self._task_index)} tasks.")
+
+    def _add_scope(self, parent: tuple, scope: tuple) -> tuple:
+        if scope not in self._progress:
+            self._progress[scope] = {}
+            self._scope_tasks[scope] = []
+            self._scope_children[scope] = []
+            self._scope_children[parent].append(scope)
+        return scope
+
+    def _count(self, scope: tuple, status: str, delta: int):
+        # A milestone's tasks also count towards its epic and the plan.
+        for level in ((), scope[:1], scope):
+            counts = self._progress[level]
+            counts[status] = counts.get(status, 0) + delta
+
+    def _resolve_scope(self, epic_id: Optional[str], milestone_id: Optional[str]) -> Optional[tuple]:
+        if milestone_id is not None:
+            scope = (epic_id, milestone_id) if epic_id is not None else self._milestone_scopes.get(milestone_id)
+        elif epic_id is not None:
+            scope = (epic_id,)
+        else:
+            scope = ()
+        return scope if scope in self._progress else None
+
+    def get_current_task(self) -> dict:
+        task_id = self._scheduler.peek()
+        if task_id is None:
+            return _no_current_task()
+        logger.debug(f"Current task found: {task_id}")
+        ref = self._task_index[task_id]
+        return {"epic": ref.epic.get("id"), "milestone": ref.milestone.get("id"), "task": ref.task}
+
+    def get_runnable_tasks(self, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            now = time.time()
+            task_ids = self._scheduler.runnable(limit, skip=lambda task_id: self._is_leased(task_id, now))
+            return [self._task_index[task_id].task for task_id in task_ids]
+
+    def get_task(self, task_id: str) -> Optional[dict]:
+        ref = self._lookup(task_id)
+        if ref is None:
+            return None
+        return {
+            "epic": ref.epic.get("id"),
+            "milestone": ref.milestone.get("id"),
+            "feature": ref.feature.get("id"),
+            "task": ref.task,
+            "version": self._versions.get(task_id, 0)
+        }
+
+    def get_tasks_by_status(self, status: str) -> List[dict]:
+        # Tasks are listed in the order they entered the status.
+        self._ensure_loaded()
+        return [self._task_index[task_id].task for task_id in self._status_index.get(status, {})]
+
+    def query_tasks(self, status: Optional[str] = None, epic_id: Optional[str] = None,
+                    milestone_id: Optional[str] = None) -> List[dict]:
+        self._ensure_loaded()
+        if epic_id is None and milestone_id is None:
+            refs = sorted((self._task_index[task_id] for task_id in self._status_index.get(status, {})),
+                          key=lambda ref: ref.position) if status is not None else self._task_index.values()
+            return [ref.task for ref in refs]
+
+        scope = self._resolve_scope(epic_id, milestone_id)
+        if scope is None:
+            return []
+        refs = (self._task_index[task_id] for task_id in self._scope_tasks[scope])
+        return [ref.task for ref in refs if status is None or ref.task.get("status") == status]
+
+    def get_progress(self, epic_id: Optional[str] = None, milestone_id: Optional[str] = None,
+                     include_children: bool = False) -> Optional[dict]:
+        self._ensure_loaded()
+        scope = self._resolve_scope(epic_id, milestone_id)
+        if scope is None:
+            return None
+        result = _progress(scope[0] if scope else None, scope[1] if len(scope) > 1 else None, self._progress[scope])
+        if include_children:
+            result["children"] = [
+                _progress(child[0], child[1] if len(child) > 1 else None, self._progress[child])
+                for child in self._scope_children[scope]
+            ]
+        return result
+
+    def set_task_status(self, task_id: str, status: str, expected_version: Optional[int] = None) -> bool:
+        with self._lock:
+            ref = self._lookup(task_id)
+            if ref is None:
+                return False
+            if expected_version is not None and self._versions.get(task_id, 0) != expected_version:
+                logger.warning(f"Task '{task_id}' changed since version {expected_version}; status not updated.")
+                return False
+            self._write_status(ref, status)
+            return True
+
+    def claim_task(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        with self._lock:
+            now = time.time()
+            task_id = self._scheduler.peek(skip=lambda task_id: self._is_leased(task_id, now))
+            if task_id is None:
+                return None
+
+            claimed = self._task_index[task_id]
+            self._leases[task_id] = (owner, now + lease_seconds)
+            self._write_status(claimed, "In Progress")
+            logger.info(f"Task '{task_id}' leased to '{owner}' for {lease_seconds}s.")
+            return {
+                "epic": claimed.epic.get("id"),
+                "milestone": claimed.milestone.get("id"),
+                "task": claimed.task,
+                "version": self._versions.get(task_id, 0)
+            }
+
+    def renew_lease(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            if not self._holds_lease(task_id, owner):
+                return False
+            self._leases[task_id] = (owner, time.time() + lease_seconds)
+            return True
+
+    def release_task(self, task_id: str, owner: str, status: Optional[str] = None) -> bool:
+        with self._lock:
+            if not self._holds_lease(task_id, owner):
+                logger.warning(f"'{owner}' no longer holds the lease on task '{task_id}'.")
+                return False
+            if status is not None:
+                self._write_status(self._task_index[task_id], status)
+            del self._leases[task_id]
+            return True
+
+    def _is_leased(self, task_id: str, now: float) -> bool:
+        lease = self._leases.get(task_id)
+        return lease is not None and lease[1] > now
+
+    def _holds_lease(self, task_id: str, owner: str) -> bool:
+        lease = self._leases.get(task_id)
+        return lease is not None and lease[0] == owner and lease[1] > time.time()
+
+    def _write_status(self, ref: _TaskRef, status: str):
+        """
+        Applies a status change, bumps the task's version and journals the change (or queues it
+        for the write-behind thread).
+        """
+        task_id = ref.task.get("id")
+        self._set_status(ref, status)
+        self._versions[task_id] = self._versions.get(task_id, 0) + 1
+        entry = {"op": "set_status", "task_id": task_id, "status": status}
+        if self._writer is not None:
+            self._writer.submit(task_id, entry)
+            return
+        try:
+            self._journal_entries([entry], sync=False)
+        except OSError as e:
+            logger.error(f"Failed to journal status change for task '{task_id}': {e}", exc_info=True)
+
+    def _journal_entries(self, entries: List[dict], sync: bool = True):
+        """
+        Appends entries to the journal, syncing them if asked, and compacts it once it is long enough.
+        """
+        with self._journal_lock:
+            for entry in entries:
+                self._journal.append(entry)
+            if sync:
+                self._journal.sync()
+        if self._journal.entries >= self.compact_after:
+            self.compact()
+
+    def export_plan(self) -> dict:
+        # The live plan (plan nodes with compact_nodes); changes to it must go through the store
+        # to reach the indexes and the journal.
+        self._ensure_loaded()
+        return self.plan
+
+    def import_plan(self, plan: dict):
+        # Queued changes belong to the old plan; journal them before it is replaced.
+        self.flush()
+        if self._loader is not None:
+            self._loader.close()
+            self._loader = None
+        self.plan = Plan.from_dict(plan) if self.compact_nodes else plan
+        self._build_index()
+        self.compact()
+
+    def compact(self):
+        """
+        Folds the journal into a fresh, atomically written snapshot of the plan file and empties the journal.
+        """
+        with self._lock, self._journal_lock:
+            self._ensure_loaded()
+            logger.debug(f"Compacting {self._journal.entries} journal entries into {self.plan_file_path}")
+            try:
+                atomic_write_text(self.plan_file_path,
+                                  json.dumps(self.plan, separators=(",", ":"), default=json_default))
+                logger.info("Plan saved successfully.")
+            except IOError as e:
+                logger.error(f"Failed to save plan: {e}", exc_info=True)
+                return
+            self._journal.reset()
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            with self._journal_lock:
+                self._journal.sync()
+
+    def close(self):
+        """
+        Makes every change durable and releases the journal and plan files.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        with self._journal_lock:
+            self._journal.close()
+        if self._loader is not None:
+            self._loader.close()
+            self._loader = None
+
+    def _lookup(self, task_id: str) -> Optional[_TaskRef]:
+        # A task missing from a lazily loaded plan may be in a deferred branch.
+        ref = self._task_index.get(task_id)
+        if ref is None and self._loader is not None:
+            self._ensure_loaded()
+            ref = self._task_index.get(task_id)
+        return ref
+
+    def _replay_journal(self):
+        """
+        Re-applies mutations journaled since the last snapshot. Entries are idempotent, so
+        replaying a journal that was already folded into the snapshot is harmless.
+        """
+        entries = self._journal.replay()
+        for entry in entries:
+            if entry.get("op") == "set_status":
+                ref = self._lookup(entry.get("task_id"))
+                if ref is not None:
+                    self._set_status(ref, entry.get("status"))
+            else:
+                logger.warning(f"Ignoring unknown plan journal entry: {entry}")
+        if entries:
+            logger.debug(f"Replayed {len(entries)} plan journal entries.")
+
+    def _set_status(self, ref: _TaskRef, status: str):
+        """
+        Changes a task's status and keeps the status index, the progress aggregates and the scheduler in sync.
+        """
+        task_id = ref.task.get("id")
+        old_status = ref.task.get("status")
+        if old_status == status:
+            return
+
+        ref.task["status"] = status
+        bucket = self._status_index.get(old_status)
+        if bucket is not None:
+            bucket.pop(task_id, None)
+            if not bucket:
+                del self._status_index[old_status]
+        self._status_index.setdefault(status, {})[task_id] = None
+        scope = (ref.epic.get("id"), ref.milestone.get("id"))
+        self._count(scope, old_status, -1)
+        self._count(scope, status, 1)
+        self._scheduler.update_status(task_id, status)
+
+class SQLitePlanStore(PlanStore):
+    """
+    Stores the plan hierarchy in an indexed SQLite file, so very large plans are never held in memory.
+
+    Each node keeps its own fields as a JSON document, which makes export lossless; task status,
+    parent ids and document position are real columns. The current task is served by a partial
+    index over active tasks in active branches, and status lookups by a (status, position) index.
+
+    Dependencies are a table of (task, dependency) positions. Each task row keeps its count of
+    unmet dependencies and its critical-path length (computed on import), maintained on every
+    status change, so the next runnable task comes straight off a partial index ordered by
+    critical path.
+
+    Progress is kept in a `progress` table of task counts per scope and status, where a scope is
+    the plan, an epic or a milestone; every status change adjusts three rows, so progress queries
+    never scan the tasks.
+
+    Several processes can share one database: every write runs in a `BEGIN IMMEDIATE` transaction,
+    which takes SQLite's file lock up front, so claiming a task and checking a version are atomic
+    across processes. Leases live in their own table keyed by task position.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS plan_meta (data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS epics (
+            position INTEGER PRIMARY KEY, parent INTEGER, id TEXT, status TEXT, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS milestones (
+            position INTEGER PRIMARY KEY, parent INTEGER NOT NULL, id TEXT, status TEXT, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS features (
+            position INTEGER PRIMARY KEY, parent INTEGER NOT NULL, id TEXT, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS tasks (
+            position INTEGER PRIMARY KEY, parent INTEGER NOT NULL, id TEXT, status TEXT,
+            epic_id TEXT, milestone_id TEXT, feature_id TEXT, in_active_branch INTEGER NOT NULL,
+            data TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0,
+            unmet INTEGER NOT NULL DEFAULT 0, priority REAL NOT NULL DEFAULT 1);
+        CREATE TABLE IF NOT EXISTS leases (
+            task_position INTEGER PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS dependencies (
+            task_position INTEGER NOT NULL, dependency_position INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS progress (
+            scope TEXT NOT NULL, status TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (scope, status));
+        CREATE INDEX IF NOT EXISTS idx_dependencies_dependency ON dependencies (dependency_position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_scope ON tasks (epic_id, milestone_id, position);
+        CREATE INDEX IF NOT EXISTS idx_epics_id ON epics (id, position);
+        CREATE INDEX IF NOT EXISTS idx_milestones_id ON milestones (id, position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_id ON tasks (id, position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, position);
+    """
+
+    _INDEXES = """
+        DROP INDEX IF EXISTS idx_tasks_current;
+        CREATE INDEX IF NOT EXISTS idx_tasks_runnable ON tasks (priority DESC, position)
+            WHERE in_active_branch = 1 AND status IN ('Ready', 'In Progress') AND unmet = 0;
+    """
+
+    # Runnable tasks in scheduling order, served by idx_tasks_runnable.
+    _RUNNABLE = (
+        "FROM tasks INDEXED BY idx_tasks_runnable "
+        "WHERE in_active_branch = 1 AND status IN ('Ready', 'In Progress') AND unmet = 0"
+    )
+    _RUNNABLE_ORDER = "ORDER BY priority DESC, position"
+    _NOT_LEASED = "NOT EXISTS (SELECT 1 FROM leases WHERE task_position = position AND expires_at > ?)"
+
+    # Tables in hierarchy order, with the key under which each level is nested in its parent.
+    _LEVELS = (("epics", "epics"), ("milestones", "milestones"), ("features", "features"), ("tasks", "tasks"))
+
+    def __init__(self, db_path: str, busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Autocommit mode, so transactions are opened explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction() as conn:
+            for statement in self._SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            # Databases created by earlier versions gain the newer columns in place.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            for column, definition in (("version", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("unmet", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("priority", "REAL NOT NULL DEFAULT 1")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {definition}")
+            for statement in self._INDEXES.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            if conn.execute("SELECT 1 FROM progress LIMIT 1").fetchone() is None:
+                self._rebuild_progress(conn)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the block in a write transaction that holds the database lock from the start.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def is_empty(self) -> bool:
+        """
+        Returns True if no plan has been imported yet.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM plan_meta LIMIT 1").fetchone() is None
+
+    def get_current_task(self) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT epic_id, milestone_id, data {self._RUNNABLE} {self._RUNNABLE_ORDER} LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return _no_current_task()
+        task = json.loads(row[2])
+        logger.debug(f"Current task found: {task.get('id')}")
+        return {"epic": row[0], "milestone": row[1], "task": task}
+
+    def get_runnable_tasks(self, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data {self._RUNNABLE} AND {self._NOT_LEASED} {self._RUNNABLE_ORDER} LIMIT ?",
+                (time.time(), -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_task(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT epic_id, milestone_id, feature_id, data, version FROM tasks WHERE id = ? "
+                "ORDER BY position LIMIT 1",
+                (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"epic": row[0], "milestone": row[1], "feature": row[2], "task": json.loads(row[3]), "version": row[4]}
+
+    def get_tasks_by_status(self, status: str) -> List[dict]:
+        # Tasks are listed in document order.
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM tasks WHERE status = ? ORDER BY position", (status,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def query_tasks(self, status: Optional[str] = None, epic_id: Optional[str] = None,
+                    milestone_id: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            if milestone_id is not None and epic_id is None:
+                epic_id = self._milestone_epic(milestone_id)
+                if epic_id is None:
+                    return []
+            clauses, params = [], []
+            for column, value in (("status", status), ("epic_id", epic_id), ("milestone_id", milestone_id)):
+                if value is not None:
+                    clauses.append(f"{column} = ?")
+                    params.append(value)
+            where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+            rows = self._conn.execute(f"SELECT data FROM tasks {where}ORDER BY position", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_progress(self, epic_id: Optional[str] = None, milestone_id: Optional[str] = None,
+                     include_children: bool = False) -> Optional[dict]:
+        with self._lock:
+            conn = self._conn
+            if milestone_id is not None:
+                if epic_id is None:
+                    epic_id = self._milestone_epic(milestone_id)
+                exists = epic_id is not None and conn.execute(
+                    "SELECT 1 FROM milestones JOIN epics ON epics.position = milestones.parent "
+                    "WHERE milestones.id = ? AND epics.id = ? LIMIT 1", (milestone_id, epic_id)
+                ).fetchone()
+                children = []
+            elif epic_id is not None:
+                exists = conn.execute("SELECT 1 FROM epics WHERE id = ? LIMIT 1", (epic_id,)).fetchone()
+                children = conn.execute(
+                    "SELECT DISTINCT milestones.id FROM milestones JOIN epics ON epics.position = milestones.parent "
+                    "WHERE epics.id = ? ORDER BY milestones.position", (epic_id,)
+                ).fetchall() if include_children else []
+            else:
+                exists = True
+                children = conn.execute(
+                    "SELECT DISTINCT id FROM epics ORDER BY position"
+                ).fetchall() if include_children else []
+            if not exists:
+                return None
+
+            scope = tuple(value for value in (epic_id, milestone_id) if value is not None)
+            result = _progress(epic_id, milestone_id, self._progress_counts(scope))
+            if include_children:
+                result["children"] = [
+                    _progress(child[0], child[1] if len(child) > 1 else None, self._progress_counts(child))
+                    for child in (scope + (child_id,) for (child_id,) in children)
+                ]
+        return result
+
+    def _milestone_epic(self, milestone_id: str) -> Optional[str]:
+        # A milestone given without its epic means the first milestone with that id.
+        row = self._conn.execute(
+            "SELECT epics.id FROM milestones JOIN epics ON epics.position = milestones.parent "
+            "WHERE milestones.id = ? ORDER BY milestones.position LIMIT 1", (milestone_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _progress_counts(self, scope: tuple) -> dict:
+        rows = self._conn.execute(
+            "SELECT status, count FROM progress WHERE scope = ?", (self._scope_key(scope),)
+        ).fetchall()
+        return {status or None: count for status, count in rows if count}
+
+    @staticmethod
+    def _scope_key(scope: tuple) -> str:
+        # () is the plan, (epic_id,) an epic and (epic_id, milestone_id) a milestone.
+        return json.dumps(list(scope), separators=(",", ":")) if scope else ""
+
+    @classmethod
+    def _count(cls, conn, epic_id: Optional[str], milestone_id: Optional[str], status: Optional[str], delta: int):
+        for scope in ((), (epic_id,), (epic_id, milestone_id)):
+            conn.execute(
+                "INSERT INTO progress (scope, status, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (scope, status) DO UPDATE SET count = count + excluded.count",
+                (cls._scope_key(scope), status or "", delta)
+            )
+
+    @classmethod
+    def _rebuild_progress(cls, conn):
+        """
+        Recomputes the progress table from the tasks.
+        """
+        conn.execute("DELETE FROM progress")
+        counts = {}
+        for epic_id, milestone_id, status, count in conn.execute(
+                "SELECT epic_id, milestone_id, status, COUNT(*) FROM tasks GROUP BY epic_id, milestone_id, status"):
+            for scope in ((), (epic_id,), (epic_id, milestone_id)):
+                key = (cls._scope_key(scope), status or "")
+                counts[key] = counts.get(key, 0) + count
+        conn.executemany("INSERT INTO progress (scope, status, count) VALUES (?, ?, ?)",
+                         [(scope, status, count) for (scope, status), count in counts.items()])
+
+    def set_task_status(self, task_id: str, status: str, expected_version: Optional[int] = None) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT position, data, version FROM tasks WHERE id = ? ORDER BY position LIMIT 1", (task_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            if expected_version is not None and row[2] != expected_version:
+                logger.warning(f"Task '{task_id}' changed since version {expected_version}; status not updated.")
+                return False
+            self._write_status(conn, row[0], row[1], status)
+        return True
+
+    def claim_task(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT position, epic_id, milestone_id, data {self._RUNNABLE} AND {self._NOT_LEASED} "
+                f"{self._RUNNABLE_ORDER} LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            position, epic_id, milestone_id, data = row
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (task_position, owner, expires_at) VALUES (?, ?, ?)",
+                (position, owner, now + lease_seconds)
+            )
+            task, version = self._write_status(conn, position, data, "In Progress")
+        logger.info(f"Task '{task.get('id')}' leased to '{owner}' for {lease_seconds}s.")
+        return {"epic": epic_id, "milestone": milestone_id, "task": task, "version": version}
+
+    def renew_lease(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE owner = ? AND expires_at > ? "
+                "AND task_position = (SELECT position FROM tasks WHERE id = ? ORDER BY position LIMIT 1)",
+                (now + lease_seconds, owner, now, task_id)
+            )
+            return cursor.rowcount == 1
+
+    def release_task(self, task_id: str, owner: str, status: Optional[str] = None) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tasks.position, tasks.data FROM tasks JOIN leases ON leases.task_position = tasks.position "
+                "WHERE tasks.id = ? AND leases.owner = ? AND leases.expires_at > ? ORDER BY tasks.position LIMIT 1",
+                (task_id, owner, time.time())
+            ).fetchone()
+            if row is None:
+                logger.warning(f"'{owner}' no longer holds the lease on task '{task_id}'.")
+                return False
+            if status is not None:
+                self._write_status(conn, row[0], row[1], status)
+            conn.execute("DELETE FROM leases WHERE task_position = ?", (row[0],))
+        return True
+
+    @classmethod
+    def _write_status(cls, conn, position: int, data: str, status: str):
+        """
+        Sets a task's status and bumps its version inside the caller's transaction, releasing or
+        blocking its dependents and moving it between progress counts. Returns the updated task and
+        its new version.
+        """
+        task = json.loads(data)
+        old_status = task.get("status")
+        task["status"] = status
+        conn.execute(
+            "UPDATE tasks SET status = ?, data = ?, version = version + 1 WHERE position = ?",
+            (status, json.dumps(task, separators=(",", ":"), default=json_default), position)
+        )
+        if (status == DONE_STATUS) != (old_status == DONE_STATUS):
+            conn.execute(
+                "UPDATE tasks SET unmet = unmet + ? WHERE position IN "
+                "(SELECT task_position FROM dependencies WHERE dependency_position = ?)",
+                (-1 if status == DONE_STATUS else 1, position)
+            )
+        version, epic_id, milestone_id = conn.execute(
+            "SELECT version, epic_id, milestone_id FROM tasks WHERE position = ?", (position,)
+        ).fetchone()
+        if status != old_status:
+            cls._count(conn, epic_id, milestone_id, old_status, -1)
+            cls._count(conn, epic_id, milestone_id, status, 1)
+        return task, version
+
+    def export_plan(self) -> dict:
+        with self._lock:
+            # One read transaction, so the levels come from the same snapshot while others write.
+            self._conn.execute("BEGIN")
+            try:
+                meta = self._conn.execute("SELECT data FROM plan_meta").fetchone()
+                rows = [
+                    self._conn.execute(f"SELECT position, parent, data FROM {table} ORDER BY position").fetchall()
+                    for table, _ in self._LEVELS
+                ]
+            finally:
+                self._conn.execute("COMMIT")
+
+        # Rebuild the hierarchy top-down; each node's child list was stored empty where it existed.
+        plan = json.loads(meta[0]) if meta else {"epics": []}
+        parents = {None: plan}
+        for level_rows, (_, key) in zip(rows, self._LEVELS):
+            level = {}
+            for position, parent, data in level_rows:
+                node = json.loads(data)
+                parents[parent].setdefault(key, []).append(node)
+                level[position] = node
+            parents = level
+        return plan
+
+    def import_plan(self, plan: dict):
+        self._import(plan, replace=True)
+
+    def seed_plan(self, plan: dict) -> bool:
+        """
+        Imports the plan only if the database holds none yet, so concurrent workers seed it once.
+        Returns True if this call imported it.
+        """
+        return self._import(plan, replace=False)
+
+    def _import(self, plan: dict, replace: bool) -> bool:
+        meta = {key: ([] if key == "epics" else value) for key, value in plan.items()}
+
+        epic_rows, milestone_rows, feature_rows, task_rows = [], [], [], []
+        for epic in plan.get("epics", []):
+            epic_position = len(epic_rows)
+            epic_rows.append((epic_position, None, epic.get("id"), epic.get("status"), self._node_data(epic, "epic")))
+            for milestone in epic.get("milestones", []):
+                milestone_position = len(milestone_rows)
+                milestone_rows.append((milestone_position, epic_position, milestone.get("id"),
+                                       milestone.get("status"), self._node_data(milestone, "milestone")))
+                in_active_branch = int(epic.get("status") == "In Progress" and milestone.get("status") == "In Progress")
+                for feature in milestone.get("features", []):
+                    feature_position = len(feature_rows)
+                    feature_rows.append((feature_position, milestone_position, feature.get("id"),
+                                         self._node_data(feature, "feature")))
+                    for task in feature.get("tasks", []):
+                        task_rows.append([len(task_rows), feature_position, task.get("id"), task.get("status"),
+                                          epic.get("id"), milestone.get("id"), feature.get("id"), in_active_branch,
+                                          json.dumps(task, separators=(",", ":"), default=json_default),
+                                          task.get("depends_on") or (), task.get("estimate", 1)])
+        dependency_rows = self._schedule_rows(task_rows)
+
+        with self._transaction() as conn:
+            if not replace and conn.execute("SELECT 1 FROM plan_meta LIMIT 1").fetchone() is not None:
+                return False
+            for table in ("plan_meta", "epics", "milestones", "features", "tasks", "leases", "dependencies",
+                          "progress"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("INSERT INTO plan_meta (data) VALUES (?)", (json.dumps(meta, default=json_default),))
+            conn.executemany("INSERT INTO epics VALUES (?, ?, ?, ?, ?)", epic_rows)
+            conn.executemany("INSERT INTO milestones VALUES (?, ?, ?, ?, ?)", milestone_rows)
+            conn.executemany("INSERT INTO features VALUES (?, ?, ?, ?)", feature_rows)
+            conn.executemany(
+                "INSERT INTO tasks (position, parent, id, status, epic_id, milestone_id, feature_id, "
+                "in_active_branch, data, unmet, priority) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                task_rows
+            )
+            conn.executemany("INSERT INTO dependencies VALUES (?, ?)", dependency_rows)
+            self._rebuild_progress(conn)
+        logger.info(f"Imported plan into {self.db_path} ({len(task_rows)} tasks).")
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _schedule_rows(task_rows: List[list]) -> List[tuple]:
+        """
+        Replaces the trailing (depends_on, estimate) of each task row with its unmet-dependency count
+        and critical-path length, and returns the (task, dependency) position pairs.
+        """
+        first_position = {}
+        specs = {}
+        for row in task_rows:
+            position, task_id, status, depends_on, estimate = row[0], row[2], row[3], row[9], row[10]
+            if task_id not in first_position:
+                first_position[task_id] = position
+                specs[task_id] = TaskSpec(task_id, position, status, depends_on, estimate, bool(row[7]))
+
+        dependents = {}
+        for task_id, spec in specs.items():
+            for dependency in spec.depends_on:
+                if dependency in specs:
+                    dependents.setdefault(dependency, []).append(task_id)
+        lengths = critical_path_lengths(specs, dependents)
+
+        dependency_rows = []
+        for row in task_rows:
+            position, task_id, depends_on = row[0], row[2], row[9]
+            unmet = 0
+            for dependency in depends_on:
+                dependency_position = first_position.get(dependency)
+                if dependency_position is None:
+                    unmet += 1  # unknown dependencies are never met
+                    continue
+                dependency_rows.append((position, dependency_position))
+                if specs[dependency].status != DONE_STATUS:
+                    unmet += 1
+            if task_id not in lengths:
+                unmet += 1  # on a dependency cycle: never runnable
+            row[9:] = [unmet, lengths.get(task_id, 0)]
+        return dependency_rows
+
+    @staticmethod
+    def _node_data(node: dict, level: str) -> str:
+        # Children live in their own table; an existing child list is stored empty so export restores it in place.
+        child_key = _CHILD_KEYS[level]
+        data = {key: ([] if key == child_key else value) for key, value in node.items()}
+        return json.dumps(data, separators=(",", ":"), default=json_default)
@@ -0,0 +1,124 @@
+# Jules for Hugging Face - Incremental Prompt Builder
+
+import json
+from collections import deque
+
+def _compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+class IncrementalPromptBuilder:
+    """
+    Builds the agent prompt turn by turn without re-serializing unchanged content.
+
+    The static prefix (persona, task and tool catalog) is cached until the task or the tools change,
+    and conversation history is treated as append-only: each turn only serializes entries added since
+    the previous build. When the history is a ShortTermMemory, entries it evicts are dropped from the
+    front and its rolling summary is re-rendered only when it changes. A running character count gives
+    a cheap token estimate for the whole prompt.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    RESPONSE_INSTRUCTIONS = """
+Based on the task and history, what is the next logical action? Your response must be a single JSON object with one of the following structures:
+1. To execute a tool: {"action": "execute_tool", "tool_name": "...", "parameters": {...}}
+2. To execute several independent tool calls in parallel: {"action": "execute_tools", "tool_calls": [{"tool_name": "...", "parameters": {...}}, ...]}
+3. To ask the user a question: {"action": "ask_user", "question": "..."}
+4. To complete the task: {"action": "complete_task", "final_message": "..."}
+""".strip()
+
+    def __init__(self):
+        self._prefix_key = None
+        self._prefix = ""
+
+        self._history_source = None
+        self._history_parts = deque()
+        self._consumed = 0
+        self._dropped = 0
+        self._summary_version = None
+        self._summary_part = ""
+
+        self.char_count = 0
+
+    def build(self, state: dict) -> str:
+        """
+        Returns the prompt for the given state, reusing cached work from previous calls.
+        """
+        self._update_prefix(state)
+        self._update_history(state.get("short_term_memory", []))
+
+        # Joining already-serialized parts is a plain copy; no entry is re-encoded.
+        parts = self._history_parts
+        if self._summary_part:
+            parts = [self._summary_part, *parts]
+        history = "\n".join(parts) if parts else "(none)"
+        prompt = f"{self._prefix}\n\n**Conversation History:**\n{history}\n\n{self.RESPONSE_INSTRUCTIONS}"
+        self.char_count = len(prompt)
+        return prompt
+
+    @property
+    def token_estimate(self) -> int:
+        """
+        Approximate token count of the most recently built prompt.
+        """
+        return self.char_count // self.CHARS_PER_TOKEN
+
+    def reset(self):
+        """
+        Discards all cached state so the next build starts from scratch.
+        """
+        self._prefix_key = None
+        self._history_source = None
+
+    def _update_prefix(self, state: dict):
+        task_title = state.get('current_task', {}).get('title', 'No task specified.')
+        tools = state.get('available_tools', [])
+
+        key = (task_title, tools)
+        if self._prefix_key is not None and self._prefix_key == key:
+            return
+
+        # Keep a private copy so later in-place changes to the caller's tool list are still detected.
+        self._prefix_key = (task_title, json.loads(_compact_json(tools)))
+        self._prefix = (
+            "You are Jules, a skilled software engineering assistant. Your goal is to complete the following task:\n"
+            f"**Task:** {task_title}\n\n"
+            f"**Available Tools:**\n{_compact_json(tools)}"
+        )
+
+    def _update_history(self, entries):
+        if hasattr(entries, "entries_since"):
+            self._update_memory_history(entries)
+            return
+
+        if entries is not self._history_source or len(entries) < self._consumed:
+            self._reset_history(entries)
+
+        for index in range(self._consumed, len(entries)):
+            self._history_parts.append(_compact_json(entries[index]))
+        self._consumed = len(entries)
+
+    def _update_memory_history(self, memory):
+        if memory is not self._history_source or memory.appended_count < self._consumed:
+            self._reset_history(memory)
+
+        for _ in range(min(memory.evicted_count - self._dropped, len(self._history_parts))):
+            self._history_parts.popleft()
+        self._dropped = memory.evicted_count
+
+        for entry in memory.entries_since(self._consumed):
+            self._history_parts.append(_compact_json(entry))
+        self._consumed = memory.appended_count
+
+        if memory.summary_version != self._summary_version:
+            summary = memory.summary
+            self._summary_part = _compact_json({"role": "system", "summary": summary}) if summary else ""
+            self._summary_version = memory.summary_version
+
+    def _reset_history(self, entries):
+        self._history_source = entries
+        self._history_parts = deque()
+        self._consumed = 0
+        self._dropped = 0
+        self._summary_version = None
+        self._summary_part = ""
@@ -0,0 +1,457 @@
+# Jules for Hugging Face - LLM Resilience Layer
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Optional
+from .config import config
+from .exceptions import ConfigurationError, LLMError, LLMResponseError
+from .llm_provider import LLMProvider
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Returns True if a failed LLM call may succeed when retried: timeouts, connection failures and
+    HTTP 429 or 5xx responses. Providers wrap backend errors in LLMError, so the chain of causes
+    is followed; anything else (bad answers, auth or other 4xx errors, configuration) is permanent.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (LLMResponseError, ConfigurationError)):
+            return False
+        if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+            return True
+        status = _status_code(error)
+        if status is not None:
+            return status == 429 or status >= 500
+        # Client libraries' own timeout and connection errors (requests, aiohttp, httpx, ...).
+        if any("Timeout" in cls.__name__ or "Connect" in cls.__name__ for cls in type(error).__mro__):
+            return True
+        error = error.__cause__
+    return False
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for status in (getattr(error, "status_code", None),
+                   getattr(getattr(error, "response", None), "status_code", None),
+                   getattr(error, "status", None)):
+        if isinstance(status, int):
+            return status
+    return None
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests fail fast.
+    Once `reset_timeout` seconds have passed a single trial request is let through (half-open);
+    its outcome closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        The current breaker state; an open breaker whose timeout has elapsed reports as half-open.
+        """
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a request may be sent now.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Closes the circuit and resets the failure count.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_inconclusive(self):
+        """
+        Ends a request whose outcome says nothing about the backend's health (e.g. an auth error):
+        the state is left unchanged, but a half-open trial slot is freed for the next request.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Counts a failure, opening the circuit at the threshold or when a half-open trial fails.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"LLM circuit breaker opened after {self._failures} consecutive failures.")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of recent call latencies and reports percentiles over it.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """
+        Adds a latency sample, dropping the oldest once the window is full.
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the q-th percentile (0-100) of the window, or None if it is empty.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(round(q / 100.0 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
+
+
+class ResilientLLMProvider(LLMProvider):
+    """
+    Wraps an LLM provider with hedged requests, jittered exponential-backoff retries and a circuit breaker.
+
+    - Hedging: if a call has not returned after the p95 of recent latencies, a duplicate request is sent
+      and whichever finishes first wins.
+    - Retries: transient failures (timeouts, connection errors, HTTP 429 and 5xx) are retried with
+      full-jitter exponential backoff, limited by a retry budget so that retries cannot multiply load
+      during an outage. Other errors are raised at once.
+    - Circuit breaker: after repeated failures calls fail fast with LLMError until the backend recovers.
+
+    Streaming calls are retried but never hedged: the losing stream could not be closed and would
+    keep generating (and billing) tokens.
+
+    Unusable answers (LLMResponseError) show the backend is answering and count as healthy for the
+    breaker. Other permanent errors (e.g. a 401) are not retried and leave the breaker unchanged.
+    """
+
+    def __init__(self, provider: LLMProvider, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, retry_budget_ratio: float = 0.2, hedging: bool = True,
+                 hedge_initial_delay: float = 2.0, hedge_min_samples: int = 20, attempt_timeout: Optional[float] = 120.0,
+                 breaker: Optional[CircuitBreaker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.provider = provider
+        self.model_id = getattr(provider, "model_id", None)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget_ratio = retry_budget_ratio
+        self.hedging = hedging
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.attempt_timeout = attempt_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyTracker()
+        self._sleep = sleep
+
+        self.metrics = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "failures": 0,
+            "short_circuited": 0,
+        }
+        self._metrics_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, provider: LLMProvider) -> LLMProvider:
+        """
+        Wraps a provider according to the `llm.resilience` configuration section.
+        Returns the provider unchanged when the section is disabled.
+        """
+        resilience_config = config.get("llm", {}).get("resilience", {})
+        if not resilience_config.get("enabled", False):
+            return provider
+
+        return cls(
+            provider,
+            max_retries=resilience_config.get("max_retries", 3),
+            backoff_base=resilience_config.get("backoff_base", 0.5),
+            backoff_max=resilience_config.get("backoff_max", 8.0),
+            retry_budget_ratio=resilience_config.get("retry_budget_ratio", 0.2),
+            hedging=resilience_config.get("hedging", True),
+            hedge_initial_delay=resilience_config.get("hedge_initial_delay", 2.0),
+            attempt_timeout=resilience_config.get("attempt_timeout", 120.0),
+            breaker=CircuitBreaker(
+                failure_threshold=resilience_config.get("failure_threshold", 5),
+                reset_timeout=resilience_config.get("reset_timeout", 30.0),
+            ),
+        )
+
+    def get_structured_response(self, prompt: str) -> dict:
+        """
+        Calls the wrapped provider with hedging, retries and circuit breaking.
+        """
+        return self._call_with_retries(lambda: self.provider.get_structured_response(prompt))
+
+    def stream_structured_response(self, prompt: str, action_validator: Optional[Callable[[str], bool]] = None) -> dict:
+        """
+        Streaming variant of `get_structured_response`; retried but never hedged.
+        """
+        return self._call_with_retries(lambda: self.provider.stream_structured_response(prompt, action_validator),
+                                       hedge=False)
+
+    async def aget_structured_response(self, prompt: str) -> dict:
+        """
+        Asynchronous variant of `get_structured_response`; a losing hedge is cancelled rather than abandoned.
+        """
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            try:
+                response = await self._ahedged(lambda: self.provider.aget_structured_response(prompt))
+            except LLMResponseError:
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.record_inconclusive()
+                    raise
+                self._record_attempt_failure(e)
+                delay = self._next_retry_delay(attempt, e)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return response
+
+    def stats(self) -> dict:
+        """
+        Returns the hedge/retry/breaker counters together with the current hedge delay.
+        """
+        with self._metrics_lock:
+            stats = dict(self.metrics)
+        stats["hedge_delay"] = self.hedge_delay()
+        stats["p95_latency"] = self.latencies.percentile(95)
+        stats["breaker_state"] = self.breaker.state
+        return stats
+
+    def hedge_delay(self) -> float:
+        """
+        Seconds to wait before hedging: the observed p95 once enough samples exist, else the initial delay.
+        """
+        if len(self.latencies) < self.hedge_min_samples:
+            return self.hedge_initial_delay
+        return self.latencies.percentile(95)
+
+    def invalidate(self, prompt: str):
+        """
+        Forwards cache invalidation to the wrapped provider, if it supports it.
+        """
+        invalidate = getattr(self.provider, "invalidate", None)
+        if invalidate is not None:
+            invalidate(prompt)
+
+    def _call_with_retries(self, call: Callable[[], dict], hedge: bool = True) -> dict:
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            try:
+                response = self._hedged(call, hedge)
+            except LLMResponseError:
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.record_inconclusive()
+                    raise
+                self._record_attempt_failure(e)
+                self._sleep(self._next_retry_delay(attempt, e))
+                continue
+            self.breaker.record_success()
+            return response
+
+    def _admit(self):
+        if not self.breaker.allow_request():
+            self._count("short_circuited")
+            raise LLMError("LLM circuit breaker is open; failing fast until the backend recovers.")
+        self._count("attempts")
+
+    def _record_attempt_failure(self, error: Exception):
+        self.breaker.record_failure()
+        self._count("failures")
+        logger.warning(f"LLM call failed: {error}")
+
+    def _next_retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Returns the backoff before the next attempt, or re-raises `error` if no retry is allowed.
+        """
+        if attempt >= self.max_retries:
+            raise self._as_llm_error(error)
+
+        with self._metrics_lock:
+            budget = 10 + self.retry_budget_ratio * self.metrics["calls"]
+            if self.metrics["retries"] >= budget:
+                self.metrics["retries_denied"] += 1
+                allowed = False
+            else:
+                self.metrics["retries"] += 1
+                allowed = True
+        if not allowed:
+            raise self._as_llm_error(error)
+
+        # Full jitter spreads retries from concurrent callers instead of synchronizing them.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _as_llm_error(error: Exception) -> LLMError:
+        if isinstance(error, LLMError):
+            return error
+        wrapped = LLMError(f"LLM call failed: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+
+    def _hedged(self, call: Callable[[], dict], hedge: bool = True) -> dict:
+        # The attempt's deadline starts with the primary request, not with the hedge.
+        deadline = None if self.attempt_timeout is None else time.monotonic() + self.attempt_timeout
+        primary = self._submit(call)
+        if not (self.hedging and hedge):
+            done, _ = wait([primary], timeout=self.attempt_timeout)
+            if not done:
+                raise TimeoutError(f"LLM call did not complete within {self.attempt_timeout} seconds.")
+            return primary.result()
+
+        hedge_delay = self.hedge_delay()
+        if deadline is not None:
+            hedge_delay = min(hedge_delay, self.attempt_timeout)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"LLM call did not complete within {self.attempt_timeout} seconds.")
+
+        self._count("hedges")
+        hedge = self._submit(call)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"LLM call did not complete within {self.attempt_timeout} seconds.")
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    # The losing request cannot be interrupted; its result is simply discarded.
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _ahedged(self, call) -> dict:
+        deadline = None if self.attempt_timeout is None else time.monotonic() + self.attempt_timeout
+        primary = asyncio.ensure_future(self._atimed(call))
+        if not self.hedging:
+            return await asyncio.wait_for(primary, self.attempt_timeout)
+
+        hedge_delay = self.hedge_delay()
+        if deadline is not None:
+            hedge_delay = min(hedge_delay, self.attempt_timeout)
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+        if deadline is not None and time.monotonic() >= deadline:
+            primary.cancel()
+            raise TimeoutError(f"LLM call did not complete within {self.attempt_timeout} seconds.")
+
+        self._count("hedges")
+        hedge = asyncio.ensure_future(self._atimed(call))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM call did not complete within {self.attempt_timeout} seconds.")
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _submit(self, call: Callable[[], dict]) -> Future:
+        """
+        Runs a call on a daemon thread so a hung request can never block interpreter shutdown.
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._timed(call))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+        return future
+
+    def _timed(self, call: Callable[[], dict]) -> dict:
+        started = time.monotonic()
+        response = call()
+        self.latencies.record(time.monotonic() - started)
+        return response
+
+    async def _atimed(self, call) -> dict:
+        started = time.monotonic()
+        response = await call()
+        self.latencies.record(time.monotonic() - started)
+        return response
+
+    def _count(self, name: str, amount: int = 1):
+        with self._metrics_lock:
+            self.metrics[name] += amount
@@ -0,0 +1,176 @@
+# Jules for Hugging Face - Dependency-Aware Task Scheduler
+
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+ACTIVE_STATUSES = ("Ready", "In Progress")
+DONE_STATUS = "Completed"
+
+class TaskSpec:
+    """
+    What the scheduler needs to know about one task.
+    """
+    __slots__ = ("task_id", "position", "status", "depends_on", "estimate", "in_active_branch")
+
+    def __init__(self, task_id: str, position: int, status: str, depends_on: Sequence[str] = (),
+                 estimate: float = 1, in_active_branch: bool = True):
+        self.task_id = task_id
+        self.position = position
+        self.status = status
+        self.depends_on = tuple(depends_on or ())
+        self.estimate = estimate if isinstance(estimate, (int, float)) and estimate >= 0 else 1
+        self.in_active_branch = in_active_branch
+
+def critical_path_lengths(specs: Dict[str, TaskSpec], dependents: Dict[str, List[str]]) -> Dict[str, float]:
+    """
+    Returns, for every task, the total estimate of the longest chain of unfinished work that starts
+    with it and follows its dependents. Completed tasks weigh nothing. Tasks on a dependency cycle
+    get no entry.
+    """
+    indegree = {task_id: 0 for task_id in specs}
+    for task_id, spec in specs.items():
+        for dependency in spec.depends_on:
+            if dependency in specs:
+                indegree[task_id] += 1
+
+    # Kahn's algorithm yields a topological order; walking it backwards sees dependents first.
+    order = []
+    queue = deque(task_id for task_id, degree in indegree.items() if degree == 0)
+    while queue:
+        task_id = queue.popleft()
+        order.append(task_id)
+        for dependent in dependents.get(task_id, ()):
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                queue.append(dependent)
+
+    if len(order) < len(specs):
+        cyclic = sorted(task_id for task_id, degree in indegree.items() if degree > 0)
+        logger.error(f"Dependency cycle among tasks {cyclic}; they will never be runnable.")
+
+    lengths = {}
+    for task_id in reversed(order):
+        spec = specs[task_id]
+        weight = 0 if spec.status == DONE_STATUS else spec.estimate
+        lengths[task_id] = weight + max((lengths[d] for d in dependents.get(task_id, ()) if d in lengths), default=0)
+    return lengths
+
+class TaskScheduler:
+    """
+    A ready queue of runnable tasks, ordered by critical-path length and then document position.
+
+    A task is runnable when it is 'Ready' or 'In Progress', sits in an 'In Progress' epic and
+    milestone, and every task it `depends_on` is 'Completed'. Unknown dependencies never count as
+    completed. The dependency graph and each task's count of unmet dependencies are built once;
+    a status change only touches the task and its direct dependents, and the queue is a heap with
+    lazy deletion, so taking the next runnable task costs O(log n).
+
+    Critical-path lengths are computed when the scheduler is built. Completing a task only shortens
+    the paths of tasks that depend on it being done, which were not runnable anyway, so the order
+    of the runnable tasks stays accurate without recomputation.
+    """
+
+    def __init__(self, specs: Iterable[TaskSpec]):
+        self._specs = {}
+        for spec in specs:
+            self._specs.setdefault(spec.task_id, spec)
+
+        self._dependents = {}
+        self._unmet = {}
+        for task_id, spec in self._specs.items():
+            unmet = 0
+            for dependency in spec.depends_on:
+                dependency_spec = self._specs.get(dependency)
+                if dependency_spec is None:
+                    logger.warning(f"Task '{task_id}' depends on unknown task '{dependency}'.")
+                    unmet += 1
+                    continue
+                self._dependents.setdefault(dependency, []).append(task_id)
+                if dependency_spec.status != DONE_STATUS:
+                    unmet += 1
+            self._unmet[task_id] = unmet
+
+        self._priority = critical_path_lengths(self._specs, self._dependents)
+        self._queue = [self._entry(task_id) for task_id in self._specs if self.is_runnable(task_id)]
+        heapq.heapify(self._queue)
+        logger.debug(f"Scheduler built for {len(self._specs)} tasks; {len(self._queue)} runnable.")
+
+    def _entry(self, task_id: str):
+        return (-self._priority.get(task_id, 0), self._specs[task_id].position, task_id)
+
+    def is_runnable(self, task_id: str) -> bool:
+        """
+        Returns True if the task can be worked on now.
+        """
+        spec = self._specs.get(task_id)
+        return (spec is not None and spec.in_active_branch and spec.status in ACTIVE_STATUSES
+                and self._unmet[task_id] == 0 and task_id in self._priority)
+
+    def unmet_dependencies(self, task_id: str) -> int:
+        """
+        Returns how many of the task's dependencies are not completed yet.
+        """
+        return self._unmet.get(task_id, 0)
+
+    def critical_path(self, task_id: str) -> float:
+        """
+        Returns the task's critical-path length (0 for tasks on a dependency cycle).
+        """
+        return self._priority.get(task_id, 0)
+
+    def update_status(self, task_id: str, status: str):
+        """
+        Records a task's new status, releasing or blocking its dependents as needed.
+        """
+        spec = self._specs.get(task_id)
+        if spec is None or spec.status == status:
+            return
+        was_done = spec.status == DONE_STATUS
+        spec.status = status
+
+        if status == DONE_STATUS and not was_done:
+            for dependent in self._dependents.get(task_id, ()):
+                self._unmet[dependent] -= 1
+                if self.is_runnable(dependent):
+                    heapq.heappush(self._queue, self._entry(dependent))
+        elif was_done and status != DONE_STATUS:
+            # Dependents that were runnable are blocked again; their queue entries go stale.
+            for dependent in self._dependents.get(task_id, ()):
+                self._unmet[dependent] += 1
+
+        if self.is_runnable(task_id):
+            heapq.heappush(self._queue, self._entry(task_id))
+
+    def peek(self, skip: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Returns the id of the highest-priority runnable task, ignoring tasks for which `skip` is true.
+        """
+        runnable = self.runnable(1, skip)
+        return runnable[0] if runnable else None
+
+    def runnable(self, limit: Optional[int] = None, skip: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        Returns up to `limit` runnable task ids in priority order, for dispatching independent tasks
+        in parallel. Costs O(k log n) for k returned or skipped tasks.
+        """
+        queue = self._queue
+        taken = []
+        result = []
+        seen = set()
+        while queue and (limit is None or len(result) < limit):
+            entry = heapq.heappop(queue)
+            task_id = entry[2]
+            if task_id in seen or not self.is_runnable(task_id):
+                # A stale or duplicate entry left behind by a status change.
+                continue
+            seen.add(task_id)
+            taken.append(entry)
+            if skip is None or not skip(task_id):
+                result.append(task_id)
+        for entry in taken:
+            heapq.heappush(queue, entry)
+        return result
@@ -0,0 +1,123 @@
+# Jules for Hugging Face - Session Checkpoints
+
+import json
+import os
+from typing import Optional
+from .config import config
+from .logging import get_logger
+from .memory import ShortTermMemory
+from .plan_journal import PlanJournal, atomic_write_text
+
+logger = get_logger(__name__)
+
+class SessionCheckpointer:
+    """
+    Persists the agent's session after every step so a crashed process can pick up where it left
+    off without asking the LLM again.
+
+    A session is the short-term memory plus a few named fields (current task, pending action,
+    LLM cache key, ...). Its last full snapshot lives in `session.json`; each checkpoint after that
+    appends only what changed (new memory entries, changed fields) as one line to `session.journal`,
+    using the same flushed, group-fsynced journal as the plan store. After `snapshot_every` deltas
+    the journal is folded into a new snapshot. Resuming reads the snapshot and replays the deltas,
+    which takes milliseconds.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 50, fsync_batch: int = 1, fsync_interval: float = 1.0):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.snapshot_path = os.path.join(directory, "session.json")
+        os.makedirs(directory, exist_ok=True)
+        self._journal = PlanJournal(os.path.join(directory, "session.journal"), fsync_batch=fsync_batch,
+                                    fsync_interval=fsync_interval)
+        self._memory_state = None
+        self._fields = {}
+
+    @classmethod
+    def from_config(cls) -> Optional["SessionCheckpointer"]:
+        """
+        Creates a checkpointer according to the `session.checkpoint` configuration section, or
+        returns None when checkpoints are disabled.
+        """
+        checkpoint_config = config.get("session", {}).get("checkpoint", {})
+        if not checkpoint_config.get("enabled", False):
+            return None
+        directory = os.path.join(config.get("user_data_dir", ".jules_hf"), checkpoint_config.get("directory", "session"))
+        return cls(
+            directory,
+            snapshot_every=checkpoint_config.get("snapshot_every", 50),
+            fsync_batch=checkpoint_config.get("fsync_batch", 1),
+            fsync_interval=checkpoint_config.get("fsync_interval", 1.0),
+        )
+
+    def save(self, memory: ShortTermMemory, fields: dict):
+        """
+        Records the session's current state as a delta against the previous checkpoint.
+        """
+        if self._memory_state is None:
+            self._write_snapshot(memory, fields)
+            return
+
+        delta = {"memory": memory.state_since(self._memory_state)}
+        changed = {key: value for key, value in fields.items() if self._fields.get(key, None) != value}
+        removed = [key for key in self._fields if key not in fields]
+        if changed:
+            delta["fields"] = changed
+        if removed:
+            delta["removed"] = removed
+        self._journal.append(delta)
+        self._memory_state = delta["memory"]
+        self._fields = dict(fields)
+
+        if self._journal.entries >= self.snapshot_every:
+            self._write_snapshot(memory, fields)
+
+    def load(self, memory: ShortTermMemory) -> Optional[dict]:
+        """
+        Restores the latest checkpoint into `memory` and returns its fields, or None if there is none.
+        """
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable session checkpoint {self.snapshot_path}: {e}")
+            return None
+
+        memory.load_state(snapshot["memory"])
+        fields = snapshot.get("fields", {})
+        deltas = self._journal.replay()
+        for delta in deltas:
+            memory.load_state(delta["memory"], delta=True)
+            fields.update(delta.get("fields", {}))
+            for key in delta.get("removed", ()):
+                fields.pop(key, None)
+
+        self._memory_state = memory.to_state()
+        self._fields = dict(fields)
+        logger.info(f"Resumed session from {self.snapshot_path} and {len(deltas)} checkpoint deltas.")
+        return fields
+
+    def clear(self):
+        """
+        Deletes the checkpoint, e.g. once the session it describes is finished.
+        """
+        self._journal.reset()
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+        self._memory_state = None
+        self._fields = {}
+
+    def close(self):
+        """
+        Makes every checkpoint durable and closes the journal.
+        """
+        self._journal.close()
+
+    def _write_snapshot(self, memory: ShortTermMemory, fields: dict):
+        self._memory_state = memory.to_state()
+        self._fields = dict(fields)
+        atomic_write_text(self.snapshot_path, json.dumps({"memory": self._memory_state, "fields": self._fields},
+                                                         separators=(",", ":"), default=str))
+        self._journal.reset()
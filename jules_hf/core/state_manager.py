@@ -1,51 +1,207 @@
 # Jules for Hugging Face - State Manager
 
+import gzip
 import json
 import os
+import re
+import shutil
+import threading
+from typing import Iterator, List
+from .logging import get_logger
+from .plan_journal import PlanJournal, atomic_write_text
+from .write_behind import WriteBehind
+
+logger = get_logger(__name__)
+
+_SEGMENT = re.compile(r"^(\d+)\.jsonl(\.gz)?$")
 
 class StateManager:
     """
     Manages the state of the project, allowing the agent to resume tasks.
+
+    The state file is a small header holding the current task id. The task history is an
+    append-only log of JSON lines in a `<state file>.history` directory: each update appends one
+    line, with fsync batched (group commit), so an update costs the same however long the session
+    has run. Once the active segment grows past `segment_max_bytes` it is gzip-compressed and a
+    new segment is started. `iter_history` streams the entries back without loading them all.
+
+    With `write_behind=True`, updates only change the in-memory state; a background thread writes
+    them in batches with one fsync each (see WriteBehind). `save_state()` waits for that.
     """
 
-    def __init__(self, state_file_path: str = "project_state.json"):
+    def __init__(self, state_file_path: str = "project_state.json", fsync_batch: int = 32,
+                 fsync_interval: float = 1.0, segment_max_bytes: int = 4 * 1024 * 1024,
+                 write_behind: bool = False, flush_interval: float = 0.5, flush_max_pending: int = 256):
         """
         Initializes the StateManager.
         """
         self.state_file_path = state_file_path
+        self.history_dir = f"{os.path.splitext(state_file_path)[0]}.history"
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.segment_max_bytes = segment_max_bytes
+        self._journal = None
+        self._lock = threading.RLock()
         self.state = self._load_state()
+        self._saved_task_id = self.state.get("current_task_id")
+        self._sequence = 0
+        self._writer = None
+        if write_behind:
+            self._writer = WriteBehind(self._write_history, interval=flush_interval,
+                                       max_pending=flush_max_pending, name="state-write-behind")
 
     def _load_state(self) -> dict:
         """
-        Loads the project state from the state file.
+        Loads the header from the state file and opens the active history segment. State files
+        written before the history log existed have their embedded history moved into it.
         """
+        state = {"current_task_id": None}
         if os.path.exists(self.state_file_path):
             with open(self.state_file_path, "r") as f:
-                return json.load(f)
-        else:
-            return {"current_task_id": None, "history": []}
+                state.update(json.load(f))
+        legacy_history = state.pop("history", None)
+
+        os.makedirs(self.history_dir, exist_ok=True)
+        compressed, active = self._recover_segments()
+        self._journal = self._open_segment(active)
+        entries = self._journal.replay()
+        if entries:
+            # The header may lag the log if the process stopped between the two writes.
+            state["current_task_id"] = entries[-1].get("task_id")
+        elif legacy_history and not compressed:
+            logger.info(f"Moving {len(legacy_history)} history entries out of {self.state_file_path}.")
+            for entry in legacy_history:
+                self._journal.append(entry)
+            self._journal.sync()
+            self.state = state
+            self._save_header()
+        return state
 
     def save_state(self):
         """
-        Saves the current project state to the state file.
+        Forces the history to stable storage and rewrites the state header.
         """
-        with open(self.state_file_path, "w") as f:
-            json.dump(self.state, f, indent=4)
+        if self._writer is not None:
+            self._writer.flush()
+        with self._lock:
+            self._save_header()
 
     def update_state(self, task_id: str, status: str, details: str):
         """
         Updates the state with the latest task information.
         """
-        self.state["current_task_id"] = task_id
-        self.state["history"].append({
+        entry = {
             "task_id": task_id,
             "status": status,
             "details": details
-        })
-        self.save_state()
+        }
+        self.state["current_task_id"] = task_id
+        if self._writer is not None:
+            # History entries are never coalesced, so each gets its own key.
+            self._sequence += 1
+            self._writer.submit(self._sequence, entry)
+        else:
+            self._write_history([entry], sync=False)
+
+    def _write_history(self, entries: List[dict], sync: bool = True):
+        """
+        Appends entries to the active segment, rewrites the header if the current task changed and
+        rotates the segment once it is full.
+        """
+        with self._lock:
+            for entry in entries:
+                self._journal.append(entry)
+            if self.state.get("current_task_id") != self._saved_task_id:
+                self._save_header()
+            elif sync:
+                self._journal.sync()
+            if os.path.getsize(self._journal.path) >= self.segment_max_bytes:
+                self._rotate()
+
+    def _save_header(self):
+        self._journal.sync()
+        atomic_write_text(self.state_file_path, json.dumps(self.state, indent=4))
+        self._saved_task_id = self.state.get("current_task_id")
 
     def get_current_task(self) -> str:
         """
         Returns the ID of the current task.
         """
         return self.state.get("current_task_id")
+
+    def iter_history(self) -> Iterator[dict]:
+        """
+        Yields every history entry, oldest first, reading one segment at a time. Queued write-behind
+        entries are written first.
+        """
+        if self._writer is not None:
+            self._writer.flush()
+        for path in self._segment_paths():
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    yield json.loads(line)
+
+    def close(self):
+        """
+        Saves the state and closes the active history segment.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        with self._lock:
+            self._save_header()
+            self._journal.close()
+
+    def _open_segment(self, index: int) -> PlanJournal:
+        return PlanJournal(os.path.join(self.history_dir, f"{index:06d}.jsonl"),
+                           fsync_batch=self.fsync_batch, fsync_interval=self.fsync_interval)
+
+    def _segment_paths(self) -> List[str]:
+        segments = []
+        for name in os.listdir(self.history_dir):
+            match = _SEGMENT.match(name)
+            if match:
+                segments.append((int(match.group(1)), os.path.join(self.history_dir, name)))
+        return [path for _, path in sorted(segments)]
+
+    def _recover_segments(self):
+        """
+        Finishes any rotation interrupted by a crash and returns the compressed segment count and the
+        index of the active segment.
+        """
+        compressed = set()
+        raw = set()
+        for name in os.listdir(self.history_dir):
+            match = _SEGMENT.match(name)
+            if match:
+                (compressed if match.group(2) else raw).add(int(match.group(1)))
+            elif name.endswith(".tmp"):
+                os.remove(os.path.join(self.history_dir, name))
+        for index in raw & compressed:
+            # The compressed copy is only renamed into place once complete, so the original can go.
+            os.remove(os.path.join(self.history_dir, f"{index:06d}.jsonl"))
+        raw -= compressed
+        active = max(raw) if raw else (max(compressed) + 1 if compressed else 0)
+        return len(compressed), active
+
+    def _rotate(self):
+        """
+        Compresses the active segment and starts a new one.
+        """
+        self._save_header()
+        self._journal.close()
+        path = self._journal.path
+        tmp_path = f"{path}.gz.tmp"
+        with open(path, "rb") as src, open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as dst:
+                shutil.copyfileobj(src, dst)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, f"{path}.gz")
+        os.remove(path)
+
+        index = int(_SEGMENT.match(os.path.basename(path)).group(1)) + 1
+        self._journal = self._open_segment(index)
+        logger.debug(f"Rotated state history into {path}.gz")
@@ -0,0 +1,115 @@
+# Jules for Hugging Face - Write-Behind Persistence
+
+import atexit
+import threading
+import time
+from typing import Callable, Hashable, List
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+class WriteBehind:
+    """
+    Moves persistence off the caller's thread.
+
+    Mutations are queued in memory under a key; a later mutation with the same key replaces the
+    queued one, so repeated writes to the same record cost a single write. A background thread
+    hands the queued values, in first-queued order, to `write_batch` once `max_pending` have
+    accumulated or `interval` seconds after the first one was queued. `write_batch` is expected to
+    make the batch durable before returning.
+
+    `flush()` writes everything queued so far on the calling thread and returns once it is durable;
+    `close()` flushes and stops the thread, and also runs at interpreter exit. A failed batch is
+    logged and re-queued (behind any newer value for the same key) for the next attempt.
+    """
+
+    def __init__(self, write_batch: Callable[[List], None], interval: float = 0.5, max_pending: int = 256,
+                 name: str = "write-behind", clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._write_batch = write_batch
+        self._clock = clock
+        self._pending = {}
+        self._first_queued = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # keeps batches in order between the thread and flush()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of queued mutations not yet handed to the writer.
+        """
+        with self._condition:
+            return len(self._pending)
+
+    def submit(self, key: Hashable, value):
+        """
+        Queues a mutation, replacing any queued one with the same key. Returns immediately.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-behind buffer is closed.")
+            first = not self._pending
+            if first:
+                self._first_queued = self._clock()
+            self._pending[key] = value
+            # Wake the thread to start the interval timer, or to write a full batch.
+            if first or len(self._pending) >= self.max_pending:
+                self._condition.notify()
+
+    def flush(self):
+        """
+        Writes every queued mutation and returns once the writer has made them durable.
+        """
+        self._write_pending(raise_errors=True)
+
+    def close(self):
+        """
+        Flushes the queue and stops the background thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        atexit.unregister(self.close)
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._first_queued + self.interval - self._clock())
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            self._write_pending(raise_errors=False)
+
+    def _due(self) -> bool:
+        return bool(self._pending) and (len(self._pending) >= self.max_pending
+                                        or self._clock() - self._first_queued >= self.interval)
+
+    def _write_pending(self, raise_errors: bool):
+        with self._write_lock:
+            with self._condition:
+                batch = self._pending
+                self._pending = {}
+            if not batch:
+                return
+            try:
+                self._write_batch(list(batch.values()))
+            except Exception as e:
+                with self._condition:
+                    batch.update(self._pending)
+                    self._pending = batch
+                    self._first_queued = self._clock()
+                if raise_errors:
+                    raise
+                logger.error(f"Write-behind flush of {len(batch)} mutations failed: {e}", exc_info=True)
@@ -1,14 +1,25 @@
 # Jules for Hugging Face - Main Entry Point
 
+import multiprocessing
+import os
+import socket
+from typing import Optional
 from .core.logic_engine_v2 import LogicEngineV2
 from .core.llm_provider import HuggingFaceLLMProvider
+from .core.llm_cache import CachingLLMProvider
+from .core.resilience import ResilientLLMProvider
 from .core.methodology_engine import MethodologyEngine
+from .core.config import config
+from .core.memory import ShortTermMemory
+from .core.metrics import MetricsExporter, MetricsRegistry
+from .core.session_checkpoint import SessionCheckpointer
 from .tools.abstraction_layer import ToolAbstractionLayer
+from .tools.cancellation import CancellationToken, use_token
 from .tools.file_system_manager import FileSystemManager
 from .tools.git_client import GitClient
 from .tools.huggingface_client import HuggingFaceClient
 from .core.logging import setup_logging, get_logger
-from .core.exceptions import ToolExecutionError, LLMError
+from .core.exceptions import ConfigurationError, ToolExecutionError, LLMError
 
 # Initialize logger for this module
 logger = get_logger(__name__)
@@ -20,14 +31,41 @@ class JulesHF:
     def __init__(self):
         logger.info("Initializing JulesHF application...")
 
-        llm_provider = HuggingFaceLLMProvider()
+        llm_provider = CachingLLMProvider.from_config(ResilientLLMProvider.from_config(HuggingFaceLLMProvider()))
+        self.llm_provider = llm_provider
 
-        self.logic_engine = LogicEngineV2(llm_provider)
+        batch_config = config.get("tools", {}).get("batch", {})
+        timeout_config = config.get("tools", {}).get("timeouts", {})
+        self.metrics = MetricsRegistry()
+        self.metrics_exporter = MetricsExporter.from_config(self.metrics)
+        self.tool_layer = ToolAbstractionLayer(max_workers=batch_config.get("max_workers", 8),
+                                               max_processes=batch_config.get("max_processes"),
+                                               default_timeout=timeout_config.get("default"),
+                                               metrics=self.metrics)
+        # Deadline of one agent turn, shared by every tool call the turn makes.
+        self.turn_timeout = timeout_config.get("turn")
+        self.logic_engine = LogicEngineV2(
+            llm_provider,
+            stream_responses=config.get("llm", {}).get("streaming", False),
+            parameter_validator=self.tool_layer.validate_parameters,
+        )
         self.methodology_engine = MethodologyEngine()
-        self.tool_layer = ToolAbstractionLayer()
-        self.short_term_memory = []
+        self.short_term_memory = ShortTermMemory.from_config()
+        # The task this agent holds a lease on in worker-pool mode.
+        self.leased_task = None
+        self._task_completed = False
+        self.max_turns_per_task = config.get("worker_pool", {}).get("max_turns_per_task", 20)
+        # An action the LLM chose that has not finished executing yet.
+        self.pending_action = None
+        self.checkpointer = SessionCheckpointer.from_config()
 
         self._register_tools()
+        speculation_config = config.get("tools", {}).get("speculation", {})
+        if speculation_config.get("enabled", False):
+            self.tool_layer.enable_speculation(max_candidates=speculation_config.get("max_candidates", 2))
+        memoization_config = config.get("tools", {}).get("memoization", {})
+        if memoization_config.get("enabled", False):
+            self.tool_layer.enable_memoization(max_entries=memoization_config.get("max_entries", 256))
         logger.info("JulesHF application initialized successfully.")
 
     def _register_tools(self):
@@ -39,37 +77,189 @@ class JulesHF:
     def run(self):
         logger.info("JulesHF run started.")
 
-        current_task_info = self.methodology_engine.get_current_task()
-        task = current_task_info.get('task', {})
-        logger.info("Current task retrieved.", extra={'extra_context': {'task_id': task.get('id'), 'task_title': task.get('title')}})
+        try:
+            self.resume()
+
+            current_task_info = self.methodology_engine.get_current_task()
+            task = current_task_info.get('task', {})
+            logger.info("Current task retrieved.", extra={'extra_context': {'task_id': task.get('id'), 'task_title': task.get('title')}})
 
-        # The main loop would be more sophisticated in a real agent
-        self._run_single_turn()
+            # The main loop would be more sophisticated in a real agent
+            self._run_single_turn()
+        finally:
+            # Makes any journaled plan changes durable before exit.
+            self.methodology_engine.close()
+            self.tool_layer.close()
+            if self.checkpointer is not None:
+                self.checkpointer.close()
+            if self.metrics_exporter is not None:
+                self.metrics_exporter.close()
 
         logger.info("JulesHF run finished.")
 
+    def resume(self) -> bool:
+        """
+        Restores short-term memory and any pending action from the latest session checkpoint, if it
+        was taken while working on the current task. Nothing is sent to the LLM; a pending action is
+        executed on the next turn as if it had just been chosen, but only if replaying it cannot
+        repeat a side effect. Otherwise it is dropped and noted in memory, so the LLM can check what
+        it did before choosing again. Returns True if a session was resumed.
+        """
+        if self.checkpointer is None:
+            return False
+        fields = self.checkpointer.load(self.short_term_memory)
+        if fields is None:
+            return False
+
+        task_id = self.methodology_engine.get_current_task().get("task", {}).get("id")
+        if fields.get("task_id") != task_id:
+            logger.info(f"Session checkpoint belongs to task '{fields.get('task_id')}', not '{task_id}'; starting afresh.")
+            self.short_term_memory = ShortTermMemory.from_config()
+            self.checkpointer.clear()
+            return False
+
+        self.pending_action = fields.get("pending_action")
+        if self.pending_action is not None and not self._is_replayable(self.pending_action):
+            logger.warning("The pending action may have side effects and is not replayed.",
+                           extra={'extra_context': {'pending_action': self.pending_action}})
+            self.short_term_memory.append({"role": "assistant", "action": self.pending_action})
+            self.short_term_memory.append({"role": "system", "observation": (
+                "The session stopped while this action was running. It was not repeated because it may "
+                "have side effects; check whether it took effect before retrying it.")})
+            self.pending_action = None
+        logger.info(f"Resumed session for task '{task_id}' with {len(self.short_term_memory)} memory entries.",
+                    extra={'extra_context': {'pending_action': self.pending_action}})
+        return True
+
+    def _is_replayable(self, action: dict) -> bool:
+        """
+        Returns True if running the action again cannot repeat a side effect, i.e. every tool call
+        it makes is one its tool declared read-only or idempotent.
+        """
+        action_type = action.get("action")
+        if action_type == "execute_tool":
+            calls = [action]
+        elif action_type == "execute_tools":
+            calls = action.get("tool_calls", [])
+        else:
+            return True
+        return all(isinstance(call, dict) and (
+            self.tool_layer.is_read_only(call.get("tool_name"), call.get("parameters"))
+            or self.tool_layer.is_idempotent(call.get("tool_name"), call.get("parameters"))) for call in calls)
+
+    def run_worker(self, owner: Optional[str] = None, max_tasks: Optional[int] = None) -> int:
+        """
+        Claims and works on runnable tasks until none is left (or `max_tasks` are done), leasing
+        each one so that other workers sharing the plan store pick different tasks.
+        Returns the number of tasks completed.
+        """
+        owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        logger.info(f"Worker '{owner}' started.")
+        if self.checkpointer is not None:
+            # An abandoned task is recovered through its expired lease, not from a per-process session.
+            self.checkpointer.close()
+            self.checkpointer = None
+        completed = 0
+        try:
+            while max_tasks is None or completed < max_tasks:
+                claimed = self.methodology_engine.claim_task(owner)
+                if claimed is None:
+                    logger.info(f"Worker '{owner}' found no free task.")
+                    break
+                if self._work_on_task(claimed["task"], owner):
+                    completed += 1
+        finally:
+            self.methodology_engine.close()
+            self.tool_layer.close()
+            if self.metrics_exporter is not None:
+                self.metrics_exporter.close()
+        logger.info(f"Worker '{owner}' finished after completing {completed} task(s).")
+        return completed
+
+    def _work_on_task(self, task: dict, owner: str) -> bool:
+        """
+        Runs agent turns on a leased task until it is completed, the turn budget runs out or the
+        lease is lost. A task that runs out of turns is marked 'Blocked' so it is not claimed again
+        in a loop.
+        """
+        task_id = task.get("id")
+        self.leased_task = task
+        self._task_completed = False
+        self.short_term_memory.clear()
+        try:
+            for _ in range(self.max_turns_per_task):
+                if not self.methodology_engine.renew_lease(task_id, owner):
+                    logger.warning(f"Lost the lease on task '{task_id}'; abandoning it.")
+                    return False
+                self._run_single_turn()
+                if self._task_completed:
+                    return self.methodology_engine.release_task(task_id, owner, "Completed")
+
+            logger.warning(f"Task '{task_id}' was not completed within {self.max_turns_per_task} turns.")
+            self.methodology_engine.release_task(task_id, owner, "Blocked")
+            return False
+        finally:
+            self.leased_task = None
+
     def _run_single_turn(self):
         """
         Runs a single turn of the agent's thought-action loop.
         """
         state = self._build_current_state()
+        task_id = state["current_task"].get("id")
+        turn_token = CancellationToken.with_timeout(self.turn_timeout)
 
         try:
-            action = self.logic_engine.get_next_action(state)
-            self._execute_action(action)
+            # Likely read-only tool calls run in the background while the LLM decides.
+            self.tool_layer.start_speculation()
+            action = self.pending_action
+            if action is None:
+                action = self.logic_engine.get_next_action(state)
+                self.pending_action = action
+                self._checkpoint(task_id)
+            else:
+                logger.info("Executing the pending action restored from the session checkpoint.")
+            with use_token(turn_token):
+                self._execute_action(action)
         except (ToolExecutionError, LLMError) as e:
             logger.error(f"A recoverable error occurred: {e}", exc_info=True)
             # In a real agent, we might add this error to memory and retry
         except Exception as e:
             logger.critical(f"An unrecoverable error occurred: {e}", exc_info=True)
+        finally:
+            self.tool_layer.finish_speculation()
+
+        # Reached after the action ran, even if it failed; only a BaseException (e.g. KeyboardInterrupt)
+        # or a crash leaves the action pending for `resume`.
+        self.pending_action = None
+        self._checkpoint(task_id)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.export()
+
+    def _checkpoint(self, task_id: Optional[str]):
+        """
+        Saves the session to the checkpoint, if enabled. A failed checkpoint never stops the agent.
+        """
+        if self.checkpointer is None:
+            return
+        fields = {
+            "task_id": task_id,
+            "pending_action": self.pending_action,
+            "llm_cache_key": getattr(self.llm_provider, "last_key", None),
+        }
+        try:
+            self.checkpointer.save(self.short_term_memory, fields)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not checkpoint the session: {e}")
 
     def _build_current_state(self) -> dict:
         """
         Constructs the current state dictionary to be passed to the LogicEngine.
         """
+        current_task = self.leased_task or self.methodology_engine.get_current_task().get('task', {})
         return {
-            "current_task": self.methodology_engine.get_current_task().get('task', {}),
-            "available_tools": self.tool_layer.get_tools(), # In a real system, this would be more dynamic
+            "current_task": current_task,
+            "available_tools": self.tool_layer.get_tool_catalog(),
             "short_term_memory": self.short_term_memory
         }
 
@@ -86,6 +276,18 @@ class JulesHF:
             self.short_term_memory.append({"role": "assistant", "action": action})
             self.short_term_memory.append({"role": "system", "observation": result})
 
+        elif action_type == "execute_tools":
+            calls = [(call.get("tool_name"), call.get("parameters")) for call in action.get("tool_calls", [])]
+            # Independent calls run in parallel; one failing does not stop the others.
+            results = self.tool_layer.execute_tools(calls)
+
+            self.short_term_memory.append({"role": "assistant", "action": action})
+            for (tool_name, _), result in zip(calls, results):
+                if isinstance(result, ToolExecutionError):
+                    self.short_term_memory.append({"role": "system", "tool_name": tool_name, "error": str(result)})
+                else:
+                    self.short_term_memory.append({"role": "system", "tool_name": tool_name, "observation": result})
+
         elif action_type == "ask_user":
             question = action.get("question")
             logger.info(f"Asking user: {question}")
@@ -94,6 +296,7 @@ class JulesHF:
         elif action_type == "complete_task":
             message = action.get("final_message")
             logger.info(f"Task completed with message: {message}")
+            self._task_completed = True
             # Here you would update the methodology engine
             # self.methodology_engine.update_task_status(...)
 
@@ -101,6 +304,35 @@ class JulesHF:
             logger.error(f"Unknown action type: {action_type}")
 
 
+def _worker_process(index: int):
+    """
+    Entry point of one worker-pool process.
+    """
+    setup_logging()
+    JulesHF().run_worker(owner=f"{socket.gethostname()}:{os.getpid()}:{index}")
+
+def run_worker_pool(workers: int):
+    """
+    Runs `workers` agent processes that claim distinct tasks from the shared plan store.
+    """
+    if config.get("plan_store", {}).get("backend", "json") != "sqlite":
+        raise ConfigurationError("The worker pool needs a plan store shared between processes; "
+                                 "set plan_store.backend to 'sqlite'.")
+
+    # Seed the database once before the workers start.
+    MethodologyEngine().close()
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_worker_process, args=(index,), name=f"jules-worker-{index}")
+                 for index in range(workers)]
+    logger.info(f"Starting a pool of {workers} workers.")
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.error(f"Worker {process.name} exited with code {process.exitcode}.")
+
 def main():
     """
     Main entry point for the application.
@@ -109,8 +341,12 @@ def main():
 
     logger.info("Application starting...")
     try:
-        app = JulesHF()
-        app.run()
+        worker_pool_config = config.get("worker_pool", {})
+        if worker_pool_config.get("enabled", False):
+            run_worker_pool(worker_pool_config.get("workers", os.cpu_count() or 1))
+        else:
+            app = JulesHF()
+            app.run()
     except Exception as e:
         logger.critical(f"An unhandled exception caused the application to terminate: {e}", exc_info=True)
     finally:
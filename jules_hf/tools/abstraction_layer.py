@@ -1,27 +1,178 @@
 # Jules for Hugging Face - Tool Abstraction Layer
 
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Hashable, Iterable, List, Optional, Sequence, Tuple
 from ..core.logging import get_logger
-from ..core.exceptions import ToolExecutionError
+from ..core.metrics import MetricsRegistry
+from ..core.exceptions import ConfigurationError, ToolBusyError, ToolCancelledError, ToolExecutionError, ToolTimeoutError
+from .cancellation import CancellationToken, current_token, use_token
+from .memoization import ToolResultCache
+from .schemas import compile_schema
+from .speculation import SpeculativeExecutor
 
 logger = get_logger(__name__)
 
+# Outcomes under which executed tool calls are counted.
+CALL_OUTCOMES = ("success", "memoized", "speculative", "error", "timeout", "cancelled")
+
+# Tool instances created inside process-pool workers, one per tool and factory in each process.
+_process_tools = {}
+
+def _run_in_process(tool_name: str, factory: Callable[[], object], parameters: dict, timeout: Optional[float] = None):
+    """
+    Process-pool entry point: runs a call on this process's instance of the tool, created by its
+    registered factory, within `timeout` seconds (tokens cannot cross the process boundary, their
+    remaining time can).
+    """
+    tool = _process_tools.get((tool_name, factory))
+    if tool is None:
+        try:
+            tool = factory()
+        except Exception as e:
+            raise ToolExecutionError(f"Tool '{tool_name}' could not be initialized: {e}") from None
+        _process_tools[(tool_name, factory)] = tool
+    with use_token(CancellationToken.with_timeout(timeout)):
+        return tool.run(parameters)
+
 class ToolAbstractionLayer:
     """
     The Tool Abstraction Layer is responsible for discovering and executing tools.
+
+    `execute_tools` runs a batch of calls concurrently on a thread pool of `max_workers` threads.
+    Tools registered as CPU-bound run in a pool of `max_processes` worker processes instead, so they
+    are not serialized by the GIL. A tool's `max_concurrency` caps how many of its calls run at
+    once, across batches and single calls alike.
+
+    Registration only records a tool's class and metadata. The tool itself is created by its factory
+    (the class, by default) on its first call, exactly once even when calls race, so tools that a
+    session never uses cost nothing at startup.
+
+    With memoization enabled, results of calls a tool declared idempotent are kept in a bounded LRU
+    and reused while the tool's declared dependencies (file mtimes, repository HEAD, ...) are
+    unchanged. Like speculative results, memoized results are dropped whenever a call with side
+    effects runs.
+
+    Every call runs under a CancellationToken whose deadline is the tool's `timeout` (default:
+    `default_timeout`), shortened to the deadline of the caller's token, which defaults to the
+    current one (e.g. the agent turn's). The token is current while the tool runs: subprocesses
+    started through `run_subprocess` are killed when it expires, and in-process tools are expected
+    to check it between steps. Waiting for a concurrency slot or a process-pool result also ends at
+    the deadline; a process-pool task that is already running cannot be stopped from outside, so it
+    keeps its worker busy until the tool gives up or finishes.
+
+    Each call that passes validation is counted in `metrics` by tool, operation and outcome
+    (success, memoized, speculative, error, timeout or cancelled) and its latency is recorded in a
+    histogram; calls that fail validation are counted with the outcome "invalid".
     """
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, max_processes: Optional[int] = None,
+                 default_timeout: Optional[float] = None, metrics: Optional[MetricsRegistry] = None):
         """
         Initializes the ToolAbstractionLayer.
         """
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self.default_timeout = default_timeout
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._calls = self.metrics.counter("jules_tool_calls_total", "Tool calls by tool, operation and outcome.",
+                                           ("tool", "operation", "outcome"))
+        self._latency = self.metrics.histogram("jules_tool_call_duration_seconds",
+                                               "Time callers waited for tool calls, in seconds.", ("tool", "operation"))
+        self._in_flight = self.metrics.gauge("jules_tool_calls_in_flight", "Tool calls currently executing.", ("tool",))
+        self._metric_children = {}
+        self._thread_pool = None
+        self._process_pool = None
+        self._pool_lock = threading.Lock()
+        self._classes = {}
+        self._factories = {}
+        self._init_locks = {}
+        self._limits = {}
+        self._timeouts = {}
+        self._cpu_bound = set()
         self._tools = {}
+        self._schemas = {}
+        self._validators = {}
+        self._descriptions = {}
+        self._catalog = None
+        self._read_only = {}
+        self._idempotent = {}
+        self._cache_keys = {}
+        self._cache_dependencies = {}
+        self._memo = None
+        self._speculator = None
         logger.info("ToolAbstractionLayer initialized.")
 
-    def register_tool(self, tool_name: str, tool_class):
+    def register_tool(self, tool_name: str, tool_class, parameters_schema: Optional[dict] = None,
+                      read_only_operations: Optional[Iterable[str]] = None, max_concurrency: Optional[int] = None,
+                      cpu_bound: Optional[bool] = None, factory: Optional[Callable[[], object]] = None,
+                      idempotent_operations: Optional[Iterable[str]] = None,
+                      cache_key: Optional[Callable[[dict], Hashable]] = None,
+                      cache_dependencies: Optional[Callable[[dict], object]] = None,
+                      timeout: Optional[float] = None):
         """
         Registers a new tool.
+        The parameter schema defaults to the class's `parameters_schema` attribute and is compiled once, here.
+        `read_only_operations` (default: the class's attribute of the same name) lists the values of the
+        `operation` parameter whose calls have no side effects and may therefore be run speculatively.
+        `max_concurrency` and `cpu_bound` also default to class attributes: the first caps concurrent
+        calls (None for no cap), the second runs calls in the process pool, which needs an importable
+        tool class and picklable parameters and results.
+        `factory` creates the tool on its first call (default: the class itself); for a CPU-bound tool
+        it is sent to the worker processes and must be picklable (e.g. a module-level function).
+        `idempotent_operations`, `cache_key` and `cache_dependencies` (default: the class's attributes)
+        opt calls into memoization: the operations whose results may be reused, a function mapping a
+        call's parameters to its cache key (default: their canonical JSON), and a function returning a
+        fingerprint of the state the call's result depends on.
+        `timeout` (default: the class's attribute, then the layer's `default_timeout`) bounds each call in seconds.
         """
-        self._tools[tool_name] = tool_class()
+        schema = parameters_schema if parameters_schema is not None else getattr(tool_class, "parameters_schema", None)
+        if read_only_operations is None:
+            read_only_operations = getattr(tool_class, "read_only_operations", ())
+        if max_concurrency is None:
+            max_concurrency = getattr(tool_class, "max_concurrency", None)
+        if cpu_bound is None:
+            cpu_bound = getattr(tool_class, "cpu_bound", False)
+        if idempotent_operations is None:
+            idempotent_operations = getattr(tool_class, "idempotent_operations", ())
+        if cache_key is None:
+            cache_key = getattr(tool_class, "cache_key", ToolResultCache.default_key)
+        if cache_dependencies is None:
+            cache_dependencies = getattr(tool_class, "cache_dependencies", None)
+        if timeout is None:
+            timeout = getattr(tool_class, "timeout", self.default_timeout)
+        if cpu_bound and factory is not None:
+            try:
+                pickle.dumps(factory)
+            except Exception as e:
+                raise ConfigurationError(f"Factory of CPU-bound tool '{tool_name}' cannot be pickled: {e}") from e
+        self._tools.pop(tool_name, None)
+        self._classes[tool_name] = tool_class
+        self._factories[tool_name] = factory or tool_class
+        self._init_locks[tool_name] = threading.Lock()
+        self._timeouts[tool_name] = timeout
+        if max_concurrency is not None:
+            self._limits[tool_name] = threading.BoundedSemaphore(max_concurrency)
+        else:
+            self._limits.pop(tool_name, None)
+        if cpu_bound:
+            self._cpu_bound.add(tool_name)
+        else:
+            self._cpu_bound.discard(tool_name)
+        self._read_only[tool_name] = frozenset(read_only_operations)
+        self._idempotent[tool_name] = frozenset(idempotent_operations)
+        self._cache_keys[tool_name] = cache_key
+        self._cache_dependencies[tool_name] = cache_dependencies
+        if self._memo is not None:
+            self._memo.invalidate(tool_name)
+        if schema is not None:
+            self._schemas[tool_name] = schema
+            self._validators[tool_name] = compile_schema(schema)
+        self._descriptions[tool_name] = self._describe(tool_class)
+        self._catalog = None
         logger.info(f"Tool '{tool_name}' registered.", extra={'tool_name': tool_name, 'class': tool_class.__name__})
 
     def get_tools(self):
@@ -29,31 +180,341 @@ class ToolAbstractionLayer:
         Returns a list of available tools.
         """
         logger.debug("Retrieving list of available tools.")
-        return list(self._tools.keys())
+        return list(self._classes.keys())
+
+    def get_tool_catalog(self) -> List[dict]:
+        """
+        Returns the name, description and parameter schema of every tool, for publishing in the prompt.
+        The catalog is built once per registration change, so callers can compare it cheaply between turns.
+        """
+        if self._catalog is None:
+            catalog = []
+            for tool_name in self._classes:
+                entry = {"name": tool_name, "description": self._descriptions.get(tool_name, "")}
+                if tool_name in self._schemas:
+                    entry["parameters"] = self._schemas[tool_name]
+                catalog.append(entry)
+            self._catalog = catalog
+        return self._catalog
+
+    def validate_parameters(self, tool_name: str, parameters) -> List[str]:
+        """
+        Checks a tool call against the tool's compiled schema without executing it.
+        Returns a list of error messages, which is empty if the call is valid.
+        """
+        if tool_name not in self._classes:
+            return [f"Tool '{tool_name}' not found."]
+        if not isinstance(parameters, dict):
+            return [f"parameters: expected object, got {type(parameters).__name__}"]
+        validator = self._validators.get(tool_name)
+        return validator(parameters) if validator is not None else []
+
+    def is_read_only(self, tool_name: str, parameters: dict) -> bool:
+        """
+        Returns True if the tool declared this call's operation as side-effect-free.
+        """
+        operations = self._read_only.get(tool_name)
+        return bool(operations) and isinstance(parameters, dict) and parameters.get("operation") in operations
+
+    def is_idempotent(self, tool_name: str, parameters: dict) -> bool:
+        """
+        Returns True if the tool declared this call's operation as safe to memoize.
+        """
+        operations = self._idempotent.get(tool_name)
+        return bool(operations) and isinstance(parameters, dict) and parameters.get("operation") in operations
+
+    def enable_memoization(self, max_entries: int = 256):
+        """
+        Turns on memoization of idempotent calls in an LRU of `max_entries` results.
+        """
+        if self._memo is None:
+            self._memo = ToolResultCache(max_entries=max_entries)
+            logger.info("Tool result memoization enabled.")
+
+    def memoization_stats(self) -> dict:
+        """
+        Returns memoization hits, misses, invalidations, evictions and hit rate per tool.
+        """
+        return self._memo.stats() if self._memo is not None else {}
+
+    def enable_speculation(self, max_candidates: int = 2, history_size: int = 50):
+        """
+        Turns on speculative pre-execution of likely read-only calls.
+        """
+        if self._speculator is None:
+            self._speculator = SpeculativeExecutor(self._run_tool, max_candidates=max_candidates, history_size=history_size)
+            logger.info("Speculative tool execution enabled.")
+
+    def start_speculation(self, candidates: Optional[List[Tuple[str, dict]]] = None) -> int:
+        """
+        Starts background runs of the given (or predicted) read-only calls, e.g. while waiting on the LLM.
+        Candidates that are unknown, not read-only or invalid are skipped. Returns the number started.
+        """
+        if self._speculator is None:
+            return 0
+        if candidates is None:
+            candidates = self._speculator.predict()
+        candidates = [
+            (tool_name, parameters) for tool_name, parameters in candidates
+            if self.is_read_only(tool_name, parameters) and not self.validate_parameters(tool_name, parameters)
+        ]
+        return self._speculator.start(candidates)
+
+    def finish_speculation(self):
+        """
+        Discards speculative results that were not used this turn.
+        """
+        if self._speculator is not None:
+            self._speculator.discard()
+
+    def speculation_stats(self) -> dict:
+        """
+        Returns speculation hit-rate and wasted-work counters.
+        """
+        return self._speculator.stats() if self._speculator is not None else {}
 
-    def execute_tool(self, tool_name: str, parameters: dict) -> str:
+    def execute_tool(self, tool_name: str, parameters: dict, token: Optional[CancellationToken] = None) -> str:
         """
         Executes a tool with the given parameters, raising exceptions on failure.
+        The call ends by `token`'s deadline (default: the current token's) or the tool's timeout,
+        whichever is earlier, with a ToolTimeoutError.
         """
         logger.debug(f"Attempting to execute tool '{tool_name}'.", extra={'tool_name': tool_name, 'parameters': parameters})
 
-        if tool_name not in self._tools:
+        if tool_name not in self._classes:
             msg = f"Tool '{tool_name}' not found."
             logger.error(msg)
             raise ToolExecutionError(msg)
 
-        tool = self._tools[tool_name]
+        errors = self._validators[tool_name](parameters) if tool_name in self._validators else []
+        if errors:
+            msg = f"Invalid parameters for tool '{tool_name}': {'; '.join(errors)}"
+            logger.error(msg)
+            # Invalid calls are counted without their operation, which may be anything the model made up.
+            self._calls.labels(tool_name, "", "invalid").inc()
+            raise ToolExecutionError(msg)
+
+        operation = parameters.get("operation") if isinstance(parameters, dict) else None
+        operation = operation if isinstance(operation, str) else ""
+        in_flight, latency, calls = self._call_metrics(tool_name, operation)
+        in_flight.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result, outcome = self._execute(tool_name, parameters, token)
+            return result
+        except ToolTimeoutError:
+            outcome = "timeout"
+            raise
+        except ToolCancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            latency.observe(time.perf_counter() - started)
+            in_flight.dec()
+            calls[outcome].inc()
+
+    def _call_metrics(self, tool_name: str, operation: str):
+        """
+        Returns the in-flight gauge, latency histogram and per-outcome call counters of a tool
+        operation, looked up once and then kept, so recording a call costs a few appends.
+        """
+        children = self._metric_children.get((tool_name, operation))
+        if children is None:
+            calls = {outcome: self._calls.labels(tool_name, operation, outcome) for outcome in CALL_OUTCOMES}
+            children = (self._in_flight.labels(tool_name), self._latency.labels(tool_name, operation), calls)
+            self._metric_children[(tool_name, operation)] = children
+        return children
+
+    def _execute(self, tool_name: str, parameters: dict, token: Optional[CancellationToken]) -> Tuple[object, str]:
+        """
+        Runs a validated call, or serves it from memoized or speculative results.
+        Returns the result and the call's outcome label.
+        """
+        # CPU-bound tools are only instantiated in the worker processes.
+        tool = self._classes[tool_name] if tool_name in self._cpu_bound else self._tool(tool_name)
 
         if not hasattr(tool, "run"):
             msg = f"Tool '{tool_name}' does not have a 'run' method."
             logger.error(msg)
             raise ToolExecutionError(msg)
 
+        cache_entry = self._cache_entry(tool_name, parameters)
+        if cache_entry is not None:
+            hit, result = self._memo.get(tool_name, *cache_entry)
+            if hit:
+                logger.info(f"Tool '{tool_name}' served from memoized result.", extra={'tool_name': tool_name})
+                return result, "memoized"
+        elif self._memo is not None and not self.is_read_only(tool_name, parameters):
+            self._memo.invalidate()
+
+        if self._speculator is not None:
+            if self.is_read_only(tool_name, parameters):
+                self._speculator.record_call(tool_name, parameters)
+                # A hung speculative run must not hold the call past its deadline.
+                wait_token = CancellationToken.with_timeout(
+                    self._timeouts.get(tool_name), parent=token if token is not None else current_token())
+                hit, result = self._speculator.take(tool_name, parameters, wait_token)
+                if hit:
+                    logger.info(f"Tool '{tool_name}' served from speculative execution.", extra={'tool_name': tool_name})
+                    return result, "speculative"
+            else:
+                # A call with side effects may change what pending read-only calls would return.
+                self._speculator.discard()
+
         try:
-            result = tool.run(parameters)
+            result = self._invoke(tool_name, parameters, token if token is not None else current_token())
             logger.info(f"Tool '{tool_name}' executed successfully.", extra={'tool_name': tool_name})
-            return result
+            if cache_entry is not None:
+                self._memo.put(tool_name, *cache_entry, result)
+            return result, "success"
+        except ToolCancelledError as e:
+            logger.error(f"Tool '{tool_name}' was stopped: {e}", extra={'tool_name': tool_name})
+            raise
         except Exception as e:
             logger.error(f"An unexpected error occurred while executing tool '{tool_name}': {e}", exc_info=True, extra={'tool_name': tool_name})
             # Wrap the original exception to provide a consistent error type
             raise ToolExecutionError(f"Execution of tool '{tool_name}' failed: {e}") from e
+
+    def execute_tools(self, calls: Sequence[Tuple[str, dict]], return_exceptions: bool = True,
+                      token: Optional[CancellationToken] = None) -> list:
+        """
+        Executes several (tool_name, parameters) calls concurrently and returns their results in input
+        order. Each call goes through the same checks as `execute_tool`; a call that fails yields its
+        ToolExecutionError in place of a result without affecting the others. With
+        `return_exceptions=False` the first failure in input order is raised once every call has finished.
+        Every call shares the deadline of `token` (default: the current token).
+        """
+        if not calls:
+            return []
+        # Pool threads do not inherit the caller's context, so the token is passed explicitly.
+        token = token if token is not None else current_token()
+        if len(calls) == 1:
+            results = [self._capture(self.execute_tool, *calls[0], token)]
+        else:
+            pool = self._get_thread_pool()
+            futures = [pool.submit(self._capture, self.execute_tool, tool_name, parameters, token)
+                       for tool_name, parameters in calls]
+            results = [future.result() for future in futures]
+
+        logger.info(f"Executed a batch of {len(calls)} tool calls.",
+                    extra={'failed': sum(isinstance(result, ToolExecutionError) for result in results)})
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, ToolExecutionError):
+                    raise result
+        return results
+
+    def close(self):
+        """
+        Stops speculative runs and shuts down the thread and process pools, waiting for running calls to finish.
+        """
+        if self._speculator is not None:
+            self._speculator.shutdown()
+        with self._pool_lock:
+            pools = (self._thread_pool, self._process_pool)
+            self._thread_pool = self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    @staticmethod
+    def _capture(function, *args):
+        try:
+            return function(*args)
+        except ToolExecutionError as e:
+            return e
+
+    def _invoke(self, tool_name: str, parameters: dict, token: Optional[CancellationToken] = None,
+                wait_for_slot: bool = True):
+        """
+        Runs a call within the tool's concurrency cap and deadline, in the process pool if the tool is CPU-bound.
+        Without `wait_for_slot`, a call that finds every slot taken raises ToolBusyError instead of queueing.
+        """
+        call_token = CancellationToken.with_timeout(self._timeouts.get(tool_name), parent=token)
+        call_token.check()
+        limit = self._limits.get(tool_name)
+        if limit is not None:
+            if not wait_for_slot:
+                if not limit.acquire(blocking=False):
+                    raise ToolBusyError(f"Tool '{tool_name}' has no free slot.")
+            elif not limit.acquire(timeout=call_token.remaining()):
+                raise ToolTimeoutError(f"Tool '{tool_name}' timed out waiting for a free slot.")
+        try:
+            if tool_name in self._cpu_bound:
+                future = self._get_process_pool().submit(_run_in_process, tool_name, self._factories[tool_name],
+                                                         parameters, call_token.remaining())
+                try:
+                    return future.result(timeout=call_token.remaining())
+                except FutureTimeoutError:
+                    # Only a queued task can be cancelled. A running one keeps its worker busy until
+                    # the tool honours the deadline it was given or finishes on its own.
+                    if not future.cancel():
+                        logger.warning(f"Tool '{tool_name}' is still running in a worker process after its deadline.",
+                                       extra={'tool_name': tool_name})
+                    raise ToolTimeoutError(f"Tool '{tool_name}' exceeded its deadline.") from None
+            with use_token(call_token):
+                return self._tool(tool_name).run(parameters)
+        finally:
+            if limit is not None:
+                limit.release()
+
+    def _cache_entry(self, tool_name: str, parameters: dict) -> Optional[Tuple[Hashable, object]]:
+        """
+        Returns the memoization (key, fingerprint) of an idempotent call, or None if it is not memoized.
+        The fingerprint is taken before the tool runs, so a change made while it runs invalidates the result.
+        """
+        if self._memo is None or not self.is_idempotent(tool_name, parameters):
+            return None
+        try:
+            key = self._cache_keys[tool_name](parameters)
+            dependencies = self._cache_dependencies[tool_name]
+            return key, dependencies(parameters) if dependencies is not None else None
+        except Exception as e:
+            logger.warning(f"Result of tool '{tool_name}' will not be memoized: {e}", extra={'tool_name': tool_name})
+            return None
+
+    def _tool(self, tool_name: str):
+        """
+        Returns the tool's instance, creating it on first use.
+        """
+        tool = self._tools.get(tool_name)
+        if tool is not None:
+            return tool
+        with self._init_locks[tool_name]:
+            tool = self._tools.get(tool_name)
+            if tool is None:
+                try:
+                    tool = self._factories[tool_name]()
+                except Exception as e:
+                    logger.error(f"Tool '{tool_name}' could not be initialized: {e}", exc_info=True)
+                    raise ToolExecutionError(f"Tool '{tool_name}' could not be initialized: {e}") from e
+                self._tools[tool_name] = tool
+                logger.info(f"Tool '{tool_name}' initialized.", extra={'tool_name': tool_name})
+        return tool
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-batch")
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                # Spawned rather than forked: the parent runs several threads.
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    def _run_tool(self, tool_name: str, parameters: dict) -> str:
+        """
+        Runs a tool directly, bypassing validation and speculation. Used for background runs, which
+        only take a free concurrency slot, so they never hold up the calls the model actually makes.
+        """
+        return self._invoke(tool_name, parameters, current_token(), wait_for_slot=False)
+
+    @staticmethod
+    def _describe(tool_class) -> str:
+        doc = (tool_class.__doc__ or "").strip()
+        return doc.splitlines()[0].strip() if doc else ""
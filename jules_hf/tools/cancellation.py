@@ -0,0 +1,193 @@
+# Jules for Hugging Face - Deadlines and Cancellation
+
+import contextlib
+import contextvars
+import os
+import signal
+import subprocess
+import threading
+import time
+import weakref
+from typing import Optional, Sequence
+from ..core.exceptions import ToolCancelledError, ToolTimeoutError
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# The token of the tool call (or agent turn) running in the current context.
+_current_token = contextvars.ContextVar("tool_cancellation_token", default=None)
+
+class CancellationToken:
+    """
+    A deadline plus a cooperative cancellation flag, handed from the agent turn down to each tool call.
+
+    A child token never outlives its parent: its deadline is the earlier of the two, and cancelling
+    the parent cancels the child. In-process tools call `check()` (or `wait()` instead of sleeping)
+    between steps; subprocesses started with `run_subprocess` are killed when the token expires.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self.deadline = deadline
+        self.reason = None
+        self._event = threading.Event()
+        self._children = weakref.WeakSet()
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._adopt(self)
+
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float], parent: Optional["CancellationToken"] = None) -> "CancellationToken":
+        """
+        Returns a token that expires `timeout` seconds from now (never, if None) or with its parent.
+        """
+        return cls(None if timeout is None else time.monotonic() + timeout, parent=parent)
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        True once the token was cancelled, directly or through its parent.
+        """
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """
+        True once the deadline has passed.
+        """
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left until the deadline (never negative), or None without a deadline.
+        """
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        Cancels the token and every token derived from it.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+
+    def check(self):
+        """
+        Raises ToolCancelledError if the token was cancelled, or ToolTimeoutError if it expired.
+        """
+        if self.cancelled:
+            raise ToolCancelledError(f"Tool call {self.reason}.")
+        if self.expired:
+            raise ToolTimeoutError("Tool call exceeded its deadline.")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Sleeps for up to `timeout` seconds, returning early (True) if the token is cancelled or expires.
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return self._event.wait(timeout) or self.expired
+
+    def _adopt(self, child: "CancellationToken"):
+        with self._lock:
+            self._children.add(child)
+            cancelled = self._event.is_set()
+        if cancelled:
+            child.cancel(self.reason)
+
+def current_token() -> Optional[CancellationToken]:
+    """
+    Returns the token of the call running in this context, or None if it has no deadline.
+    """
+    return _current_token.get()
+
+@contextlib.contextmanager
+def use_token(token: Optional[CancellationToken]):
+    """
+    Makes `token` the current token for the duration of the block.
+    """
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+def check_cancelled():
+    """
+    Raises if the current call was cancelled or ran past its deadline; a no-op outside tool calls.
+    """
+    token = current_token()
+    if token is not None:
+        token.check()
+
+def run_subprocess(args: Sequence[str], check: bool = False, token: Optional[CancellationToken] = None,
+                   grace_period: float = 5.0, poll_interval: float = 0.1, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Runs a command like `subprocess.run(args, capture_output=True, text=True, check=check)`, but
+    within the deadline of `token` (default: the current token).
+
+    The command runs in its own process group. When the token expires or is cancelled, the whole
+    group is sent SIGTERM and, after `grace_period` seconds, SIGKILL, so helpers the command
+    spawned (e.g. git's remote helpers) die with it; then ToolTimeoutError or ToolCancelledError
+    is raised.
+    """
+    token = token if token is not None else current_token()
+    if token is not None:
+        token.check()
+    kwargs.setdefault("text", True)
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               start_new_session=(os.name == "posix"), **kwargs)
+    try:
+        while True:
+            timeout = None
+            if token is not None:
+                remaining = token.remaining()
+                timeout = poll_interval if remaining is None else min(poll_interval, remaining)
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+                break
+            except subprocess.TimeoutExpired:
+                if token.cancelled or token.expired:
+                    logger.warning(f"Killing '{args[0]}' (pid {process.pid}): {token.reason or 'deadline exceeded'}.")
+                    _kill_process_group(process, grace_period)
+                    token.check()
+    except BaseException:
+        # Never leave the command running behind an interrupted caller.
+        if process.poll() is None:
+            _kill_process_group(process, grace_period=0)
+        raise
+
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+def _kill_process_group(process: subprocess.Popen, grace_period: float):
+    """
+    Terminates the process's group, escalating to SIGKILL after the grace period, and reaps it.
+    """
+    def send(sig):
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, sig)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    send(signal.SIGTERM)
+    try:
+        process.wait(timeout=grace_period)
+    except subprocess.TimeoutExpired:
+        send(getattr(signal, "SIGKILL", signal.SIGTERM))
+        process.wait()
+    # Close the pipes; a descendant that left the group may still hold them open.
+    for stream in (process.stdout, process.stderr):
+        if stream is not None:
+            stream.close()
@@ -1,19 +1,57 @@
 # Jules for Hugging Face - File System Manager Tool
 
 import os
+from .cancellation import check_cancelled
 
 class FileSystemManager:
     """
     A tool for interacting with the file system.
     """
 
+    parameters_schema = {
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["create_file", "read_file"]},
+            "file_path": {"type": "string", "minLength": 1},
+        },
+        "required": ["file_path"],
+        "additionalProperties": False,
+    }
+
+    # Operations without side effects, which may be run speculatively.
+    read_only_operations = ("read_file",)
+
+    # Operations whose results may be memoized while the file is unchanged.
+    idempotent_operations = ("read_file",)
+
+    @staticmethod
+    def cache_key(parameters: dict) -> str:
+        """
+        Identifies a read by the absolute path of its file.
+        """
+        return os.path.abspath(parameters["file_path"])
+
+    @staticmethod
+    def cache_dependencies(parameters: dict):
+        """
+        Fingerprints the file by its modification time and size (None if it does not exist).
+        """
+        try:
+            stat = os.stat(parameters["file_path"])
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def run(self, parameters: dict) -> str:
         """
         Runs the FileSystemManager tool.
-        For now, we only support the 'create_file' operation.
+        Supports the 'create_file' and 'read_file' operations; 'create_file' is the default.
         """
+        check_cancelled()
         if "operation" in parameters and parameters["operation"] == "create_file":
             return self.create_file(parameters)
+        elif parameters.get("operation") == "read_file":
+            return self.read_file(parameters)
         else:
             # In a real implementation, we would have a more robust way
             # of dispatching to the correct method.
@@ -34,3 +72,17 @@ class FileSystemManager:
             return f"Successfully created file: {file_path}"
         except Exception as e:
             return f"Error creating file: {e}"
+
+    def read_file(self, parameters: dict) -> str:
+        """
+        Returns the contents of the file at the given file path.
+        """
+        file_path = parameters.get("file_path")
+        if not file_path:
+            return "Error: 'file_path' parameter is required."
+
+        try:
+            with open(file_path, "r") as f:
+                return f.read()
+        except Exception as e:
+            return f"Error reading file: {e}"
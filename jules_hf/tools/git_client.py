@@ -1,12 +1,87 @@
 # Jules for Hugging Face - Git Client Tool
 
+import os
 import subprocess
+from .cancellation import run_subprocess
+
+def _git_dir(path: str) -> str:
+    """
+    Returns the .git directory of the repository containing `path`.
+    """
+    path = os.path.abspath(path)
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.exists(candidate):
+            # Linked worktrees and submodules keep their Git directory elsewhere.
+            raise FileNotFoundError(f"{candidate} is not a directory.")
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise FileNotFoundError(f"No Git repository found at {path}.")
+        path = parent
+
+def _read(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read().strip()
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
 
 class GitClient:
     """
     A tool for interacting with Git repositories.
     """
 
+    parameters_schema = {
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["clone", "status"]},
+            "repo_url": {"type": "string", "minLength": 1},
+            "repo_path": {"type": "string", "minLength": 1},
+        },
+        "required": ["operation"],
+        "additionalProperties": False,
+    }
+
+    # Operations without side effects, which may be run speculatively.
+    read_only_operations = ("status",)
+
+    # Concurrent git commands on one repository contend for its index lock.
+    max_concurrency = 1
+
+    # Seconds a call may take; clones of large repositories are slow. Hung commands are killed.
+    timeout = 600
+
+    # Operations whose results may be memoized while HEAD and the index are unchanged.
+    idempotent_operations = ("status",)
+
+    @staticmethod
+    def cache_key(parameters: dict) -> str:
+        """
+        Identifies a call by its operation and the absolute path of the working tree.
+        """
+        return f"{parameters['operation']}:{os.path.abspath(parameters.get('repo_path', '.'))}"
+
+    @staticmethod
+    def cache_dependencies(parameters: dict):
+        """
+        Fingerprints the repository by HEAD, the commit it points to and the index's modification time.
+        Edits to tracked files made outside the agent are not seen until one of those changes; edits
+        made through other tools drop memoized results anyway.
+        """
+        git_dir = _git_dir(parameters.get("repo_path", "."))
+        head = _read(os.path.join(git_dir, "HEAD"))
+        ref = head[len("ref: "):] if head.startswith("ref: ") else None
+        commit = None
+        if ref is not None:
+            ref_path = os.path.join(git_dir, ref)
+            commit = _read(ref_path) if os.path.exists(ref_path) else _mtime(os.path.join(git_dir, "packed-refs"))
+        return head, commit, _mtime(os.path.join(git_dir, "index"))
+
     def run(self, parameters: dict) -> str:
         """
         Runs the GitClient tool.
@@ -15,6 +90,8 @@ class GitClient:
         operation = parameters.get("operation")
         if operation == "clone":
             return self.clone(parameters)
+        elif operation == "status":
+            return self.status(parameters)
         else:
             return f"Error: Unsupported operation '{operation}' for GitClient."
 
@@ -27,14 +104,23 @@ class GitClient:
             return "Error: 'repo_url' parameter is required for the clone operation."
 
         try:
-            result = subprocess.run(
-                ["git", "clone", repo_url],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            result = run_subprocess(["git", "clone", repo_url], check=True)
             return f"Successfully cloned repository: {repo_url}\n{result.stdout}"
         except subprocess.CalledProcessError as e:
             return f"Error cloning repository: {e}\n{e.stderr}"
         except FileNotFoundError:
             return "Error: 'git' command not found. Please ensure Git is installed and in your PATH."
+
+    def status(self, parameters: dict) -> str:
+        """
+        Returns the short status of a Git working tree (the current directory by default).
+        """
+        repo_path = parameters.get("repo_path", ".")
+
+        try:
+            result = run_subprocess(["git", "status", "--short", "--branch"], cwd=repo_path, check=True)
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            return f"Error getting repository status: {e}\n{e.stderr}"
+        except FileNotFoundError:
+            return "Error: 'git' command not found or repository path does not exist."
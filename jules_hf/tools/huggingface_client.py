@@ -1,20 +1,35 @@
 # Jules for Hugging Face - Hugging Face Client Tool
 
 import os
-from huggingface_hub import HfApi, create_repo, login
 from ..core.exceptions import ConfigurationError, ToolExecutionError
+from .cancellation import check_cancelled
 
 class HuggingFaceClient:
     """
     A tool for interacting with the Hugging Face Hub.
     Loads the API token from the HUGGING_FACE_HUB_TOKEN environment variable.
+    huggingface_hub is imported by the operations that use it, so importing this module (e.g. to
+    read its schema) does not load it.
     """
 
+    parameters_schema = {
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["login", "create_repo"]},
+            "repo_id": {"type": "string", "minLength": 1},
+            "repo_type": {"type": "string", "enum": ["model", "dataset", "space"]},
+        },
+        "required": ["operation"],
+        "additionalProperties": False,
+    }
+
+    # Keeps batched calls within the Hub's rate limits.
+    max_concurrency = 4
+
     def __init__(self):
         self.token = os.getenv("HUGGING_FACE_HUB_TOKEN")
         if not self.token:
             raise ConfigurationError("HUGGING_FACE_HUB_TOKEN environment variable not set.")
-        self.api = HfApi()
 
     def run(self, parameters: dict) -> str:
         """
@@ -33,8 +48,10 @@ class HuggingFaceClient:
         """
         Logs in to the Hugging Face Hub using the token from the environment.
         """
+        check_cancelled()
         try:
-            login(token=self.token, add_to_git_credential=True)
+            from huggingface_hub import login as hub_login
+            hub_login(token=self.token, add_to_git_credential=True)
             return "Successfully logged in to the Hugging Face Hub."
         except Exception as e:
             raise ToolExecutionError(f"Failed to log in to Hugging Face Hub: {e}") from e
@@ -49,8 +66,10 @@ class HuggingFaceClient:
 
         repo_type = parameters.get("repo_type", "model")
 
+        check_cancelled()
         try:
-            repo_url = create_repo(repo_id=repo_id, repo_type=repo_type, token=self.token)
+            from huggingface_hub import create_repo as hub_create_repo
+            repo_url = hub_create_repo(repo_id=repo_id, repo_type=repo_type, token=self.token)
             return f"Successfully created repository: {repo_url}"
         except Exception as e:
             raise ToolExecutionError(f"Failed to create repository '{repo_id}': {e}") from e
@@ -0,0 +1,87 @@
+# Jules for Hugging Face - Tool Result Memoization
+
+import copy
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Hashable, Optional, Tuple
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+class ToolResultCache:
+    """
+    A bounded LRU of results of idempotent tool calls.
+
+    Each entry is stored with the fingerprint of the state the call depends on (a file's mtime, a
+    repository's HEAD, ...), taken just before the tool ran. A lookup whose current fingerprint
+    differs from the stored one drops the entry and counts as a miss, so a result is only reused
+    while its inputs are unchanged. Hits, misses, invalidations and evictions are counted per tool.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (tool_name, key) -> (fingerprint, result)
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_key(parameters: dict) -> str:
+        """
+        Returns a canonical key for a call's parameters.
+        """
+        return json.dumps(parameters, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, tool_name: str, key: Hashable, fingerprint) -> Tuple[bool, Optional[object]]:
+        """
+        Returns (True, result) if a result for the call was stored under the same fingerprint,
+        and (False, None) otherwise.
+        """
+        with self._lock:
+            stats = self._stats[tool_name]
+            entry = self._entries.get((tool_name, key))
+            if entry is not None:
+                if entry[0] == fingerprint:
+                    self._entries.move_to_end((tool_name, key))
+                    stats["hits"] += 1
+                    return True, copy.deepcopy(entry[1])
+                del self._entries[(tool_name, key)]
+                stats["invalidations"] += 1
+            stats["misses"] += 1
+            return False, None
+
+    def put(self, tool_name: str, key: Hashable, fingerprint, result):
+        """
+        Stores a call's result, evicting the least recently used entries beyond `max_entries`.
+        """
+        with self._lock:
+            self._entries[(tool_name, key)] = (fingerprint, copy.deepcopy(result))
+            self._entries.move_to_end((tool_name, key))
+            while len(self._entries) > self.max_entries:
+                (evicted_tool, _), _ = self._entries.popitem(last=False)
+                self._stats[evicted_tool]["evictions"] += 1
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """
+        Drops every entry of one tool, or of all tools.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if tool_name is None or key[0] == tool_name]
+            for key in keys:
+                del self._entries[key]
+                self._stats[key[0]]["invalidations"] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of every tool that was looked up, including its hit rate.
+        """
+        with self._lock:
+            sizes = defaultdict(int)
+            for tool_name, _ in self._entries:
+                sizes[tool_name] += 1
+            result = {}
+            for tool_name, counters in self._stats.items():
+                lookups = counters["hits"] + counters["misses"]
+                result[tool_name] = dict(counters, entries=sizes[tool_name],
+                                         hit_rate=counters["hits"] / lookups if lookups else 0.0)
+            return result
@@ -0,0 +1,133 @@
+# Jules for Hugging Face - Tool Parameter Schemas
+
+from typing import Any, Callable, List
+from ..core.exceptions import ConfigurationError
+
+# A compiled validator takes a value and a path prefix and returns a list of error messages.
+Validator = Callable[[Any, str], List[str]]
+
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "null": lambda value: value is None,
+}
+
+def compile_schema(schema: dict) -> Callable[[Any], List[str]]:
+    """
+    Compiles a JSON-Schema-style parameter schema into a validator function.
+
+    The supported subset is what tool parameters need: `type` (a name or list of names), `enum`,
+    `properties`, `required`, `additionalProperties` (boolean), `items`, `minLength`, `minimum`
+    and `maximum`. All schema interpretation happens here, once; the returned function only runs
+    the precomputed checks and returns a list of error messages (empty if the value is valid).
+    """
+    validator = _compile(schema, "parameters")
+    return lambda value: validator(value, "parameters")
+
+def _compile(schema: dict, path: str) -> Validator:
+    if not isinstance(schema, dict):
+        raise ConfigurationError(f"Schema at '{path}' must be a dict, got {type(schema).__name__}.")
+
+    checks = []
+
+    expected = schema.get("type")
+    if expected is not None:
+        names = [expected] if isinstance(expected, str) else list(expected)
+        unknown = [name for name in names if name not in _TYPE_CHECKS]
+        if unknown:
+            raise ConfigurationError(f"Schema at '{path}' uses unsupported type(s): {unknown}.")
+        type_checks = tuple(_TYPE_CHECKS[name] for name in names)
+        label = " or ".join(names)
+
+        def check_type(value, where):
+            if not any(check(value) for check in type_checks):
+                return [f"{where}: expected {label}, got {type(value).__name__}"]
+            return []
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, where):
+            if value not in allowed:
+                return [f"{where}: must be one of {allowed}, got {value!r}"]
+            return []
+
+        checks.append(check_enum)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, where):
+            if isinstance(value, str) and len(value) < min_length:
+                return [f"{where}: must be at least {min_length} characters long"]
+            return []
+
+        checks.append(check_min_length)
+
+    if "minimum" in schema or "maximum" in schema:
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+
+        def check_range(value, where):
+            if not _TYPE_CHECKS["number"](value):
+                return []
+            if minimum is not None and value < minimum:
+                return [f"{where}: must be >= {minimum}"]
+            if maximum is not None and value > maximum:
+                return [f"{where}: must be <= {maximum}"]
+            return []
+
+        checks.append(check_range)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        properties = {
+            name: _compile(subschema, f"{path}.{name}")
+            for name, subschema in schema.get("properties", {}).items()
+        }
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties", True) is False
+
+        def check_object(value, where):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{where}: missing required field '{name}'" for name in required if name not in value]
+            for name, item in value.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    errors.extend(validator(item, f"{where}.{name}"))
+                elif closed:
+                    errors.append(f"{where}: unexpected field '{name}'")
+            return errors
+
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_validator = _compile(schema["items"], f"{path}[]")
+
+        def check_items(value, where):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for index, item in enumerate(value):
+                errors.extend(item_validator(item, f"{where}[{index}]"))
+            return errors
+
+        checks.append(check_items)
+
+    checks = tuple(checks)
+
+    def validate(value, where):
+        for check in checks:
+            errors = check(value, where)
+            if errors:
+                # Later checks assume earlier ones passed (e.g. the type), so stop at the first failure.
+                return errors
+        return []
+
+    return validate
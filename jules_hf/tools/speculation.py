@@ -0,0 +1,199 @@
+# Jules for Hugging Face - Speculative Tool Execution
+
+import json
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional, Tuple
+from ..core.exceptions import ToolBusyError
+from ..core.logging import get_logger
+from .cancellation import CancellationToken, use_token
+
+logger = get_logger(__name__)
+
+# Seconds between checks for cancellation while waiting on a speculative run.
+_POLL_INTERVAL = 0.1
+
+class SpeculativeExecutor:
+    """
+    Pre-runs likely read-only tool calls in the background while the agent waits on the LLM.
+
+    Predictions come from the most frequent recent read-only calls (most recent first on ties) or are
+    supplied by the caller. If the model then chooses one of them, its result is served without running
+    the tool again. Speculative results are dropped whenever a call with side effects executes, since
+    it may change what a read-only call would return, and at the end of every turn.
+
+    Runs execute under a token that `shutdown` cancels, so a hung run does not outlive the executor.
+    A run whose tool has no free concurrency slot is skipped rather than queued (see `skipped`).
+    """
+
+    def __init__(self, run_call: Callable[[str, dict], str], max_candidates: int = 2, history_size: int = 50):
+        self._run_call = run_call
+        self.max_candidates = max_candidates
+        self._history = deque(maxlen=history_size)
+        self._pending = {}  # call key -> (future, started_at, [finished_at] once done)
+        self._lock = threading.Lock()
+        self._token = CancellationToken()
+        self._executor = ThreadPoolExecutor(max_workers=max(max_candidates, 1), thread_name_prefix="tool-speculation")
+
+        self.launched = 0
+        self.hits = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.abandoned = 0
+        self.skipped = 0
+        self.wasted_seconds = 0.0
+
+    @staticmethod
+    def call_key(tool_name: str, parameters: dict) -> str:
+        """
+        Returns a canonical key identifying a tool call.
+        """
+        return f"{tool_name}:{json.dumps(parameters, sort_keys=True, separators=(',', ':'), default=str)}"
+
+    def record_call(self, tool_name: str, parameters: dict):
+        """
+        Remembers a read-only call the model made, to inform later predictions.
+        """
+        with self._lock:
+            self._history.append((tool_name, parameters))
+
+    def predict(self, limit: Optional[int] = None) -> List[Tuple[str, dict]]:
+        """
+        Returns up to `limit` likely next read-only calls, most likely first.
+        """
+        limit = self.max_candidates if limit is None else limit
+        with self._lock:
+            history = list(self._history)
+
+        counts = Counter()
+        latest = {}
+        calls = {}
+        for position, (tool_name, parameters) in enumerate(history):
+            key = self.call_key(tool_name, parameters)
+            counts[key] += 1
+            latest[key] = position
+            calls[key] = (tool_name, parameters)
+
+        ranked = sorted(counts, key=lambda key: (counts[key], latest[key]), reverse=True)
+        return [calls[key] for key in ranked[:limit]]
+
+    def start(self, candidates: Optional[List[Tuple[str, dict]]] = None) -> int:
+        """
+        Launches background runs for the candidates (or the predicted calls) and returns how many started.
+        """
+        candidates = self.predict() if candidates is None else candidates[:self.max_candidates]
+        started = 0
+        with self._lock:
+            for tool_name, parameters in candidates:
+                key = self.call_key(tool_name, parameters)
+                if key in self._pending:
+                    continue
+                future = self._executor.submit(self._run, tool_name, parameters)
+                finished = []
+                self._pending[key] = (future, time.monotonic(), finished)
+                future.add_done_callback(lambda _, finished=finished: finished.append(time.monotonic()))
+                self.launched += 1
+                started += 1
+        if started:
+            logger.debug(f"Started {started} speculative tool call(s).")
+        return started
+
+    def take(self, tool_name: str, parameters: dict,
+             token: Optional[CancellationToken] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Claims the speculative result for a call, waiting for it if it is still running, but no
+        longer than `token` allows. Returns (True, result) on a hit and (False, None) if there is
+        no usable result, including when the token expires or is cancelled first.
+        """
+        with self._lock:
+            entry = self._pending.pop(self.call_key(tool_name, parameters), None)
+        if entry is None:
+            return False, None
+
+        future = entry[0]
+        try:
+            result = self._wait(future, token)
+        except FutureTimeoutError:
+            logger.debug(f"Speculative run of '{tool_name}' did not finish in time and is abandoned.")
+            future.cancel()
+            with self._lock:
+                self.abandoned += 1
+            return False, None
+        except ToolBusyError:
+            logger.debug(f"Speculative run of '{tool_name}' was skipped: the tool had no free slot.")
+            with self._lock:
+                self.skipped += 1
+            return False, None
+        except Exception as e:
+            logger.debug(f"Speculative run of '{tool_name}' failed and will be retried normally: {e}")
+            with self._lock:
+                self.failed += 1
+            return False, None
+
+        with self._lock:
+            self.hits += 1
+        return True, result
+
+    def _run(self, tool_name: str, parameters: dict):
+        with use_token(self._token):
+            return self._run_call(tool_name, parameters)
+
+    @staticmethod
+    def _wait(future, token: Optional[CancellationToken]):
+        """
+        Returns the future's result, raising FutureTimeoutError once the token expires or is cancelled.
+        """
+        if token is None:
+            return future.result()
+        while True:
+            if token.cancelled or token.expired:
+                raise FutureTimeoutError()
+            remaining = token.remaining()
+            try:
+                return future.result(timeout=_POLL_INTERVAL if remaining is None else min(_POLL_INTERVAL, remaining))
+            except FutureTimeoutError:
+                continue
+
+    def discard(self):
+        """
+        Drops every outstanding speculative result, counting the work that was never used: a finished
+        run is charged its run time, one still running the time it has run so far.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            now = time.monotonic()
+            for future, started_at, finished in pending.values():
+                if future.cancel():
+                    self.cancelled += 1
+                    continue
+                self.wasted += 1
+                self.wasted_seconds += (finished[0] if finished else now) - started_at
+
+    def stats(self) -> dict:
+        """
+        Returns speculation counters, including the hit rate over all launched runs.
+        """
+        with self._lock:
+            return {
+                "launched": self.launched,
+                "hits": self.hits,
+                "wasted": self.wasted,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "abandoned": self.abandoned,
+                "skipped": self.skipped,
+                "hit_rate": self.hits / self.launched if self.launched else 0.0,
+                "wasted_seconds": self.wasted_seconds,
+                "pending": len(self._pending),
+            }
+
+    def shutdown(self):
+        """
+        Discards outstanding work, cancels running calls and stops the background workers.
+        """
+        self._token.cancel("stopped with the speculative executor")
+        self.discard()
+        self._executor.shutdown(wait=False, cancel_futures=True)
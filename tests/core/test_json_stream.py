@@ -0,0 +1,56 @@
+# tests/core/test_json_stream.py
+
+import unittest
+from jules_hf.core.json_stream import IncrementalJSONObjectParser
+
+class TestIncrementalJSONObjectParser(unittest.TestCase):
+    """
+    Unit tests for the IncrementalJSONObjectParser class.
+    """
+
+    def feed_chars(self, parser, text):
+        """
+        Feeds text one character at a time, returning the number of characters consumed before completion.
+        """
+        for index, char in enumerate(text):
+            if parser.feed(char):
+                return index + 1
+        return len(text)
+
+    def test_action_is_known_before_object_closes(self):
+        """
+        Test that a top-level string field is surfaced as soon as its value is complete.
+        """
+        parser = IncrementalJSONObjectParser()
+        text = '{"action": "execute_tool", "parameters": {"action": "nested"}'
+        self.feed_chars(parser, text[:len('{"action": "execute_tool"')])
+
+        self.assertEqual(parser.field("action"), "execute_tool")
+        self.assertFalse(parser.complete)
+
+        self.feed_chars(parser, text[len('{"action": "execute_tool"'):])
+        self.assertEqual(parser.field("action"), "execute_tool")
+
+    def test_completes_at_closing_brace_and_ignores_trailing_text(self):
+        """
+        Test that the parser stops at the end of the top-level object.
+        """
+        parser = IncrementalJSONObjectParser()
+        text = ' {"action": "ask_user", "question": "a } in {a string}"} trailing'
+        consumed = self.feed_chars(parser, text)
+
+        self.assertTrue(parser.complete)
+        self.assertEqual(consumed, text.index("} trailing") + 1)
+        self.assertEqual(parser.result(), {"action": "ask_user", "question": "a } in {a string}"})
+
+    def test_escaped_strings_are_decoded(self):
+        """
+        Test that escape sequences in field values are decoded.
+        """
+        parser = IncrementalJSONObjectParser()
+        parser.feed('{"final_message": "say \\"hi\\"\\n", "action": "complete_task"}')
+        self.assertEqual(parser.field("final_message"), 'say "hi"\n')
+        self.assertEqual(parser.field("action"), "complete_task")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# tests/core/test_llm_cache.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from jules_hf.core.llm_cache import LLMResponseCache, CachingLLMProvider
+from jules_hf.core.llm_provider import MockLLMProvider
+
+class CountingLLMProvider(MockLLMProvider):
+    """
+    A mock provider that records how many prompts actually reached it.
+    """
+    model_id = "test-model"
+
+    def __init__(self, response: dict):
+        super().__init__(response)
+        self.calls = 0
+
+    def get_structured_response(self, prompt: str) -> dict:
+        self.calls += 1
+        return dict(self.response)
+
+class TestLLMResponseCache(unittest.TestCase):
+    """
+    Unit tests for the LLMResponseCache and CachingLLMProvider classes.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary cache directory.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove the temporary cache directory.
+        """
+        shutil.rmtree(self.cache_dir)
+
+    def test_identical_prompt_is_served_from_cache(self):
+        """
+        Test that a repeated prompt only reaches the wrapped provider once.
+        """
+        provider = CountingLLMProvider({"action": "ask_user", "question": "?"})
+        caching = CachingLLMProvider(provider, LLMResponseCache(self.cache_dir))
+
+        first = caching.get_structured_response("prompt")
+        second = caching.get_structured_response("prompt")
+
+        self.assertEqual(first, second)
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(caching.cache.stats()["hits"], 1)
+        self.assertEqual(caching.cache.stats()["misses"], 1)
+
+    def test_entries_persist_across_instances(self):
+        """
+        Test that a new cache instance serves entries written by a previous one.
+        """
+        key = LLMResponseCache.make_key("test-model", "prompt")
+        LLMResponseCache(self.cache_dir).put(key, {"action": "complete_task", "final_message": "Done"})
+
+        reloaded = LLMResponseCache(self.cache_dir)
+        self.assertEqual(reloaded.get(key), {"action": "complete_task", "final_message": "Done"})
+
+    def test_key_depends_on_model_id(self):
+        """
+        Test that the same prompt sent to different models maps to different keys.
+        """
+        self.assertNotEqual(LLMResponseCache.make_key("a", "prompt"), LLMResponseCache.make_key("b", "prompt"))
+
+    def test_expired_entries_are_misses(self):
+        """
+        Test that entries older than the TTL are not returned.
+        """
+        cache = LLMResponseCache(self.cache_dir, ttl_seconds=10)
+        key = LLMResponseCache.make_key("test-model", "prompt")
+        cache.put(key, {"action": "test"})
+
+        with patch("jules_hf.core.llm_cache.time.time", return_value=10**12):
+            self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(cache._entry_path(key)))
+
+    def test_disk_size_budget_evicts_oldest(self):
+        """
+        Test that the on-disk store drops the oldest entries once it exceeds its byte budget.
+        """
+        cache = LLMResponseCache(self.cache_dir, max_disk_bytes=200)
+        keys = [LLMResponseCache.make_key("test-model", f"prompt {i}") for i in range(10)]
+        for key in keys:
+            cache.put(key, {"action": "test"})
+
+        stats = cache.stats()
+        self.assertLessEqual(stats["disk_bytes"], 200)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertNotIn(keys[0], cache._disk_index)
+        self.assertIn(keys[-1], cache._disk_index)
+
+    def test_batch_only_sends_distinct_misses(self):
+        """
+        Test that a batch reuses cached entries and collapses duplicate prompts.
+        """
+        provider = CountingLLMProvider({"action": "test"})
+        caching = CachingLLMProvider(provider, LLMResponseCache(self.cache_dir))
+        caching.get_structured_response("cached")
+
+        responses = caching.get_structured_responses(["cached", "new", "new"])
+        self.assertEqual(responses, [{"action": "test"}] * 3)
+        self.assertEqual(provider.calls, 2)
+
+    def test_invalidate_forces_fresh_call(self):
+        """
+        Test that invalidating a prompt makes the next call reach the provider again.
+        """
+        provider = CountingLLMProvider({"action": "test"})
+        caching = CachingLLMProvider(provider, LLMResponseCache(self.cache_dir))
+
+        caching.get_structured_response("prompt")
+        caching.invalidate("prompt")
+        caching.get_structured_response("prompt")
+        self.assertEqual(provider.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
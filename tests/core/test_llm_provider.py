@@ -1,8 +1,9 @@
 # tests/core/test_llm_provider.py
 
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
-from jules_hf.core.llm_provider import HuggingFaceLLMProvider
+from unittest.mock import patch, MagicMock, AsyncMock
+from jules_hf.core.llm_provider import HuggingFaceLLMProvider, MockLLMProvider
 from jules_hf.core.exceptions import LLMError
 from jules_hf.core.config import config
 
@@ -11,7 +12,7 @@ class TestHuggingFaceLLMProvider(unittest.TestCase):
     Unit tests for the HuggingFaceLLMProvider class.
     """
 
-    @patch('jules_hf.core.llm_provider.InferenceClient')
+    @patch('huggingface_hub.InferenceClient')
     def test_get_structured_response_success(self, MockInferenceClient):
         """
         Test that the provider returns a parsed JSON object on a successful API call.
@@ -32,7 +33,7 @@ class TestHuggingFaceLLMProvider(unittest.TestCase):
         self.assertEqual(response, {"action": "test"})
         mock_client_instance.chat.completions.create.assert_called_once()
 
-    @patch('jules_hf.core.llm_provider.InferenceClient')
+    @patch('huggingface_hub.InferenceClient')
     def test_api_error_raises_llm_error(self, MockInferenceClient):
         """
         Test that an API error raises an LLMError.
@@ -45,7 +46,7 @@ class TestHuggingFaceLLMProvider(unittest.TestCase):
             with self.assertRaises(LLMError):
                 provider.get_structured_response("test prompt")
 
-    @patch('jules_hf.core.llm_provider.InferenceClient')
+    @patch('huggingface_hub.InferenceClient')
     def test_invalid_json_raises_llm_error(self, MockInferenceClient):
         """
         Test that an invalid JSON response from the LLM raises an LLMError.
@@ -61,6 +62,52 @@ class TestHuggingFaceLLMProvider(unittest.TestCase):
             with self.assertRaises(LLMError):
                 provider.get_structured_response("test prompt")
 
+    @staticmethod
+    def _stream_chunks(pieces):
+        """
+        Builds mock streaming chunks, recording how many were consumed.
+        """
+        consumed = []
+
+        def generator():
+            for piece in pieces:
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = piece
+                consumed.append(piece)
+                yield chunk
+
+        return generator(), consumed
+
+    @patch('huggingface_hub.InferenceClient')
+    def test_stream_returns_as_soon_as_object_closes(self, MockInferenceClient):
+        """
+        Test that the streaming path returns the parsed object without draining the rest of the stream.
+        """
+        stream, consumed = self._stream_chunks(['{"action": "ask_user", ', '"question": "Why?"}', ' extra', ' tokens'])
+        MockInferenceClient.return_value.chat.completions.create.return_value = stream
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            response = provider.stream_structured_response("test prompt", lambda action: action == "ask_user")
+
+        self.assertEqual(response, {"action": "ask_user", "question": "Why?"})
+        self.assertEqual(len(consumed), 2)
+
+    @patch('huggingface_hub.InferenceClient')
+    def test_stream_stops_on_invalid_action(self, MockInferenceClient):
+        """
+        Test that generation is abandoned as soon as the action is known to be invalid.
+        """
+        stream, consumed = self._stream_chunks(['{"action": "delete_everything"', ', "parameters": {', '}}'])
+        MockInferenceClient.return_value.chat.completions.create.return_value = stream
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            with self.assertRaises(LLMError):
+                provider.stream_structured_response("test prompt", lambda action: action == "ask_user")
+
+        self.assertEqual(len(consumed), 1)
+
     def test_missing_model_id_raises_error(self):
         """
         Test that a missing model_id in the config raises an LLMError.
@@ -69,5 +116,132 @@ class TestHuggingFaceLLMProvider(unittest.TestCase):
             with self.assertRaises(LLMError):
                 HuggingFaceLLMProvider()
 
+    @patch('huggingface_hub.AsyncInferenceClient')
+    @patch('huggingface_hub.InferenceClient')
+    def test_aget_structured_response_reuses_pooled_client(self, MockInferenceClient, MockAsyncInferenceClient):
+        """
+        Test that concurrent async calls share a single pooled client and return parsed JSON.
+        """
+        mock_api_response = MagicMock()
+        mock_api_response.choices[0].message.content = '{"action": "test"}'
+        mock_async_client = MockAsyncInferenceClient.return_value
+        mock_async_client.chat.completions.create = AsyncMock(return_value=mock_api_response)
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+
+            async def run_concurrently():
+                return await asyncio.gather(*(provider.aget_structured_response(f"prompt {i}") for i in range(5)))
+
+            responses = asyncio.run(run_concurrently())
+
+        self.assertEqual(responses, [{"action": "test"}] * 5)
+        MockAsyncInferenceClient.assert_called_once()
+        self.assertEqual(mock_async_client.chat.completions.create.await_count, 5)
+
+    @patch('huggingface_hub.AsyncInferenceClient')
+    @patch('huggingface_hub.InferenceClient')
+    def test_aget_structured_response_api_error_raises_llm_error(self, MockInferenceClient, MockAsyncInferenceClient):
+        """
+        Test that an async API error raises an LLMError.
+        """
+        mock_async_client = MockAsyncInferenceClient.return_value
+        mock_async_client.chat.completions.create = AsyncMock(side_effect=Exception("API is down"))
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            with self.assertRaises(LLMError):
+                asyncio.run(provider.aget_structured_response("test prompt"))
+
+    @patch('huggingface_hub.AsyncInferenceClient')
+    @patch('huggingface_hub.InferenceClient')
+    def test_get_structured_responses_preserves_input_order(self, MockInferenceClient, MockAsyncInferenceClient):
+        """
+        Test that batched responses come back in input order even when later prompts finish first.
+        """
+        async def create(model, messages, response_format):
+            index = int(messages[0]["content"])
+            await asyncio.sleep(0.001 * (5 - index))
+            response = MagicMock()
+            response.choices[0].message.content = f'{{"index": {index}}}'
+            return response
+
+        mock_async_client = MockAsyncInferenceClient.return_value
+        mock_async_client.chat.completions.create = create
+        mock_async_client.close = AsyncMock()
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            responses = provider.get_structured_responses([str(i) for i in range(5)], max_concurrency=2)
+
+        self.assertEqual(responses, [{"index": i} for i in range(5)])
+        mock_async_client.close.assert_awaited_once()
+
+    @patch('huggingface_hub.AsyncInferenceClient')
+    @patch('huggingface_hub.InferenceClient')
+    def test_get_structured_responses_return_exceptions(self, MockInferenceClient, MockAsyncInferenceClient):
+        """
+        Test that a failing prompt can be reported in place without failing the batch.
+        """
+        async def create(model, messages, response_format):
+            if messages[0]["content"] == "bad":
+                raise Exception("API is down")
+            response = MagicMock()
+            response.choices[0].message.content = '{"action": "test"}'
+            return response
+
+        mock_async_client = MockAsyncInferenceClient.return_value
+        mock_async_client.chat.completions.create = create
+        mock_async_client.close = AsyncMock()
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            responses = provider.get_structured_responses(["good", "bad"], return_exceptions=True)
+
+        self.assertEqual(responses[0], {"action": "test"})
+        self.assertIsInstance(responses[1], LLMError)
+
+    @patch('huggingface_hub.AsyncInferenceClient')
+    @patch('huggingface_hub.InferenceClient')
+    def test_async_client_of_a_finished_loop_is_closed(self, MockInferenceClient, MockAsyncInferenceClient):
+        """
+        Test that the async client is closed, not leaked, when a call runs on a new event loop.
+        """
+        clients = []
+
+        def make_client():
+            client = MagicMock()
+            client.chat.completions.create = AsyncMock(return_value=mock_api_response)
+            client.close = AsyncMock()
+            clients.append(client)
+            return client
+
+        mock_api_response = MagicMock()
+        mock_api_response.choices[0].message.content = '{"action": "test"}'
+        MockAsyncInferenceClient.side_effect = make_client
+
+        with patch.dict(config.settings, {"llm": {"model_id": "test-model"}}):
+            provider = HuggingFaceLLMProvider()
+            asyncio.run(provider.aget_structured_response("first"))
+            asyncio.run(provider.aget_structured_response("second"))
+
+        self.assertEqual(len(clients), 2)
+        clients[0].close.assert_awaited_once()
+        clients[1].close.assert_not_awaited()
+
+
+class TestMockLLMProvider(unittest.TestCase):
+    """
+    Unit tests for the MockLLMProvider class.
+    """
+
+    def test_aget_structured_response_returns_mock_response(self):
+        """
+        Test that the mock provider returns its canned response asynchronously.
+        """
+        provider = MockLLMProvider(response={"action": "ask_user", "question": "?"})
+        response = asyncio.run(provider.aget_structured_response("test prompt"))
+        self.assertEqual(response, {"action": "ask_user", "question": "?"})
+
 if __name__ == '__main__':
     unittest.main()
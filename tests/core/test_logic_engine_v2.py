@@ -1,9 +1,11 @@
 # tests/core/test_logic_engine_v2.py
 
+import asyncio
 import unittest
 from jules_hf.core.logic_engine_v2 import LogicEngineV2
 from jules_hf.core.llm_provider import MockLLMProvider
 from jules_hf.core.exceptions import LLMError
+from jules_hf.tools.abstraction_layer import ToolAbstractionLayer
 
 class TestLogicEngineV2(unittest.TestCase):
     """
@@ -35,6 +37,89 @@ class TestLogicEngineV2(unittest.TestCase):
         action = engine.get_next_action(self.test_state)
         self.assertEqual(action, mock_response)
 
+    def test_aget_next_action_success(self):
+        """
+        Test that the async engine path returns a valid action from the LLM.
+        """
+        mock_response = {"action": "complete_task", "final_message": "Done"}
+        engine = LogicEngineV2(MockLLMProvider(response=mock_response))
+
+        action = asyncio.run(engine.aget_next_action(self.test_state))
+        self.assertEqual(action, mock_response)
+
+    def test_get_next_actions_returns_actions_in_order(self):
+        """
+        Test that a batch of states yields one validated action per state.
+        """
+        mock_response = {"action": "ask_user", "question": "Which file?"}
+        engine = LogicEngineV2(MockLLMProvider(response=mock_response))
+
+        actions = engine.get_next_actions([self.test_state, dict(self.test_state, current_task={"title": "Other"})])
+        self.assertEqual(actions, [mock_response, mock_response])
+
+    def test_get_next_actions_reports_invalid_responses_in_place(self):
+        """
+        Test that invalid responses can be returned as errors instead of failing the batch.
+        """
+        engine = LogicEngineV2(MockLLMProvider(response={"invalid": "response"}))
+
+        with self.assertRaises(LLMError):
+            engine.get_next_actions([self.test_state])
+
+        actions = engine.get_next_actions([self.test_state], return_exceptions=True)
+        self.assertIsInstance(actions[0], LLMError)
+
+    def test_parameter_validator_rejects_bad_tool_calls(self):
+        """
+        Test that tool parameters are checked by the injected validator before the action is returned.
+        """
+        mock_response = {"action": "execute_tool", "tool_name": "test_tool", "parameters": {"param": 1}}
+        validator = lambda tool_name, parameters: [] if isinstance(parameters.get("param"), str) else ["parameters.param: expected string"]
+        engine = LogicEngineV2(MockLLMProvider(response=mock_response), parameter_validator=validator)
+
+        with self.assertRaisesRegex(LLMError, "parameters.param: expected string"):
+            engine.get_next_action(self.test_state)
+
+    def test_batched_tool_calls_are_validated_per_call(self):
+        """
+        Test that an execute_tools action is accepted only if every call in it is valid.
+        """
+        calls = [{"tool_name": "test_tool", "parameters": {"param": "a"}},
+                 {"tool_name": "test_tool", "parameters": {"param": "b"}}]
+        validator = lambda tool_name, parameters: [] if isinstance(parameters.get("param"), str) else ["parameters.param: expected string"]
+        engine = LogicEngineV2(MockLLMProvider(response={"action": "execute_tools", "tool_calls": calls}),
+                               parameter_validator=validator)
+        self.assertEqual(engine.get_next_action(self.test_state)["tool_calls"], calls)
+
+        calls[1]["parameters"]["param"] = 2
+        with self.assertRaisesRegex(LLMError, r"tool_calls\[1\]: parameters.param: expected string"):
+            engine.get_next_action(self.test_state)
+
+    def test_malformed_tool_names_and_parameters_are_rejected(self):
+        """
+        Test that a non-string tool name or non-object parameters are reported as validation errors
+        instead of reaching the parameter validator.
+        """
+        validator = ToolAbstractionLayer().validate_parameters
+        responses = [
+            ({"action": "execute_tool", "tool_name": ["git_client"], "parameters": {}}, "'tool_name' must be a string"),
+            ({"action": "execute_tool", "tool_name": "git_client", "parameters": "status"}, "'parameters' must be an object"),
+            ({"action": "execute_tools", "tool_calls": [{"tool_name": {"a": 1}, "parameters": {}}]},
+             r"tool_calls\[0\]: 'tool_name' must be a string"),
+        ]
+        for response, message in responses:
+            engine = LogicEngineV2(MockLLMProvider(response=response), parameter_validator=validator)
+            with self.assertRaisesRegex(LLMError, message):
+                engine.get_next_action(self.test_state)
+
+    def test_streaming_mode_rejects_invalid_action(self):
+        """
+        Test that the engine passes its action validator to the streaming provider path.
+        """
+        engine = LogicEngineV2(MockLLMProvider(response={"action": "self_destruct"}), stream_responses=True)
+        with self.assertRaises(LLMError):
+            engine.get_next_action(self.test_state)
+
     def test_invalid_response_from_llm_raises_error(self):
         """
         Test that the engine raises an LLMError if the response is invalid.
@@ -0,0 +1,106 @@
+# tests/core/test_memory.py
+
+import unittest
+from jules_hf.core.memory import ShortTermMemory
+from jules_hf.core.prompt_builder import IncrementalPromptBuilder
+
+class TestShortTermMemory(unittest.TestCase):
+    """
+    Unit tests for the ShortTermMemory class.
+    """
+
+    def make_turn(self, index):
+        """
+        Returns the assistant/system entry pair produced by one tool turn.
+        """
+        action = {"action": "execute_tool", "tool_name": "git_client", "parameters": {"operation": "clone", "n": index}}
+        return [{"role": "assistant", "action": action}, {"role": "system", "observation": f"result {index}\n" + "x" * 200}]
+
+    def test_behaves_like_a_list_while_under_budget(self):
+        """
+        Test that appended entries can be iterated, indexed and counted.
+        """
+        memory = ShortTermMemory()
+        memory.extend(self.make_turn(1))
+
+        self.assertEqual(len(memory), 2)
+        self.assertEqual(memory[0]["role"], "assistant")
+        self.assertEqual([entry["role"] for entry in memory], ["assistant", "system"])
+        self.assertEqual(memory.summary, "")
+
+    def test_size_stays_bounded_over_long_sessions(self):
+        """
+        Test that the window and summary stay within budget however many turns are appended.
+        """
+        memory = ShortTermMemory(max_bytes=2000, summary_max_bytes=300)
+        for index in range(500):
+            memory.extend(self.make_turn(index))
+
+        self.assertLessEqual(memory.size_bytes, 2000 + 300)
+        self.assertEqual(memory.appended_count, 1000)
+        self.assertEqual(memory.evicted_count + len(memory), 1000)
+        self.assertIn("earlier entries omitted", memory.summary)
+        self.assertIn("result 499", memory[-1]["observation"])
+
+    def test_evicted_entries_are_summarized(self):
+        """
+        Test that evicted turns leave a one-line trace in the rolling summary.
+        """
+        memory = ShortTermMemory(max_bytes=400)
+        for index in range(3):
+            memory.extend(self.make_turn(index))
+
+        self.assertIn("assistant: execute_tool git_client.clone", memory.summary)
+        self.assertIn("system: observed result 0", memory.summary)
+        self.assertEqual(memory.to_list()[0]["role"], "system")
+
+    def test_large_observations_are_truncated(self):
+        """
+        Test that a single oversized observation is clipped before it is stored.
+        """
+        memory = ShortTermMemory(max_observation_chars=100)
+        memory.append({"role": "system", "observation": "y" * 10000})
+        self.assertLess(len(memory[0]["observation"]), 200)
+        self.assertIn("chars truncated", memory[0]["observation"])
+
+    def test_state_round_trips_through_deltas(self):
+        """
+        Test that a full state plus deltas rebuilds the memory exactly, including across evictions and clears.
+        """
+        memory = ShortTermMemory(max_bytes=1000, summary_max_bytes=200)
+        restored = ShortTermMemory(max_bytes=1000, summary_max_bytes=200)
+        memory.extend(self.make_turn(0))
+        checkpoint = memory.to_state()
+        restored.load_state(checkpoint)
+
+        for index in range(1, 12):
+            memory.extend(self.make_turn(index))
+            if index == 8:
+                memory.clear()
+            delta = memory.state_since(checkpoint)
+            self.assertLessEqual(len(delta["appended"]), len(memory))
+            restored.load_state(delta, delta=True)
+            checkpoint = delta
+            self.assertEqual(restored.to_list(), memory.to_list())
+            self.assertEqual((restored.appended_count, restored.evicted_count, restored.size_bytes),
+                             (memory.appended_count, memory.evicted_count, memory.size_bytes))
+
+    def test_prompt_builder_tracks_evictions(self):
+        """
+        Test that the incremental prompt builder drops evicted entries and shows the summary.
+        """
+        memory = ShortTermMemory(max_bytes=800)
+        builder = IncrementalPromptBuilder()
+        state = {"current_task": {"title": "Task"}, "available_tools": [], "short_term_memory": memory}
+
+        for index in range(20):
+            memory.extend(self.make_turn(index))
+            prompt = builder.build(state)
+
+        self.assertEqual(prompt, IncrementalPromptBuilder().build(state))
+        self.assertNotIn('"n":0}', prompt)
+        self.assertIn("result 19", prompt)
+        self.assertIn('"summary"', prompt)
+
+if __name__ == '__main__':
+    unittest.main()
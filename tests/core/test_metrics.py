@@ -0,0 +1,121 @@
+# tests/core/test_metrics.py
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.request
+from jules_hf.core.metrics import MetricsExporter, MetricsRegistry
+
+class TestMetricsRegistry(unittest.TestCase):
+    """
+    Unit tests for the MetricsRegistry class.
+    """
+
+    def setUp(self):
+        """
+        Set up a registry with one metric of each type.
+        """
+        self.registry = MetricsRegistry()
+        self.calls = self.registry.counter("calls_total", "Calls.", ("tool", "outcome"))
+        self.in_flight = self.registry.gauge("in_flight", "Calls in flight.")
+        self.latency = self.registry.histogram("latency_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+
+    def test_prometheus_text_format(self):
+        """
+        Test that counters, gauges and cumulative histogram buckets are rendered in exposition format.
+        """
+        self.calls.labels("git", "success").inc()
+        self.calls.labels("git", "success").inc(2)
+        self.calls.labels('a"b', "error").inc()
+        self.in_flight.inc()
+        self.in_flight.inc()
+        self.in_flight.dec()
+        for value in (0.05, 0.5, 5.0):
+            self.latency.labels("git").observe(value)
+
+        self.assertEqual(self.registry.to_prometheus(), "\n".join([
+            "# HELP calls_total Calls.",
+            "# TYPE calls_total counter",
+            'calls_total{tool="a\\"b",outcome="error"} 1',
+            'calls_total{tool="git",outcome="success"} 3',
+            "# HELP in_flight Calls in flight.",
+            "# TYPE in_flight gauge",
+            "in_flight 1",
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{tool="git",le="0.1"} 1',
+            'latency_seconds_bucket{tool="git",le="1.0"} 2',
+            'latency_seconds_bucket{tool="git",le="+Inf"} 3',
+            'latency_seconds_sum{tool="git"} 5.55',
+            'latency_seconds_count{tool="git"} 3',
+        ]) + "\n")
+
+    def test_json_snapshot_and_registration_conflicts(self):
+        """
+        Test the JSON snapshot, that registering a name again returns the same metric, and that a
+        conflicting registration is rejected.
+        """
+        self.in_flight.set(4)
+        self.in_flight.dec()
+        self.latency.labels("hub").observe(2.0)
+        snapshot = json.loads(json.dumps(self.registry.to_json()))
+
+        self.assertEqual(snapshot["in_flight"]["samples"], [{"labels": {}, "value": 3}])
+        self.assertEqual(snapshot["latency_seconds"]["samples"][0],
+                         {"labels": {"tool": "hub"}, "buckets": {"0.1": 0, "1.0": 0, "+Inf": 1}, "sum": 2.0, "count": 1})
+        self.assertIs(self.registry.counter("calls_total", "Calls.", ("tool", "outcome")), self.calls)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("calls_total", "Calls.")
+        with self.assertRaises(ValueError):
+            self.calls.labels("git")
+
+    def test_concurrent_updates_are_not_lost(self):
+        """
+        Test that updates from several threads all arrive, including past the pending-update limit.
+        """
+        child = self.calls.labels("git", "success")
+        histogram = self.latency.labels("git")
+
+        def work():
+            for _ in range(5000):
+                child.inc()
+                child.inc(0.5)
+                histogram.observe(0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(child.value, 30000)
+        self.assertEqual(histogram.snapshot()[0][-1], 20000)
+
+    def test_exporter_writes_files_and_serves_http(self):
+        """
+        Test that the exporter writes both formats and that the HTTP endpoint serves them.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.calls.labels("git", "success").inc()
+        exporter = MetricsExporter(self.registry, prometheus_file=os.path.join(directory, "metrics-{pid}.prom"),
+                                   json_file=os.path.join(directory, "metrics.json"), http_port=0)
+        try:
+            exporter.export()
+            with open(os.path.join(directory, f"metrics-{os.getpid()}.prom")) as f:
+                self.assertEqual(f.read(), self.registry.to_prometheus())
+            with open(os.path.join(directory, "metrics.json")) as f:
+                self.assertEqual(json.load(f)["calls_total"]["samples"][0]["value"], 1)
+
+            base = f"http://127.0.0.1:{exporter.http_port}"
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                self.assertIn('calls_total{tool="git",outcome="success"} 1', response.read().decode())
+            with urllib.request.urlopen(f"{base}/metrics.json") as response:
+                self.assertIn("latency_seconds", json.load(response))
+        finally:
+            exporter.close()
+
+if __name__ == '__main__':
+    unittest.main()
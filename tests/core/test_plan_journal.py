@@ -0,0 +1,89 @@
+# tests/core/test_plan_journal.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from jules_hf.core.plan_journal import PlanJournal, atomic_write_text
+
+class TestPlanJournal(unittest.TestCase):
+    """
+    Unit tests for the PlanJournal class and atomic snapshot writes.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory for journal files.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "plan.json.journal")
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+        shutil.rmtree(self.test_dir)
+
+    def test_append_and_replay(self):
+        """
+        Test that appended entries are replayed in order by a fresh journal.
+        """
+        journal = PlanJournal(self.path)
+        journal.append({"op": "set_status", "task_id": "T1", "status": "Completed"})
+        journal.append({"op": "set_status", "task_id": "T2", "status": "Ready"})
+        journal.close()
+
+        replayed = PlanJournal(self.path).replay()
+        self.assertEqual([entry["task_id"] for entry in replayed], ["T1", "T2"])
+
+    def test_torn_tail_is_discarded(self):
+        """
+        Test that a partially written final line is ignored and cut from the file.
+        """
+        journal = PlanJournal(self.path)
+        journal.append({"op": "set_status", "task_id": "T1", "status": "Completed"})
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"op":"set_st')
+
+        journal = PlanJournal(self.path)
+        self.assertEqual(len(journal.replay()), 1)
+        journal.append({"op": "set_status", "task_id": "T2", "status": "Completed"})
+        journal.close()
+        self.assertEqual(len(PlanJournal(self.path).replay()), 2)
+
+    def test_fsync_is_batched(self):
+        """
+        Test that fsync runs once per batch rather than once per append.
+        """
+        journal = PlanJournal(self.path, fsync_batch=4, fsync_interval=3600)
+        with patch("jules_hf.core.plan_journal.os.fsync") as mock_fsync:
+            for index in range(8):
+                journal.append({"op": "set_status", "task_id": f"T{index}", "status": "Completed"})
+            self.assertEqual(mock_fsync.call_count, 2)
+        journal.close()
+
+    def test_reset_empties_the_journal(self):
+        """
+        Test that reset leaves an empty journal behind.
+        """
+        journal = PlanJournal(self.path)
+        journal.append({"op": "set_status", "task_id": "T1", "status": "Completed"})
+        journal.reset()
+        self.assertEqual(journal.entries, 0)
+        self.assertEqual(PlanJournal(self.path).replay(), [])
+
+    def test_atomic_write_replaces_file(self):
+        """
+        Test that an atomic write replaces the contents and leaves no temporary file.
+        """
+        target = os.path.join(self.test_dir, "plan.json")
+        atomic_write_text(target, "old")
+        atomic_write_text(target, "new")
+        with open(target) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(self.test_dir), ["plan.json"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/core/test_plan_loader.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from jules_hf.core.plan_loader import LazyPlanLoader
+from jules_hf.core.plan_store import JSONPlanStore
+
+SAMPLE_PLAN = {
+    "project_name": "Lazy \"Project\"",
+    "epics": [
+        {"id": "E0", "status": "Completed", "goal": "Done {not a brace}", "milestones": [
+            {"id": "M0", "status": "Completed", "features": [
+                {"id": "F0", "tasks": [{"id": "T0", "status": "Ready", "title": "Old"}]}
+            ]}
+        ]},
+        {"status": "In Progress", "milestones": [
+            {"id": "M1", "status": "Completed", "features": [
+                {"id": "F1", "tasks": [{"id": "T1", "status": "Completed", "title": "Done [x]"}]}
+            ]},
+            {"id": "M2", "status": "In Progress", "features": [
+                {"id": "F2", "tasks": [{"id": "T2", "status": "Ready", "title": "Now"}]}
+            ]}
+        ], "id": "E1"},
+        {"id": "E2", "status": "Planned"}
+    ],
+    "version": 2
+}
+
+class TestLazyPlanLoader(unittest.TestCase):
+    """
+    Unit tests for the LazyPlanLoader class and lazy JSONPlanStore loading.
+    """
+
+    def setUp(self):
+        """
+        Writes the sample plan to a temporary file.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "plan.json")
+        with open(self.path, "w") as f:
+            json.dump(SAMPLE_PLAN, f, indent=4)
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+        shutil.rmtree(self.test_dir)
+
+    def test_only_active_branches_are_parsed(self):
+        """
+        Test that inactive epics and milestones are stubs holding just their id and status.
+        """
+        loader = LazyPlanLoader(self.path)
+        plan = loader.load()
+
+        self.assertEqual(plan["project_name"], 'Lazy "Project"')
+        self.assertEqual(plan["version"], 2)
+        self.assertEqual(plan["epics"][0], {"id": "E0", "status": "Completed"})
+        self.assertEqual(plan["epics"][2], {"id": "E2", "status": "Planned"})
+        self.assertEqual(plan["epics"][1]["milestones"][0], {"id": "M1", "status": "Completed"})
+        self.assertEqual(plan["epics"][1]["milestones"][1], SAMPLE_PLAN["epics"][1]["milestones"][1])
+        self.assertEqual(loader.pending, 3)
+        loader.close()
+
+    def test_materialize_restores_the_full_plan(self):
+        """
+        Test that materializing the stubs yields exactly what json.load would.
+        """
+        loader = LazyPlanLoader(self.path)
+        plan = loader.load()
+        loader.materialize()
+        self.assertEqual(plan, SAMPLE_PLAN)
+        self.assertEqual(loader.pending, 0)
+
+    def test_offset_index_is_reused_until_the_plan_changes(self):
+        """
+        Test that a saved offset index skips the scan and is ignored once the plan file changes.
+        """
+        LazyPlanLoader(self.path).close()
+        self.assertTrue(os.path.exists(self.path + ".index"))
+
+        with patch.object(LazyPlanLoader, "_scan") as mock_scan:
+            loader = LazyPlanLoader(self.path)
+            self.assertEqual(loader.load()["epics"][1]["id"], "E1")
+            loader.close()
+            mock_scan.assert_not_called()
+
+        changed = dict(SAMPLE_PLAN, epics=SAMPLE_PLAN["epics"][1:])
+        with open(self.path, "w") as f:
+            json.dump(changed, f)
+        loader = LazyPlanLoader(self.path)
+        plan = loader.load()
+        loader.materialize()
+        self.assertEqual(plan, changed)
+
+    def test_lazy_store_loads_deferred_branches_on_demand(self):
+        """
+        Test that the current task needs no deferred branch and other lookups load them.
+        """
+        store = JSONPlanStore(self.path, lazy=True)
+        self.assertEqual(store.get_current_task()["task"]["id"], "T2")
+        self.assertIsNotNone(store._loader)
+
+        self.assertEqual(store.get_task("T0")["milestone"], "M0")
+        self.assertIsNone(store._loader)
+        self.assertEqual(store.export_plan(), SAMPLE_PLAN)
+        store.close()
+
+    def test_invalid_file_falls_back_to_a_full_load(self):
+        """
+        Test that a file the scanner cannot handle is loaded the normal way.
+        """
+        with open(self.path, "w") as f:
+            f.write("{\"epics\": [")
+        store = JSONPlanStore(self.path, lazy=True)
+        self.assertIsNone(store._loader)
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/core/test_plan_model.py
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from jules_hf.core.plan_model import Epic, Plan, Task, json_default
+from jules_hf.core.plan_store import JSONPlanStore
+
+SAMPLE_PLAN = {
+    "project_name": "Test Project",
+    "epics": [
+        {"id": "E0", "goal": "Done", "status": "Completed"},
+        {"status": "In Progress", "id": "E1", "milestones": [
+            {"id": "M1", "status": "In Progress", "features": [
+                {"id": "F1", "description": "Feature", "tasks": [
+                    {"id": "T1", "status": "Ready", "title": "First", "owner": "alice"},
+                    {"id": "T2", "title": "Second", "status": "Ready"}
+                ]}
+            ]}
+        ]}
+    ]
+}
+
+class TestPlanModel(unittest.TestCase):
+    """
+    Unit tests for the slotted plan node classes.
+    """
+
+    def test_round_trip_is_lossless(self):
+        """
+        Test that converting to nodes and back reproduces the plan, key order included.
+        """
+        plan = Plan.from_dict(copy.deepcopy(SAMPLE_PLAN))
+        self.assertIsInstance(plan["epics"][1], Epic)
+        self.assertIsInstance(plan["epics"][1]["milestones"][0]["features"][0]["tasks"][0], Task)
+        self.assertEqual(json.dumps(plan.to_dict()), json.dumps(SAMPLE_PLAN))
+        self.assertEqual(json.dumps(plan, default=json_default), json.dumps(SAMPLE_PLAN))
+
+    def test_nodes_behave_like_dicts(self):
+        """
+        Test the mapping protocol, including unknown fields and equality with dicts.
+        """
+        task = Task.from_dict({"id": "T1", "status": "Ready", "owner": "alice"})
+        self.assertEqual(task.get("title", "untitled"), "untitled")
+        self.assertIn("owner", task)
+        self.assertEqual(list(task.items()), [("id", "T1"), ("status", "Ready"), ("owner", "alice")])
+        self.assertEqual(task, {"id": "T1", "status": "Ready", "owner": "alice"})
+
+        task["status"] = "Completed"
+        task["title"] = "Titled"
+        del task["owner"]
+        self.assertEqual(task.to_dict(), {"id": "T1", "status": "Completed", "title": "Titled"})
+        with self.assertRaises(KeyError):
+            task["owner"]
+        self.assertFalse(hasattr(task, "__dict__"))
+
+    def test_statuses_and_layouts_are_shared(self):
+        """
+        Test that equal statuses and key orders are stored once.
+        """
+        first = Task.from_dict(json.loads('{"id": "T1", "status": "In Progress"}'))
+        second = Task.from_dict(json.loads('{"id": "T2", "status": "In Progress"}'))
+        self.assertIs(first["status"], second["status"])
+        self.assertIs(first._keys, second._keys)
+
+    def test_store_with_compact_nodes(self):
+        """
+        Test that the JSON store works on plan nodes and writes the same JSON.
+        """
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "plan.json")
+            with open(path, "w") as f:
+                json.dump(SAMPLE_PLAN, f)
+
+            store = JSONPlanStore(path, compact_nodes=True)
+            self.assertIsInstance(store.plan, Plan)
+            self.assertEqual(store.get_current_task()["task"]["id"], "T1")
+            store.set_task_status("T1", "Completed")
+            store.compact()
+            store.close()
+
+            with open(path) as f:
+                saved = json.load(f)
+            expected = copy.deepcopy(SAMPLE_PLAN)
+            expected["epics"][1]["milestones"][0]["features"][0]["tasks"][0]["status"] = "Completed"
+            self.assertEqual(saved, expected)
+        finally:
+            shutil.rmtree(test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,345 @@
+# tests/core/test_plan_store.py
+
+import copy
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from jules_hf.core.plan_store import JSONPlanStore, SQLitePlanStore
+
+SAMPLE_PLAN = {
+    "project_name": "Test Project",
+    "epics": [
+        {"id": "E0", "status": "Completed", "goal": "Done"},
+        {"id": "E1", "status": "In Progress", "milestones": [
+            {"id": "M0", "status": "Completed", "features": [
+                {"id": "F0", "tasks": [{"id": "T0", "status": "Ready", "title": "Inactive"}]}
+            ]},
+            {"id": "M1", "status": "In Progress", "features": [
+                {"id": "F1", "description": "Feature", "tasks": [
+                    {"id": "T1", "status": "Ready", "title": "First", "notes": ["a", "b"]},
+                    {"id": "T2", "status": "Ready", "title": "Second"}
+                ]}
+            ]}
+        ]}
+    ]
+}
+
+def claim_all(db_path, owner, queue):
+    """
+    Worker process body: claims tasks until none is free and reports each claim.
+    """
+    store = SQLitePlanStore(db_path)
+    while True:
+        claimed = store.claim_task(owner, lease_seconds=60)
+        if claimed is None:
+            break
+        task_id = claimed["task"]["id"]
+        queue.put((owner, task_id))
+        store.release_task(task_id, owner, "Completed")
+    store.close()
+
+class LeaseContract:
+    """
+    Lease and versioning behavior shared by every plan store. Subclasses provide `self.store`.
+    """
+
+    def test_claims_are_distinct_until_released(self):
+        """
+        Test that concurrent claims get different tasks and a released task is not handed out again.
+        """
+        first = self.store.claim_task("worker-1", lease_seconds=60)
+        second = self.store.claim_task("worker-2", lease_seconds=60)
+        self.assertEqual(first["task"]["id"], "T1")
+        self.assertEqual(second["task"]["id"], "T2")
+        self.assertEqual(first["task"]["status"], "In Progress")
+        self.assertIsNone(self.store.claim_task("worker-3", lease_seconds=60))
+
+        self.assertFalse(self.store.release_task("T1", "worker-2", "Completed"))
+        self.assertTrue(self.store.release_task("T1", "worker-1", "Completed"))
+        self.assertEqual(self.store.get_task("T1")["task"]["status"], "Completed")
+        self.assertIsNone(self.store.claim_task("worker-3", lease_seconds=60))
+
+    def test_expired_leases_can_be_taken_over(self):
+        """
+        Test that a task whose lease expired is claimable again and the old owner cannot renew it.
+        """
+        self.store.claim_task("worker-1", lease_seconds=0.01)
+        time.sleep(0.02)
+        self.assertFalse(self.store.renew_lease("T1", "worker-1", 60))
+        self.assertEqual(self.store.claim_task("worker-2", lease_seconds=60)["task"]["id"], "T1")
+        self.assertTrue(self.store.renew_lease("T1", "worker-2", 60))
+        self.assertFalse(self.store.release_task("T1", "worker-1"))
+
+    def test_stale_versions_are_rejected(self):
+        """
+        Test optimistic versioning: an update based on an old version does not apply.
+        """
+        version = self.store.get_task("T2")["version"]
+        self.assertTrue(self.store.set_task_status("T2", "In Progress", expected_version=version))
+        self.assertFalse(self.store.set_task_status("T2", "Completed", expected_version=version))
+        self.assertEqual(self.store.get_task("T2")["task"]["status"], "In Progress")
+        self.assertEqual(self.store.get_task("T2")["version"], version + 1)
+
+DEPENDENCY_PLAN = {
+    "project_name": "Dependencies",
+    "epics": [{"id": "E", "status": "In Progress", "milestones": [
+        {"id": "M", "status": "In Progress", "features": [
+            {"id": "F", "tasks": [
+                {"id": "docs", "status": "Ready"},
+                {"id": "schema", "status": "Ready"},
+                {"id": "api", "status": "Ready", "depends_on": ["schema"], "estimate": 3},
+                {"id": "cli", "status": "Ready", "depends_on": ["schema"]}
+            ]}
+        ]}
+    ]}]
+}
+
+class SchedulingContract:
+    """
+    Dependency scheduling behavior shared by every plan store. Subclasses provide `make_store(plan)`.
+    """
+
+    def test_dependencies_and_critical_path_order_tasks(self):
+        """
+        Test that blocked tasks wait for their dependencies and the longest critical path goes first.
+        """
+        store = self.make_store(copy.deepcopy(DEPENDENCY_PLAN))
+        self.assertEqual(store.get_current_task()["task"]["id"], "schema")
+        self.assertEqual([task["id"] for task in store.get_runnable_tasks()], ["schema", "docs"])
+
+        store.claim_task("worker-1", lease_seconds=60)
+        self.assertEqual([task["id"] for task in store.get_runnable_tasks()], ["docs"])
+        store.release_task("schema", "worker-1", "Completed")
+        self.assertEqual([task["id"] for task in store.get_runnable_tasks()], ["api", "docs", "cli"])
+        self.assertEqual([task["id"] for task in store.get_runnable_tasks(2)], ["api", "docs"])
+
+        store.set_task_status("schema", "Ready")
+        self.assertEqual([task["id"] for task in store.get_runnable_tasks()], ["schema", "docs"])
+        store.close()
+
+class ProgressContract:
+    """
+    Task query and progress behavior shared by every plan store. Subclasses provide `make_store(plan)`.
+    """
+
+    def test_query_tasks_filters_by_status_and_scope(self):
+        """
+        Test that task queries combine status, epic and milestone filters in document order.
+        """
+        store = self.make_store(copy.deepcopy(SAMPLE_PLAN))
+        ids = lambda tasks: [task["id"] for task in tasks]
+        self.assertEqual(ids(store.query_tasks()), ["T0", "T1", "T2"])
+        self.assertEqual(ids(store.query_tasks(status="Ready", epic_id="E1")), ["T0", "T1", "T2"])
+        self.assertEqual(ids(store.query_tasks(milestone_id="M1")), ["T1", "T2"])
+        self.assertEqual(ids(store.query_tasks(epic_id="E1", milestone_id="M0")), ["T0"])
+        store.set_task_status("T1", "Completed")
+        self.assertEqual(ids(store.query_tasks(status="Ready", milestone_id="M1")), ["T2"])
+        self.assertEqual(store.query_tasks(epic_id="E9"), [])
+        store.close()
+
+    def test_progress_is_updated_with_each_status_change(self):
+        """
+        Test that counts and percent complete follow status changes at every level.
+        """
+        store = self.make_store(copy.deepcopy(SAMPLE_PLAN))
+        progress = store.get_progress()
+        self.assertEqual((progress["total"], progress["completed"], progress["percent_complete"]), (3, 0, 0.0))
+
+        store.set_task_status("T1", "Completed")
+        store.set_task_status("T2", "In Progress")
+        milestone = store.get_progress(milestone_id="M1")
+        self.assertEqual(milestone["epic"], "E1")
+        self.assertEqual(milestone["by_status"], {"Completed": 1, "In Progress": 1})
+        self.assertEqual(milestone["percent_complete"], 50.0)
+
+        plan = store.get_progress(include_children=True)
+        self.assertEqual(plan["by_status"], {"Ready": 1, "Completed": 1, "In Progress": 1})
+        self.assertEqual([(child["epic"], child["total"]) for child in plan["children"]], [("E0", 0), ("E1", 3)])
+        epic = store.get_progress("E1", include_children=True)
+        self.assertEqual([(child["milestone"], child["completed"]) for child in epic["children"]],
+                         [("M0", 0), ("M1", 1)])
+        self.assertIsNone(store.get_progress("E9"))
+        self.assertIsNone(store.get_progress("E0", "M1"))
+        store.close()
+
+class TestJSONPlanStoreScheduling(SchedulingContract, ProgressContract, unittest.TestCase):
+    """
+    Scheduling tests for the JSONPlanStore class.
+    """
+
+    def make_store(self, plan):
+        """
+        Writes the plan to a temporary file and opens a store on it.
+        """
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        path = os.path.join(test_dir, "plan.json")
+        with open(path, "w") as f:
+            json.dump(plan, f)
+        return JSONPlanStore(path)
+
+class TestSQLitePlanStoreScheduling(SchedulingContract, ProgressContract, unittest.TestCase):
+    """
+    Scheduling tests for the SQLitePlanStore class.
+    """
+
+    def make_store(self, plan):
+        """
+        Imports the plan into a store in a temporary directory.
+        """
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        store = SQLitePlanStore(os.path.join(test_dir, "plan.sqlite3"))
+        store.import_plan(plan)
+        return store
+
+class TestJSONPlanStoreLeases(LeaseContract, unittest.TestCase):
+    """
+    Lease tests for the JSONPlanStore class.
+    """
+
+    def setUp(self):
+        """
+        Writes the sample plan to a temporary file and opens a store on it.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        path = os.path.join(self.test_dir, "plan.json")
+        with open(path, "w") as f:
+            json.dump(SAMPLE_PLAN, f)
+        self.store = JSONPlanStore(path)
+
+    def tearDown(self):
+        """
+        Closes the store and removes the temporary directory.
+        """
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_write_behind_journals_coalesced_changes_on_flush(self):
+        """
+        Test that write-behind changes apply in memory at once and reach the journal, coalesced, on flush.
+        """
+        self.store.close()
+        self.store = JSONPlanStore(self.store.plan_file_path, write_behind=True, flush_interval=60)
+        journal_path = self.store.plan_file_path + ".journal"
+        self.store.set_task_status("T1", "In Progress")
+        self.store.set_task_status("T1", "Completed")
+        self.assertEqual(self.store.get_current_task()["task"]["id"], "T2")
+        self.assertFalse(os.path.exists(journal_path) and os.path.getsize(journal_path))
+
+        self.store.flush()
+        with open(journal_path) as f:
+            self.assertEqual([json.loads(line) for line in f],
+                             [{"op": "set_status", "task_id": "T1", "status": "Completed"}])
+        self.store.set_task_status("T2", "Completed")
+        self.store.close()
+
+        self.store = JSONPlanStore(self.store.plan_file_path)
+        self.assertIsNone(self.store.get_current_task()["task"]["id"])
+
+class TestSQLitePlanStore(LeaseContract, unittest.TestCase):
+    """
+    Unit tests for the SQLitePlanStore class.
+    """
+
+    def setUp(self):
+        """
+        Creates a store in a temporary directory and imports the sample plan.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "plan.sqlite3")
+        self.store = SQLitePlanStore(self.db_path)
+        self.store.import_plan(copy.deepcopy(SAMPLE_PLAN))
+
+    def tearDown(self):
+        """
+        Closes the store and removes the temporary directory.
+        """
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_export_round_trips_the_json_shape(self):
+        """
+        Test that exporting an imported plan reproduces it exactly.
+        """
+        self.assertEqual(self.store.export_plan(), SAMPLE_PLAN)
+        self.assertFalse(self.store.is_empty())
+
+    def test_current_task_and_lookups(self):
+        """
+        Test the current task, direct lookup and status queries.
+        """
+        self.assertEqual(self.store.get_current_task(), {
+            "epic": "E1", "milestone": "M1", "task": {"id": "T1", "status": "Ready", "title": "First", "notes": ["a", "b"]}
+        })
+        self.assertEqual(self.store.get_task("T2")["feature"], "F1")
+        self.assertIsNone(self.store.get_task("missing"))
+        self.assertEqual([task["id"] for task in self.store.get_tasks_by_status("Ready")], ["T0", "T1", "T2"])
+
+    def test_status_changes_persist(self):
+        """
+        Test that status changes move the current task and survive reopening the database.
+        """
+        self.assertTrue(self.store.set_task_status("T1", "Completed"))
+        self.assertFalse(self.store.set_task_status("missing", "Completed"))
+        self.assertEqual(self.store.get_current_task()["task"]["id"], "T2")
+        self.store.close()
+
+        self.store = SQLitePlanStore(self.db_path)
+        self.assertEqual(self.store.get_task("T1")["task"]["status"], "Completed")
+        self.store.set_task_status("T2", "Completed")
+        self.assertIsNone(self.store.get_current_task()["task"]["id"])
+
+    def test_missing_progress_is_rebuilt_on_open(self):
+        """
+        Test that a database without progress aggregates gets them recomputed from its tasks.
+        """
+        self.store.set_task_status("T1", "Completed")
+        self.store._conn.execute("DELETE FROM progress")
+        self.store.close()
+
+        self.store = SQLitePlanStore(self.db_path)
+        progress = self.store.get_progress("E1", "M1")
+        self.assertEqual(progress["by_status"], {"Completed": 1, "Ready": 1})
+
+    def test_runnable_query_uses_the_partial_index(self):
+        """
+        Test that the next runnable task is answered from its index rather than a table scan.
+        """
+        plan = self.store._conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT data {SQLitePlanStore._RUNNABLE} {SQLitePlanStore._RUNNABLE_ORDER} LIMIT 1"
+        ).fetchall()
+        details = " ".join(str(row) for row in plan)
+        self.assertIn("idx_tasks_runnable", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+    def test_worker_processes_claim_distinct_tasks(self):
+        """
+        Test that workers in separate processes never claim the same task.
+        """
+        plan = {"project_name": "Pool", "epics": [{"id": "E", "status": "In Progress", "milestones": [
+            {"id": "M", "status": "In Progress", "features": [
+                {"id": "F", "tasks": [{"id": f"T{index}", "status": "Ready"} for index in range(40)]}
+            ]}
+        ]}]}
+        self.store.import_plan(plan)
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        workers = [context.Process(target=claim_all, args=(self.db_path, f"worker-{index}", queue))
+                   for index in range(4)]
+        for worker in workers:
+            worker.start()
+        claims = [queue.get(timeout=60) for _ in range(40)]
+        for worker in workers:
+            worker.join(timeout=60)
+
+        self.assertEqual(sorted(task_id for _, task_id in claims), sorted(f"T{index}" for index in range(40)))
+        self.assertEqual(len(self.store.get_tasks_by_status("Completed")), 40)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/core/test_prompt_builder.py
+
+import json
+import unittest
+from unittest.mock import patch
+from jules_hf.core import prompt_builder
+from jules_hf.core.prompt_builder import IncrementalPromptBuilder
+
+class TestIncrementalPromptBuilder(unittest.TestCase):
+    """
+    Unit tests for the IncrementalPromptBuilder class.
+    """
+
+    def setUp(self):
+        """
+        Set up a builder and a basic state.
+        """
+        self.builder = IncrementalPromptBuilder()
+        self.memory = []
+        self.state = {
+            "current_task": {"id": "T1", "title": "Test Task"},
+            "available_tools": [{"name": "test_tool", "description": "A tool for testing."}],
+            "short_term_memory": self.memory,
+        }
+
+    def test_prompt_contains_task_tools_and_compact_history(self):
+        """
+        Test that the prompt includes the task, the tool catalog and compactly serialized history.
+        """
+        self.memory.append({"role": "system", "observation": "ok"})
+        prompt = self.builder.build(self.state)
+
+        self.assertIn("**Task:** Test Task", prompt)
+        self.assertIn('[{"name":"test_tool","description":"A tool for testing."}]', prompt)
+        self.assertIn('{"role":"system","observation":"ok"}', prompt)
+        self.assertIn('"action": "execute_tool"', prompt)
+
+    def test_only_new_history_entries_are_serialized(self):
+        """
+        Test that each build serializes only entries appended since the previous build.
+        """
+        self.memory.extend([{"turn": 1}, {"turn": 2}])
+        self.builder.build(self.state)
+
+        self.memory.append({"turn": 3})
+        with patch.object(prompt_builder, "_compact_json", wraps=prompt_builder._compact_json) as spy:
+            prompt = self.builder.build(self.state)
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(spy.call_args[0][0], {"turn": 3})
+        for turn in (1, 2, 3):
+            self.assertIn(json.dumps({"turn": turn}, separators=(",", ":")), prompt)
+
+    def test_prefix_is_rebuilt_when_task_changes(self):
+        """
+        Test that a new task invalidates the cached prefix.
+        """
+        self.builder.build(self.state)
+        self.state["current_task"] = {"id": "T2", "title": "Next Task"}
+        prompt = self.builder.build(self.state)
+
+        self.assertIn("**Task:** Next Task", prompt)
+        self.assertNotIn("Test Task", prompt)
+
+    def test_replaced_history_is_rebuilt(self):
+        """
+        Test that passing a different history list starts the history from scratch.
+        """
+        self.memory.append({"turn": 1})
+        self.builder.build(self.state)
+
+        self.state["short_term_memory"] = [{"turn": "fresh"}]
+        prompt = self.builder.build(self.state)
+
+        self.assertIn('{"turn":"fresh"}', prompt)
+        self.assertNotIn('{"turn":1}', prompt)
+
+    def test_token_estimate_tracks_prompt_length(self):
+        """
+        Test that the token estimate grows with the prompt.
+        """
+        prompt = self.builder.build(self.state)
+        first_estimate = self.builder.token_estimate
+        self.assertEqual(first_estimate, len(prompt) // IncrementalPromptBuilder.CHARS_PER_TOKEN)
+
+        self.memory.append({"role": "system", "observation": "x" * 400})
+        self.builder.build(self.state)
+        self.assertGreaterEqual(self.builder.token_estimate, first_estimate + 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+# tests/core/test_resilience.py
+
+import asyncio
+import threading
+import time
+import unittest
+from jules_hf.core.resilience import CircuitBreaker, ResilientLLMProvider
+from jules_hf.core.llm_provider import LLMProvider
+from jules_hf.core.exceptions import LLMError, LLMResponseError
+
+class ScriptedLLMProvider(LLMProvider):
+    """
+    A provider that plays back a script of outcomes: exceptions are raised, (delay, response) tuples are returned after a delay.
+    """
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            return self.script.pop(0) if len(self.script) > 1 else self.script[0]
+
+    def get_structured_response(self, prompt: str) -> dict:
+        outcome = self._next()
+        if isinstance(outcome, Exception):
+            raise outcome
+        delay, response = outcome
+        time.sleep(delay)
+        return response
+
+    async def aget_structured_response(self, prompt: str) -> dict:
+        outcome = self._next()
+        if isinstance(outcome, Exception):
+            raise outcome
+        delay, response = outcome
+        await asyncio.sleep(delay)
+        return response
+
+class HTTPError(Exception):
+    """
+    An HTTP error response carrying its status code, as client libraries raise them.
+    """
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Unit tests for the CircuitBreaker class.
+    """
+
+    def test_opens_after_threshold_and_recovers_through_half_open(self):
+        """
+        Test the closed -> open -> half-open -> closed cycle.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())  # only one trial request while half-open
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+class TestResilientLLMProvider(unittest.TestCase):
+    """
+    Unit tests for the ResilientLLMProvider class.
+    """
+
+    def test_retries_transient_failures(self):
+        """
+        Test that transient failures are retried with backoff until a call succeeds.
+        """
+        provider = ScriptedLLMProvider([HTTPError(503), ConnectionError("reset"), (0, {"action": "ok"})])
+        delays = []
+        resilient = ResilientLLMProvider(provider, hedging=False, sleep=delays.append)
+
+        self.assertEqual(resilient.get_structured_response("prompt"), {"action": "ok"})
+        self.assertEqual(provider.calls, 3)
+        self.assertEqual(resilient.stats()["retries"], 2)
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(all(0 <= delay <= resilient.backoff_base * 2 for delay in delays))
+
+    def test_gives_up_after_max_retries(self):
+        """
+        Test that the last failure is surfaced as an LLMError.
+        """
+        provider = ScriptedLLMProvider([HTTPError(503)])
+        resilient = ResilientLLMProvider(provider, max_retries=2, hedging=False, sleep=lambda _: None)
+
+        with self.assertRaises(LLMError):
+            resilient.get_structured_response("prompt")
+        self.assertEqual(provider.calls, 3)
+
+    def test_response_errors_are_not_retried(self):
+        """
+        Test that an unusable answer is raised immediately and does not trip the breaker.
+        """
+        provider = ScriptedLLMProvider([LLMResponseError("bad json")])
+        resilient = ResilientLLMProvider(provider, hedging=False, sleep=lambda _: None)
+
+        with self.assertRaises(LLMResponseError):
+            resilient.get_structured_response("prompt")
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(resilient.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_permanent_errors_are_not_retried(self):
+        """
+        Test that client errors, also when wrapped in LLMError, are raised at once without tripping the breaker.
+        """
+        wrapped = LLMError("An error occurred with the Hugging Face API: HTTP 401")
+        wrapped.__cause__ = HTTPError(401)
+        for error in (HTTPError(404), wrapped, ValueError("bad request")):
+            provider = ScriptedLLMProvider([error])
+            breaker = CircuitBreaker(failure_threshold=1)
+            resilient = ResilientLLMProvider(provider, hedging=False, breaker=breaker, sleep=lambda _: None)
+
+            with self.assertRaises(type(error)):
+                resilient.get_structured_response("prompt")
+            self.assertEqual(provider.calls, 1)
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_permanent_error_leaves_half_open_breaker_unchanged(self):
+        """
+        Test that a permanent error during a half-open trial neither closes nor re-opens the circuit.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        resilient = ResilientLLMProvider(ScriptedLLMProvider([HTTPError(401)]), hedging=False, breaker=breaker,
+                                         sleep=lambda _: None)
+
+        with self.assertRaises(HTTPError):
+            resilient.get_structured_response("prompt")
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+
+    def test_attempt_timeout_applies_without_hedging(self):
+        """
+        Test that a hung call times out after attempt_timeout and is retried even when hedging is off.
+        """
+        provider = ScriptedLLMProvider([(5, {"action": "slow"}), (0, {"action": "ok"})])
+        resilient = ResilientLLMProvider(provider, hedging=False, attempt_timeout=0.1, sleep=lambda _: None)
+
+        started = time.monotonic()
+        self.assertEqual(resilient.get_structured_response("prompt"), {"action": "ok"})
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(resilient.stats()["retries"], 1)
+
+    def test_open_circuit_fails_fast(self):
+        """
+        Test that calls are short-circuited without reaching the provider while the breaker is open.
+        """
+        provider = ScriptedLLMProvider([TimeoutError("down")])
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=FakeClock())
+        resilient = ResilientLLMProvider(provider, max_retries=5, hedging=False, breaker=breaker, sleep=lambda _: None)
+
+        with self.assertRaises(LLMError):
+            resilient.get_structured_response("prompt")
+        self.assertEqual(provider.calls, 2)
+
+        with self.assertRaises(LLMError):
+            resilient.get_structured_response("prompt")
+        self.assertEqual(provider.calls, 2)
+        self.assertGreaterEqual(resilient.stats()["short_circuited"], 2)
+
+    def test_slow_call_is_hedged(self):
+        """
+        Test that a call slower than the hedge delay is duplicated and the faster copy wins.
+        """
+        provider = ScriptedLLMProvider([(1.0, {"action": "slow"}), (0, {"action": "fast"})])
+        resilient = ResilientLLMProvider(provider, hedge_initial_delay=0.05)
+
+        started = time.monotonic()
+        self.assertEqual(resilient.get_structured_response("prompt"), {"action": "fast"})
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(resilient.stats()["hedges"], 1)
+        self.assertEqual(resilient.stats()["hedge_wins"], 1)
+
+    def test_streaming_calls_are_not_hedged(self):
+        """
+        Test that a slow streaming call is waited for instead of being duplicated.
+        """
+        provider = ScriptedLLMProvider([(0.3, {"action": "slow"}), (0, {"action": "fast"})])
+        resilient = ResilientLLMProvider(provider, hedge_initial_delay=0.05)
+
+        self.assertEqual(resilient.stream_structured_response("prompt"), {"action": "slow"})
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(resilient.stats()["hedges"], 0)
+
+    def test_async_slow_call_is_hedged(self):
+        """
+        Test hedging on the async path.
+        """
+        provider = ScriptedLLMProvider([(1.0, {"action": "slow"}), (0, {"action": "fast"})])
+        resilient = ResilientLLMProvider(provider, hedge_initial_delay=0.05)
+
+        self.assertEqual(asyncio.run(resilient.aget_structured_response("prompt")), {"action": "fast"})
+        self.assertEqual(resilient.stats()["hedge_wins"], 1)
+
+    def test_hedge_delay_follows_observed_p95(self):
+        """
+        Test that the hedge delay switches from the initial value to the observed p95.
+        """
+        resilient = ResilientLLMProvider(ScriptedLLMProvider([(0, {})]), hedge_initial_delay=3.0, hedge_min_samples=20)
+        self.assertEqual(resilient.hedge_delay(), 3.0)
+
+        for index in range(100):
+            resilient.latencies.record(index / 100)
+        self.assertAlmostEqual(resilient.hedge_delay(), 0.94, places=2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/core/test_scheduler.py
+
+import unittest
+from jules_hf.core.scheduler import TaskScheduler, TaskSpec
+
+class TestTaskScheduler(unittest.TestCase):
+    """
+    Unit tests for the TaskScheduler class.
+    """
+
+    def make_scheduler(self, *tasks):
+        """
+        Builds a scheduler from (id, status, depends_on[, estimate]) tuples in document order.
+        """
+        return TaskScheduler(
+            TaskSpec(task[0], position, task[1], task[2], task[3] if len(task) > 3 else 1)
+            for position, task in enumerate(tasks)
+        )
+
+    def test_dependencies_gate_runnability(self):
+        """
+        Test that a task becomes runnable only once all of its dependencies are completed.
+        """
+        scheduler = self.make_scheduler(
+            ("build", "Ready", []), ("test", "Ready", ["build"]), ("release", "Ready", ["build", "test"])
+        )
+        self.assertEqual(scheduler.runnable(), ["build"])
+
+        scheduler.update_status("build", "Completed")
+        self.assertEqual(scheduler.runnable(), ["test"])
+        scheduler.update_status("test", "Completed")
+        self.assertEqual(scheduler.peek(), "release")
+
+        scheduler.update_status("build", "Ready")
+        self.assertEqual(scheduler.runnable(), ["build"])
+        self.assertEqual(scheduler.unmet_dependencies("release"), 1)
+
+    def test_longest_critical_path_goes_first(self):
+        """
+        Test that the task heading the longest chain of work is preferred over document order.
+        """
+        scheduler = self.make_scheduler(
+            ("docs", "Ready", []),
+            ("schema", "Ready", []),
+            ("api", "Ready", ["schema"], 3),
+            ("ui", "Ready", ["api"], 2),
+        )
+        self.assertEqual(scheduler.critical_path("schema"), 6)
+        self.assertEqual(scheduler.runnable(), ["schema", "docs"])
+        self.assertEqual(scheduler.runnable(1), ["schema"])
+        self.assertEqual(scheduler.peek(skip=lambda task_id: task_id == "schema"), "docs")
+
+    def test_cycles_and_unknown_dependencies_never_run(self):
+        """
+        Test that tasks on a cycle or depending on a missing task are never handed out.
+        """
+        scheduler = self.make_scheduler(
+            ("a", "Ready", ["b"]), ("b", "Ready", ["a"]), ("c", "Ready", ["missing"]), ("d", "Ready", [])
+        )
+        self.assertEqual(scheduler.runnable(), ["d"])
+
+    def test_stale_entries_are_skipped(self):
+        """
+        Test that tasks leaving the active statuses drop out and return when reactivated.
+        """
+        scheduler = self.make_scheduler(("a", "Ready", []), ("b", "Ready", []))
+        scheduler.update_status("a", "In Progress")
+        scheduler.update_status("a", "Blocked")
+        self.assertEqual(scheduler.runnable(), ["b"])
+        scheduler.update_status("a", "Ready")
+        self.assertEqual(scheduler.runnable(), ["a", "b"])
+
+if __name__ == '__main__':
+    unittest.main()
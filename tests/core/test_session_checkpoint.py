@@ -0,0 +1,101 @@
+# tests/core/test_session_checkpoint.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from jules_hf.core.memory import ShortTermMemory
+from jules_hf.core.session_checkpoint import SessionCheckpointer
+
+class TestSessionCheckpointer(unittest.TestCase):
+    """
+    Unit tests for the SessionCheckpointer class.
+    """
+
+    def setUp(self):
+        """
+        Creates a checkpointer in a temporary directory.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.checkpointer = SessionCheckpointer(self.test_dir, snapshot_every=5)
+
+    def tearDown(self):
+        """
+        Closes the checkpointer and removes the temporary directory.
+        """
+        self.checkpointer.close()
+        shutil.rmtree(self.test_dir)
+
+    def reopen(self) -> SessionCheckpointer:
+        """
+        Simulates a restart by closing the checkpointer and opening a new one on the same directory.
+        """
+        self.checkpointer.close()
+        self.checkpointer = SessionCheckpointer(self.test_dir, snapshot_every=5)
+        return self.checkpointer
+
+    def test_resume_restores_memory_and_fields(self):
+        """
+        Test that the latest checkpoint is restored from the snapshot plus its deltas.
+        """
+        memory = ShortTermMemory()
+        for index in range(3):
+            memory.append({"role": "system", "observation": f"step {index}"})
+            self.checkpointer.save(memory, {"task_id": "T1", "pending_action": {"action": "ask_user", "n": index}})
+
+        restored = ShortTermMemory()
+        fields = self.reopen().load(restored)
+        self.assertEqual(fields, {"task_id": "T1", "pending_action": {"action": "ask_user", "n": 2}})
+        self.assertEqual(restored.to_list(), memory.to_list())
+
+    def test_deltas_hold_only_what_changed(self):
+        """
+        Test that each journaled checkpoint carries only new entries and changed fields, and the
+        journal is folded into a snapshot periodically.
+        """
+        memory = ShortTermMemory()
+        memory.append({"role": "system", "observation": "first"})
+        self.checkpointer.save(memory, {"task_id": "T1", "pending_action": None})
+        memory.append({"role": "system", "observation": "second"})
+        self.checkpointer.save(memory, {"task_id": "T1", "pending_action": None})
+
+        with open(os.path.join(self.test_dir, "session.journal")) as f:
+            delta = json.loads(f.readline())
+        self.assertEqual(delta["memory"]["appended"], [{"role": "system", "observation": "second"}])
+        self.assertNotIn("fields", delta)
+        self.assertNotIn("summary", delta["memory"])
+
+        for _ in range(5):
+            self.checkpointer.save(memory, {"task_id": "T2"})
+        self.assertLess(os.path.getsize(os.path.join(self.test_dir, "session.journal")), 200)
+        restored = ShortTermMemory()
+        self.assertEqual(self.reopen().load(restored), {"task_id": "T2"})
+        self.assertEqual(len(restored), 2)
+
+    def test_torn_delta_is_ignored(self):
+        """
+        Test that a checkpoint cut short by a crash falls back to the previous one.
+        """
+        memory = ShortTermMemory()
+        self.checkpointer.save(memory, {"task_id": "T1"})
+        memory.append({"role": "system", "observation": "kept"})
+        self.checkpointer.save(memory, {"task_id": "T1"})
+        self.checkpointer.close()
+        with open(os.path.join(self.test_dir, "session.journal"), "a") as f:
+            f.write('{"memory": {"appended": [')
+
+        restored = ShortTermMemory()
+        self.assertEqual(self.reopen().load(restored), {"task_id": "T1"})
+        self.assertEqual([entry["observation"] for entry in restored], ["kept"])
+
+    def test_clear_removes_the_checkpoint(self):
+        """
+        Test that a cleared checkpoint is not resumed.
+        """
+        self.checkpointer.save(ShortTermMemory(), {"task_id": "T1"})
+        self.checkpointer.clear()
+        self.assertIsNone(self.reopen().load(ShortTermMemory()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/core/test_write_behind.py
+
+import threading
+import unittest
+from jules_hf.core.write_behind import WriteBehind
+
+class TestWriteBehind(unittest.TestCase):
+    """
+    Unit tests for the WriteBehind class.
+    """
+
+    def setUp(self):
+        """
+        Records every batch handed to the writer.
+        """
+        self.batches = []
+        self.written = threading.Event()
+
+    def write_batch(self, batch):
+        """
+        Writer that records the batch and signals that it ran.
+        """
+        self.batches.append(batch)
+        self.written.set()
+
+    def test_repeated_keys_are_coalesced_on_flush(self):
+        """
+        Test that only the latest value per key is written, in first-queued order.
+        """
+        writer = WriteBehind(self.write_batch, interval=60)
+        writer.submit("a", 1)
+        writer.submit("b", 2)
+        writer.submit("a", 3)
+        self.assertEqual(writer.pending, 2)
+        writer.flush()
+        self.assertEqual(self.batches, [[3, 2]])
+        self.assertEqual(writer.pending, 0)
+        writer.close()
+
+    def test_background_thread_flushes_on_size_and_interval(self):
+        """
+        Test that the thread writes once the size threshold or the interval is reached.
+        """
+        writer = WriteBehind(self.write_batch, interval=60, max_pending=2)
+        writer.submit("a", 1)
+        writer.submit("b", 2)
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches, [[1, 2]])
+        writer.close()
+
+        self.written.clear()
+        writer = WriteBehind(self.write_batch, interval=0.01)
+        writer.submit("c", 3)
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches[-1], [3])
+        writer.close()
+
+    def test_failed_batches_are_requeued(self):
+        """
+        Test that a failed write keeps the batch, with newer values taking precedence.
+        """
+        attempts = []
+
+        def flaky(batch):
+            attempts.append(batch)
+            if len(attempts) == 1:
+                raise OSError("disk full")
+
+        writer = WriteBehind(flaky, interval=60)
+        writer.submit("a", 1)
+        with self.assertRaises(OSError):
+            writer.flush()
+        writer.submit("a", 2)
+        writer.flush()
+        self.assertEqual(attempts, [[1], [2]])
+        writer.close()
+
+    def test_close_flushes_and_rejects_later_writes(self):
+        """
+        Test that closing writes what is queued and stops accepting mutations.
+        """
+        writer = WriteBehind(self.write_batch, interval=60)
+        writer.submit("a", 1)
+        writer.close()
+        self.assertEqual(self.batches, [[1]])
+        with self.assertRaises(RuntimeError):
+            writer.submit("b", 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# tests/test_cancellation.py
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from jules_hf.core.exceptions import ToolCancelledError, ToolTimeoutError
+from jules_hf.tools.abstraction_layer import ToolAbstractionLayer
+from jules_hf.tools.cancellation import CancellationToken, current_token, run_subprocess, use_token
+
+class PatientTool:
+    """
+    A mock in-process tool that waits cooperatively until its token expires.
+    """
+    timeout = 0.05
+
+    def run(self, parameters):
+        token = current_token()
+        if token.wait(parameters.get("seconds", 5)):
+            token.check()
+        return "finished"
+
+class TestCancellationToken(unittest.TestCase):
+    """
+    Unit tests for the CancellationToken class.
+    """
+
+    def test_child_inherits_deadline_and_cancellation(self):
+        """
+        Test that a child token ends no later than its parent and is cancelled with it.
+        """
+        parent = CancellationToken.with_timeout(10)
+        child = CancellationToken.with_timeout(60, parent=parent)
+        self.assertEqual(child.deadline, parent.deadline)
+        self.assertLess(CancellationToken.with_timeout(1, parent=parent).deadline, parent.deadline)
+
+        parent.cancel("turn aborted")
+        self.assertTrue(child.cancelled)
+        with self.assertRaises(ToolCancelledError):
+            child.check()
+        late = CancellationToken(parent=parent)
+        self.assertTrue(late.cancelled)
+
+    def test_expired_token_raises_timeout(self):
+        """
+        Test that checking an expired token raises a ToolTimeoutError.
+        """
+        token = CancellationToken.with_timeout(0)
+        self.assertTrue(token.expired)
+        self.assertEqual(token.remaining(), 0.0)
+        with self.assertRaises(ToolTimeoutError):
+            token.check()
+
+@unittest.skipUnless(os.name == "posix", "process groups are POSIX-only")
+class TestRunSubprocess(unittest.TestCase):
+    """
+    Unit tests for run_subprocess.
+    """
+
+    def test_output_is_captured(self):
+        """
+        Test that a command finishing in time returns its output like subprocess.run.
+        """
+        result = run_subprocess([sys.executable, "-c", "print('hello')"], check=True,
+                                token=CancellationToken.with_timeout(30))
+        self.assertEqual((result.returncode, result.stdout), (0, "hello\n"))
+
+    def test_hung_command_is_killed_with_its_children(self):
+        """
+        Test that a command past its deadline is killed together with the processes it started.
+        """
+        pid_file = tempfile.NamedTemporaryFile(delete=False)
+        pid_file.close()
+        self.addCleanup(os.remove, pid_file.name)
+        script = ("import subprocess, sys, time; "
+                  "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+                  f"open({pid_file.name!r}, 'w').write(str(child.pid)); time.sleep(60)")
+        started = time.monotonic()
+        with self.assertRaises(ToolTimeoutError):
+            with use_token(CancellationToken.with_timeout(1.0)):
+                run_subprocess([sys.executable, "-c", script], grace_period=1.0)
+        self.assertLess(time.monotonic() - started, 10)
+
+        with open(pid_file.name) as f:
+            child_pid = int(f.read())
+        for _ in range(50):
+            if not self._is_running(child_pid):
+                break
+            time.sleep(0.1)
+        self.assertFalse(self._is_running(child_pid))
+
+    @staticmethod
+    def _is_running(pid: int) -> bool:
+        """
+        Returns True if the process exists and is not a zombie waiting to be reaped.
+        """
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except FileNotFoundError:
+            return False
+        except OSError:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return False
+            return True
+
+class TestToolDeadlines(unittest.TestCase):
+    """
+    Unit tests for deadlines in the ToolAbstractionLayer.
+    """
+
+    def setUp(self):
+        """
+        Set up a layer with a cooperative tool.
+        """
+        self.tal = ToolAbstractionLayer()
+        self.tal.register_tool("patient", PatientTool)
+
+    def test_tool_timeout_stops_the_call(self):
+        """
+        Test that a call running past the tool's timeout fails with a ToolTimeoutError.
+        """
+        with self.assertRaises(ToolTimeoutError):
+            self.tal.execute_tool("patient", {})
+        self.assertEqual(self.tal.execute_tool("patient", {"seconds": 0}), "finished")
+
+    def test_turn_token_bounds_batched_calls(self):
+        """
+        Test that every call of a batch shares the caller's deadline and cancellation.
+        """
+        self.tal.register_tool("patient", PatientTool, timeout=60)
+        turn = CancellationToken.with_timeout(0.05)
+        started = time.monotonic()
+        with use_token(turn):
+            results = self.tal.execute_tools([("patient", {}), ("patient", {})])
+        self.tal.close()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(all(isinstance(result, ToolTimeoutError) for result in results))
+
+        cancelled = CancellationToken()
+        cancelled.cancel()
+        with self.assertRaises(ToolCancelledError):
+            self.tal.execute_tool("patient", {}, token=cancelled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,5 +41,13 @@ class TestFileSystemManager(unittest.TestCase):
         self.assertEqual(result, "Error: 'file_path' parameter is required.")
         self.assertFalse(os.path.exists(self.test_file))
 
+    def test_read_file_returns_contents(self):
+        """
+        Test that the FileSystemManager can read back a file it created.
+        """
+        self.fsm.create_file({"file_path": self.test_file})
+        result = self.fsm.run({"operation": "read_file", "file_path": self.test_file})
+        self.assertEqual(result, "This file was created by Jules for Hugging Face.")
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,8 @@
 # tests/test_git_client.py
 
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from jules_hf.tools.git_client import GitClient
@@ -15,7 +18,7 @@ class TestGitClient(unittest.TestCase):
         """
         self.gc = GitClient()
 
-    @patch('subprocess.run')
+    @patch('jules_hf.tools.git_client.run_subprocess')
     def test_clone_success(self, mock_subprocess_run):
         """
         Test that the GitClient can successfully clone a repository.
@@ -28,12 +31,7 @@ class TestGitClient(unittest.TestCase):
         result = self.gc.run(params)
 
         self.assertIn("Successfully cloned repository", result)
-        mock_subprocess_run.assert_called_once_with(
-            ["git", "clone", "https://huggingface.co/test-repo"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        mock_subprocess_run.assert_called_once_with(["git", "clone", "https://huggingface.co/test-repo"], check=True)
 
     def test_clone_no_url(self):
         """
@@ -43,5 +41,45 @@ class TestGitClient(unittest.TestCase):
         result = self.gc.run(params)
         self.assertEqual(result, "Error: 'repo_url' parameter is required for the clone operation.")
 
+    @patch('jules_hf.tools.git_client.run_subprocess')
+    def test_status_success(self, mock_subprocess_run):
+        """
+        Test that the GitClient reports the working tree status.
+        """
+        mock_process = MagicMock()
+        mock_process.stdout = "## main\n"
+        mock_subprocess_run.return_value = mock_process
+
+        result = self.gc.run({"operation": "status", "repo_path": "repo"})
+
+        self.assertEqual(result, "## main\n")
+        mock_subprocess_run.assert_called_once_with(["git", "status", "--short", "--branch"], cwd="repo", check=True)
+
+    def test_status_fingerprint_follows_head_and_index(self):
+        """
+        Test that the memoization fingerprint changes when the branch moves or the index is rewritten.
+        """
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        git_dir = os.path.join(repo, ".git")
+        os.makedirs(os.path.join(git_dir, "refs", "heads"))
+        os.makedirs(os.path.join(repo, "src"))
+        with open(os.path.join(git_dir, "HEAD"), "w") as f:
+            f.write("ref: refs/heads/main\n")
+        with open(os.path.join(git_dir, "refs", "heads", "main"), "w") as f:
+            f.write("a" * 40)
+
+        parameters = {"operation": "status", "repo_path": os.path.join(repo, "src")}
+        first = GitClient.cache_dependencies(parameters)
+        self.assertEqual(first, ("ref: refs/heads/main", "a" * 40, None))
+
+        with open(os.path.join(git_dir, "refs", "heads", "main"), "w") as f:
+            f.write("b" * 40)
+        with open(os.path.join(git_dir, "index"), "w") as f:
+            f.write("index")
+        second = GitClient.cache_dependencies(parameters)
+        self.assertEqual(second[1], "b" * 40)
+        self.assertIsNotNone(second[2])
+
 if __name__ == '__main__':
     unittest.main()
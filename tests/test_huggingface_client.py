@@ -25,7 +25,7 @@ class TestHuggingFaceClient(unittest.TestCase):
             with self.assertRaises(ConfigurationError):
                 HuggingFaceClient()
 
-    @patch('jules_hf.tools.huggingface_client.login')
+    @patch('huggingface_hub.login')
     def test_login_success(self, mock_login):
         """
         Test that the HuggingFaceClient can successfully log in.
@@ -36,7 +36,7 @@ class TestHuggingFaceClient(unittest.TestCase):
         self.assertEqual(result, "Successfully logged in to the Hugging Face Hub.")
         mock_login.assert_called_once_with(token="test_token", add_to_git_credential=True)
 
-    @patch('jules_hf.tools.huggingface_client.login')
+    @patch('huggingface_hub.login')
     def test_login_failure_raises_exception(self, mock_login):
         """
         Test that a login failure raises a ToolExecutionError.
@@ -45,7 +45,7 @@ class TestHuggingFaceClient(unittest.TestCase):
         with self.assertRaises(ToolExecutionError):
             self.hfc.run({"operation": "login"})
 
-    @patch('jules_hf.tools.huggingface_client.create_repo')
+    @patch('huggingface_hub.create_repo')
     def test_create_repo_success(self, mock_create_repo):
         """
         Test that the HuggingFaceClient can successfully create a repository.
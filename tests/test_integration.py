@@ -3,9 +3,13 @@
 import unittest
 import os
 import json
+import shutil
+import tempfile
 from unittest.mock import patch
-from jules_hf.main import main
+from jules_hf.main import JulesHF, main
 from jules_hf.core.config import config
+from jules_hf.core.exceptions import ToolExecutionError
+from jules_hf.core.methodology_engine import MethodologyEngine
 
 class TestIntegration(unittest.TestCase):
     """
@@ -30,7 +34,10 @@ class TestIntegration(unittest.TestCase):
         Test that the application runs and logs the correct information.
         """
         # We don't need the mock instance here, but it's passed by the decorator
-        main()
+        # The plan, session checkpoint and metrics go to a temporary directory, not the working tree.
+        with tempfile.TemporaryDirectory() as user_dir, \
+                patch.dict(config.settings, {"user_data_dir": user_dir, "plan_filename": "plan.json"}):
+            main()
 
         self.assertTrue(os.path.exists(self.log_file))
 
@@ -59,6 +66,130 @@ class TestIntegration(unittest.TestCase):
 
         self.assertTrue(found_task_log, "Did not find the structured log for the current task.")
 
+    @patch.dict('os.environ', {'HUGGING_FACE_HUB_TOKEN': 'test_token'})
+    @patch('jules_hf.main.HuggingFaceLLMProvider') # Mock the real LLM provider
+    def test_worker_completes_leased_tasks(self, MockLLMProvider):
+        """
+        Test that a worker claims tasks one at a time and marks each completed task in the plan.
+        """
+        user_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, user_dir)
+        plan = {"project_name": "Pool", "epics": [{"id": "E", "status": "In Progress", "milestones": [
+            {"id": "M", "status": "In Progress", "features": [
+                {"id": "F", "tasks": [{"id": "T1", "status": "Ready"}, {"id": "T2", "status": "Ready"}]}
+            ]}
+        ]}]}
+        with open(os.path.join(user_dir, "plan.json"), "w") as f:
+            json.dump(plan, f)
+
+        with patch.dict(config.settings, {"user_data_dir": user_dir, "plan_filename": "plan.json"}):
+            app = JulesHF()
+            seen_tasks = []
+
+            def complete(state):
+                seen_tasks.append(state["current_task"]["id"])
+                return {"action": "complete_task", "final_message": "done"}
+
+            with patch.object(app.logic_engine, "get_next_action", side_effect=complete):
+                completed = app.run_worker(owner="worker-1")
+
+            self.assertEqual(completed, 2)
+            self.assertEqual(seen_tasks, ["T1", "T2"])
+            engine = MethodologyEngine()
+            self.assertEqual([task["id"] for task in engine.get_tasks_by_status("Completed")], ["T1", "T2"])
+            engine.close()
+
+    @patch.dict('os.environ', {'HUGGING_FACE_HUB_TOKEN': 'test_token'})
+    @patch('jules_hf.main.HuggingFaceLLMProvider') # Mock the real LLM provider
+    def test_crashed_session_resumes_without_llm_calls(self, MockLLMProvider):
+        """
+        Test that a turn interrupted after the LLM answered resumes from the checkpoint and runs the
+        pending action without asking the LLM again.
+        """
+        user_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, user_dir)
+        settings = {"user_data_dir": user_dir, "plan_filename": "plan.json",
+                    "session": {"checkpoint": {"enabled": True}}}
+        action = {"action": "execute_tool", "tool_name": "git_client", "parameters": {"operation": "status"}}
+
+        with patch.dict(config.settings, settings):
+            app = JulesHF()
+            app.short_term_memory.append({"role": "system", "observation": "earlier turn"})
+            with patch.object(app.logic_engine, "get_next_action", return_value=action), \
+                    patch.object(app, "_execute_action", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    app._run_single_turn()
+            app.checkpointer.close()
+            app.methodology_engine.close()
+
+            resumed = JulesHF()
+            self.assertTrue(resumed.resume())
+            self.assertEqual(resumed.pending_action, action)
+            self.assertEqual([entry.get("observation") for entry in resumed.short_term_memory], ["earlier turn"])
+            with patch.object(resumed.logic_engine, "get_next_action") as get_next_action, \
+                    patch.object(resumed, "_execute_action") as execute_action:
+                resumed._run_single_turn()
+            get_next_action.assert_not_called()
+            execute_action.assert_called_once_with(action)
+            self.assertIsNone(resumed.pending_action)
+            resumed.checkpointer.close()
+            resumed.methodology_engine.close()
+
+    @patch.dict('os.environ', {'HUGGING_FACE_HUB_TOKEN': 'test_token'})
+    @patch('jules_hf.main.HuggingFaceLLMProvider') # Mock the real LLM provider
+    def test_resumed_action_with_side_effects_is_not_replayed(self, MockLLMProvider):
+        """
+        Test that a pending action that is neither read-only nor idempotent is dropped on resume and
+        noted in memory instead of being run a second time.
+        """
+        user_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, user_dir)
+        settings = {"user_data_dir": user_dir, "plan_filename": "plan.json",
+                    "session": {"checkpoint": {"enabled": True}}}
+        action = {"action": "execute_tool", "tool_name": "file_system_manager",
+                  "parameters": {"operation": "create_file", "file_path": os.path.join(user_dir, "new.txt")}}
+
+        with patch.dict(config.settings, settings):
+            app = JulesHF()
+            with patch.object(app.logic_engine, "get_next_action", return_value=action), \
+                    patch.object(app, "_execute_action", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    app._run_single_turn()
+            app.checkpointer.close()
+            app.methodology_engine.close()
+
+            resumed = JulesHF()
+            self.assertTrue(resumed.resume())
+            self.assertIsNone(resumed.pending_action)
+            self.assertEqual(list(resumed.short_term_memory)[0], {"role": "assistant", "action": action})
+            self.assertIn("not repeated", list(resumed.short_term_memory)[1]["observation"])
+            resumed.checkpointer.close()
+            resumed.methodology_engine.close()
+
+    @patch.dict('os.environ', {'HUGGING_FACE_HUB_TOKEN': 'test_token'})
+    @patch('jules_hf.main.HuggingFaceLLMProvider') # Mock the real LLM provider
+    def test_batched_tool_calls_are_fanned_out(self, MockLLMProvider):
+        """
+        Test that an execute_tools action runs every call and records each result or error in memory.
+        """
+        user_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, user_dir)
+        with patch.dict(config.settings, {"user_data_dir": user_dir, "plan_filename": "plan.json"}):
+            app = JulesHF()
+        action = {"action": "execute_tools", "tool_calls": [
+            {"tool_name": "git_client", "parameters": {"operation": "status"}},
+            {"tool_name": "file_system_manager", "parameters": {"operation": "read_file", "file_path": "x"}},
+        ]}
+        with patch.object(app.tool_layer, "execute_tools", return_value=["clean", ToolExecutionError("missing")]) as execute:
+            app._execute_action(action)
+
+        execute.assert_called_once_with([("git_client", {"operation": "status"}),
+                                         ("file_system_manager", {"operation": "read_file", "file_path": "x"})])
+        self.assertEqual(list(app.short_term_memory)[1:], [
+            {"role": "system", "tool_name": "git_client", "observation": "clean"},
+            {"role": "system", "tool_name": "file_system_manager", "error": "missing"},
+        ])
+        app.methodology_engine.close()
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+# tests/test_memoization.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from jules_hf.tools.abstraction_layer import ToolAbstractionLayer
+from jules_hf.tools.file_system_manager import FileSystemManager
+from jules_hf.tools.memoization import ToolResultCache
+
+class CountingFileReader(FileSystemManager):
+    """
+    A file system tool that counts the reads that actually run.
+    """
+    reads = 0
+
+    def read_file(self, parameters):
+        CountingFileReader.reads += 1
+        return super().read_file(parameters)
+
+class TestToolResultCache(unittest.TestCase):
+    """
+    Unit tests for the ToolResultCache class.
+    """
+
+    def test_lru_eviction_and_fingerprint_invalidation(self):
+        """
+        Test that the least recently used entry is evicted and a changed fingerprint misses.
+        """
+        cache = ToolResultCache(max_entries=2)
+        cache.put("tool", "a", 1, "A")
+        cache.put("tool", "b", 1, "B")
+        self.assertEqual(cache.get("tool", "a", 1), (True, "A"))
+        cache.put("tool", "c", 1, "C")
+
+        self.assertEqual(cache.get("tool", "b", 1), (False, None))
+        self.assertEqual(cache.get("tool", "a", 2), (False, None))
+        self.assertEqual(cache.get("tool", "a", 1), (False, None))
+        self.assertEqual(cache.get("tool", "c", 1), (True, "C"))
+
+        stats = cache.stats()["tool"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"], stats["evictions"]), (2, 3, 1, 1))
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["hit_rate"], 0.4)
+
+class TestToolMemoization(unittest.TestCase):
+    """
+    Unit tests for memoization in the ToolAbstractionLayer.
+    """
+
+    def setUp(self):
+        """
+        Set up a layer with memoization enabled and a file to read.
+        """
+        CountingFileReader.reads = 0
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "notes.txt")
+        with open(self.path, "w") as f:
+            f.write("first")
+        self.tal = ToolAbstractionLayer()
+        self.tal.register_tool("files", CountingFileReader)
+        self.tal.enable_memoization(max_entries=8)
+        self.read = {"operation": "read_file", "file_path": self.path}
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        shutil.rmtree(self.test_dir)
+
+    def test_repeated_reads_are_served_until_the_file_changes(self):
+        """
+        Test that a repeated read is memoized and rerun once the file's mtime changes.
+        """
+        self.assertEqual(self.tal.execute_tool("files", self.read), "first")
+        self.assertEqual(self.tal.execute_tool("files", dict(self.read)), "first")
+        self.assertEqual(CountingFileReader.reads, 1)
+
+        with open(self.path, "w") as f:
+            f.write("second version")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.tal.execute_tool("files", self.read), "second version")
+        self.assertEqual(CountingFileReader.reads, 2)
+
+        stats = self.tal.memoization_stats()["files"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"]), (1, 2, 1))
+
+    def test_calls_with_side_effects_drop_memoized_results(self):
+        """
+        Test that a mutating call clears memoized results and is itself never memoized.
+        """
+        self.tal.execute_tool("files", self.read)
+        other = os.path.join(self.test_dir, "other.txt")
+        self.tal.execute_tool("files", {"operation": "create_file", "file_path": other})
+        self.tal.execute_tool("files", self.read)
+
+        self.assertEqual(CountingFileReader.reads, 2)
+        self.assertEqual(self.tal.memoization_stats()["files"]["hits"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,6 +80,70 @@ class TestMethodologyEngine(unittest.TestCase):
         current_task_info = engine.get_current_task()
         self.assertEqual(current_task_info["task"]["id"], "T1")
 
+    def write_custom_plan(self):
+        """
+        Writes a two-task plan with an inactive branch to the test plan file.
+        """
+        custom_plan_data = {
+            "project_name": "Test Project",
+            "epics": [
+                {"id": "E0", "status": "Completed", "milestones": [
+                    {"id": "M0", "status": "Completed", "features": [
+                        {"id": "F0", "tasks": [{"id": "T0", "status": "Ready", "title": "Inactive"}]}
+                    ]}]
+                },
+                {"id": "E1", "status": "In Progress", "milestones": [
+                    {"id": "M1", "status": "In Progress", "features": [
+                        {"id": "F1", "tasks": [
+                            {"id": "T1", "status": "Ready", "title": "First"},
+                            {"id": "T2", "status": "Ready", "title": "Second"}
+                        ]}
+                    ]}]
+                }
+            ]
+        }
+        with open(os.path.join(self.test_user_dir, self.test_plan_filename), 'w') as f:
+            json.dump(custom_plan_data, f)
+
+    def test_current_task_follows_status_changes(self):
+        """
+        Test that the indexed current task advances and returns as statuses change.
+        """
+        self.write_custom_plan()
+        engine = MethodologyEngine()
+        self.assertEqual(engine.get_current_task()["task"]["id"], "T1")
+
+        engine.update_task_status("T1", "Completed")
+        self.assertEqual(engine.get_current_task()["task"]["id"], "T2")
+
+        engine.update_task_status("T1", "In Progress")
+        self.assertEqual(engine.get_current_task()["task"]["id"], "T1")
+
+        engine.update_task_status("T1", "Completed")
+        engine.update_task_status("T2", "Completed")
+        self.assertIsNone(engine.get_current_task()["task"]["id"])
+
+    def test_get_task_and_status_index(self):
+        """
+        Test direct task lookup with its parent chain and lookup by status.
+        """
+        self.write_custom_plan()
+        engine = MethodologyEngine()
+
+        self.assertEqual(engine.get_task("T2"), {
+            "epic": "E1", "milestone": "M1", "feature": "F1",
+            "task": {"id": "T2", "status": "Ready", "title": "Second"}, "version": 0
+        })
+        self.assertIsNone(engine.get_task("missing"))
+        self.assertEqual([task["id"] for task in engine.get_tasks_by_status("Ready")], ["T0", "T1", "T2"])
+
+        engine.update_task_status("T1", "Completed")
+        self.assertEqual([task["id"] for task in engine.get_tasks_by_status("Ready")], ["T0", "T2"])
+        self.assertEqual([task["id"] for task in engine.get_tasks_by_status("Completed")], ["T1"])
+        self.assertFalse(engine.update_task_status("missing", "Completed"))
+        self.assertEqual([task["id"] for task in engine.query_tasks("Ready", milestone_id="M1")], ["T2"])
+        self.assertEqual(engine.get_progress()["completed"], 1)
+
     def test_update_task_status(self):
         """
         Test that the MethodologyEngine can update a task's status and save the plan.
@@ -108,6 +172,87 @@ class TestMethodologyEngine(unittest.TestCase):
                             break
         self.assertTrue(task_found, f"Task '{task_id_to_update}' was not found after update.")
 
+    def test_status_changes_are_journaled_and_replayed(self):
+        """
+        Test that status changes append to the journal and survive a restart without a rewrite.
+        """
+        self.write_custom_plan()
+        engine = MethodologyEngine()
+        with open(engine.plan_file_path) as f:
+            snapshot = f.read()
+
+        engine.update_task_status("T1", "Completed")
+        engine.close()
+
+        with open(engine.plan_file_path) as f:
+            self.assertEqual(f.read(), snapshot)
+        self.assertTrue(os.path.exists(engine.plan_file_path + ".journal"))
+
+        new_engine = MethodologyEngine()
+        self.assertEqual(new_engine.get_task("T1")["task"]["status"], "Completed")
+        self.assertEqual(new_engine.get_current_task()["task"]["id"], "T2")
+
+    def test_journal_is_compacted_into_the_plan_file(self):
+        """
+        Test that reaching the compaction threshold folds the journal into the plan file.
+        """
+        self.write_custom_plan()
+        engine = MethodologyEngine()
+        engine.store.compact_after = 2
+
+        engine.update_task_status("T1", "Completed")
+        engine.update_task_status("T2", "In Progress")
+
+        self.assertEqual(os.path.getsize(engine.plan_file_path + ".journal"), 0)
+        with open(engine.plan_file_path) as f:
+            data = json.load(f)
+        tasks = data["epics"][1]["milestones"][0]["features"][0]["tasks"]
+        self.assertEqual([task["status"] for task in tasks], ["Completed", "In Progress"])
+
+    def test_json_backend_exposes_the_live_plan(self):
+        """
+        Test that `plan` is the live plan of the JSON backend while `export_plan()` returns a copy.
+        """
+        self.write_custom_plan()
+        engine = MethodologyEngine()
+        self.assertIs(engine.plan, engine.plan)
+        copy = engine.export_plan()
+        copy["project_name"] = "Changed"
+        self.assertNotEqual(engine.plan["project_name"], "Changed")
+        engine.plan["project_name"] = "Renamed"
+        self.assertEqual(engine.export_plan()["project_name"], "Renamed")
+        engine.close()
+
+    def test_sqlite_backend_is_seeded_from_the_json_plan(self):
+        """
+        Test that the SQLite backend imports plan.json on first use and exports the same shape.
+        """
+        self.write_custom_plan()
+        self.mock_config_get.side_effect = lambda key, default=None: {
+            "user_data_dir": self.test_user_dir,
+            "plan_filename": self.test_plan_filename,
+            "plan_store": {"backend": "sqlite"}
+        }.get(key, default)
+
+        engine = MethodologyEngine()
+        self.assertTrue(os.path.exists(os.path.join(self.test_user_dir, "test_plan.sqlite3")))
+        self.assertEqual(engine.get_current_task()["task"]["id"], "T1")
+        engine.update_task_status("T1", "Completed")
+
+        export_path = os.path.join(self.test_user_dir, "export.json")
+        exported = engine.export_plan(export_path)
+        with self.assertRaises(AttributeError):
+            engine.plan
+        engine.close()
+        self.assertEqual(exported["epics"][1]["milestones"][0]["features"][0]["tasks"][0]["status"], "Completed")
+        with open(export_path) as f:
+            tasks = json.load(f)["epics"][1]["milestones"][0]["features"][0]["tasks"]
+        self.assertEqual([task["status"] for task in tasks], ["Completed", "Ready"])
+
+        new_engine = MethodologyEngine()
+        self.assertEqual(new_engine.get_current_task()["task"]["id"], "T2")
+        new_engine.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_schemas.py
+
+import unittest
+from jules_hf.tools.schemas import compile_schema
+from jules_hf.core.exceptions import ConfigurationError
+
+class TestCompileSchema(unittest.TestCase):
+    """
+    Unit tests for the compile_schema function.
+    """
+
+    def setUp(self):
+        """
+        Compile a representative tool schema.
+        """
+        self.validate = compile_schema({
+            "type": "object",
+            "properties": {
+                "operation": {"type": "string", "enum": ["clone", "status"]},
+                "depth": {"type": "integer", "minimum": 1},
+                "paths": {"type": "array", "items": {"type": "string", "minLength": 1}},
+            },
+            "required": ["operation"],
+            "additionalProperties": False,
+        })
+
+    def test_valid_parameters_have_no_errors(self):
+        """
+        Test that a conforming value validates cleanly.
+        """
+        self.assertEqual(self.validate({"operation": "clone", "depth": 1, "paths": ["a"]}), [])
+
+    def test_missing_required_field(self):
+        """
+        Test that a missing required field is reported.
+        """
+        self.assertEqual(self.validate({}), ["parameters: missing required field 'operation'"])
+
+    def test_wrong_types_and_values_are_reported(self):
+        """
+        Test that type, enum, range and item errors carry the offending path.
+        """
+        errors = self.validate({"operation": "push", "depth": 0, "paths": ["", 3]})
+        self.assertIn("parameters.operation: must be one of ['clone', 'status'], got 'push'", errors)
+        self.assertIn("parameters.depth: must be >= 1", errors)
+        self.assertIn("parameters.paths[0]: must be at least 1 characters long", errors)
+        self.assertIn("parameters.paths[1]: expected string, got int", errors)
+
+    def test_booleans_are_not_integers(self):
+        """
+        Test that True is not accepted where an integer is required.
+        """
+        self.assertEqual(self.validate({"operation": "clone", "depth": True}),
+                         ["parameters.depth: expected integer, got bool"])
+
+    def test_unexpected_fields_are_rejected(self):
+        """
+        Test that a closed schema rejects unknown fields.
+        """
+        self.assertEqual(self.validate({"operation": "clone", "repo": "x"}),
+                         ["parameters: unexpected field 'repo'"])
+
+    def test_unsupported_type_fails_at_compile_time(self):
+        """
+        Test that schema mistakes surface when the schema is compiled, not when it is used.
+        """
+        with self.assertRaises(ConfigurationError):
+            compile_schema({"type": "str"})
+
+if __name__ == '__main__':
+    unittest.main()
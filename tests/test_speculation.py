@@ -0,0 +1,169 @@
+# tests/test_speculation.py
+
+import threading
+import time
+import unittest
+from jules_hf.tools.abstraction_layer import ToolAbstractionLayer
+from jules_hf.tools.cancellation import current_token
+
+class CountingReadOnlyTool:
+    """
+    A mock tool with one read-only and one mutating operation.
+    """
+    read_only_operations = ("read",)
+    runs = []
+    lock = threading.Lock()
+
+    def run(self, parameters):
+        with self.lock:
+            CountingReadOnlyTool.runs.append(dict(parameters))
+        return f"{parameters['operation']} {parameters.get('path', '')}"
+
+class TestSpeculativeExecution(unittest.TestCase):
+    """
+    Unit tests for speculative execution in the ToolAbstractionLayer.
+    """
+
+    def setUp(self):
+        """
+        Set up a layer with speculation enabled.
+        """
+        CountingReadOnlyTool.runs = []
+        self.tal = ToolAbstractionLayer()
+        self.tal.register_tool("store", CountingReadOnlyTool)
+        self.tal.enable_speculation(max_candidates=2)
+
+    def test_speculative_result_is_served_on_hit(self):
+        """
+        Test that a call chosen after speculation is served without running the tool again.
+        """
+        started = self.tal.start_speculation([("store", {"operation": "read", "path": "a"})])
+        self.assertEqual(started, 1)
+
+        result = self.tal.execute_tool("store", {"operation": "read", "path": "a"})
+        self.assertEqual(result, "read a")
+        self.assertEqual(len(CountingReadOnlyTool.runs), 1)
+
+        stats = self.tal.speculation_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_mutating_calls_are_never_speculated(self):
+        """
+        Test that calls not declared read-only are filtered out of the candidates.
+        """
+        started = self.tal.start_speculation([("store", {"operation": "write", "path": "a"})])
+        self.assertEqual(started, 0)
+        self.assertEqual(CountingReadOnlyTool.runs, [])
+
+    def test_unused_results_are_counted_as_wasted(self):
+        """
+        Test that speculation discarded at the end of a turn is accounted as wasted work.
+        """
+        self.tal.start_speculation([("store", {"operation": "read", "path": "a"})])
+        self.tal._speculator._pending[next(iter(self.tal._speculator._pending))][0].result()
+        self.tal.finish_speculation()
+
+        stats = self.tal.speculation_stats()
+        self.assertEqual(stats["wasted"], 1)
+        self.assertEqual(stats["hits"], 0)
+
+    def test_wasted_time_stops_when_the_run_finishes(self):
+        """
+        Test that a finished but unused run is charged its run time, not the time its result sat unused.
+        """
+        self.tal.start_speculation([("store", {"operation": "read", "path": "a"})])
+        future = next(iter(self.tal._speculator._pending.values()))[0]
+        future.result()
+        time.sleep(0.3)
+        self.tal.finish_speculation()
+        self.assertLess(self.tal.speculation_stats()["wasted_seconds"], 0.3)
+
+    def test_speculation_never_waits_for_a_busy_tool(self):
+        """
+        Test that a speculative run is skipped, not queued, when the tool's concurrency slots are taken.
+        """
+        self.tal.register_tool("capped", CountingReadOnlyTool, max_concurrency=1)
+        slot = self.tal._limits["capped"]
+        slot.acquire()
+        try:
+            self.tal.start_speculation([("capped", {"operation": "read", "path": "a"})])
+            next(iter(self.tal._speculator._pending.values()))[0].exception()
+        finally:
+            slot.release()
+        self.assertEqual(self.tal.execute_tool("capped", {"operation": "read", "path": "a"}), "read a")
+        self.assertEqual(self.tal.speculation_stats()["skipped"], 1)
+        self.assertEqual(len(CountingReadOnlyTool.runs), 1)
+
+    def test_close_stops_running_speculation(self):
+        """
+        Test that closing the layer cancels a speculative run that is still going.
+        """
+        started, stopped = threading.Event(), threading.Event()
+
+        class WaitingTool:
+            read_only_operations = ("read",)
+
+            def run(self, parameters):
+                started.set()
+                current_token().wait(5)
+                stopped.set()
+                current_token().check()
+
+        self.tal.register_tool("waiting", WaitingTool)
+        self.tal.start_speculation([("waiting", {"operation": "read"})])
+        self.assertTrue(started.wait(1))
+        self.tal.close()
+        self.assertTrue(stopped.wait(1))
+
+    def test_side_effects_invalidate_speculation(self):
+        """
+        Test that a mutating call discards pending speculative results so stale data is never served.
+        """
+        self.tal.start_speculation([("store", {"operation": "read", "path": "a"})])
+        self.tal.execute_tool("store", {"operation": "write", "path": "a"})
+        self.tal.execute_tool("store", {"operation": "read", "path": "a"})
+
+        self.assertEqual(self.tal.speculation_stats()["hits"], 0)
+        # The speculative read may or may not have started before it was discarded, but a fresh
+        # read must always run after the write.
+        operations = [run["operation"] for run in CountingReadOnlyTool.runs]
+        self.assertIn("read", operations[operations.index("write") + 1:])
+
+    def test_hung_speculative_run_is_abandoned_at_the_deadline(self):
+        """
+        Test that a speculative run still going at the call's deadline is dropped and the call runs normally.
+        """
+        release = threading.Event()
+        calls = []
+
+        class HangingOnceTool:
+            read_only_operations = ("read",)
+
+            def run(self, parameters):
+                calls.append(parameters)
+                if len(calls) == 1:
+                    release.wait(5)
+                return "fresh"
+
+        self.tal.register_tool("hanging", HangingOnceTool, timeout=0.2)
+        self.tal.start_speculation([("hanging", {"operation": "read"})])
+        try:
+            self.assertEqual(self.tal.execute_tool("hanging", {"operation": "read"}), "fresh")
+        finally:
+            release.set()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.tal.speculation_stats()["abandoned"], 1)
+
+    def test_predictions_follow_recent_read_only_calls(self):
+        """
+        Test that the most frequent recent read-only calls are predicted.
+        """
+        for path in ["a", "b", "b"]:
+            self.tal.execute_tool("store", {"operation": "read", "path": path})
+
+        self.assertEqual(self.tal._speculator.predict(1), [("store", {"operation": "read", "path": "b"})])
+        self.assertEqual(self.tal.start_speculation(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
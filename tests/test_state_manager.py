@@ -3,6 +3,8 @@
 import unittest
 import os
 import json
+import shutil
+import tempfile
 from jules_hf.core.state_manager import StateManager
 
 class TestStateManager(unittest.TestCase):
@@ -14,22 +16,23 @@ class TestStateManager(unittest.TestCase):
         """
         Set up the test case.
         """
-        self.state_file = "test_project_state.json"
+        self.test_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.test_dir, "test_project_state.json")
         self.sm = StateManager(state_file_path=self.state_file)
 
     def tearDown(self):
         """
         Tear down the test case.
         """
-        if os.path.exists(self.state_file):
-            os.remove(self.state_file)
+        self.sm.close()
+        shutil.rmtree(self.test_dir)
 
     def test_initial_state(self):
         """
         Test that the StateManager initializes with a default state if no state file exists.
         """
         self.assertEqual(self.sm.get_current_task(), None)
-        self.assertEqual(self.sm.state["history"], [])
+        self.assertEqual(list(self.sm.iter_history()), [])
 
     def test_update_and_save_state(self):
         """
@@ -42,6 +45,7 @@ class TestStateManager(unittest.TestCase):
         with open(self.state_file, "r") as f:
             saved_state = json.load(f)
         self.assertEqual(saved_state["current_task_id"], "TASK-1")
+        self.assertNotIn("history", saved_state)
 
     def test_load_state(self):
         """
@@ -55,6 +59,83 @@ class TestStateManager(unittest.TestCase):
         # Create a new StateManager to force it to load from the file
         sm2 = StateManager(state_file_path=self.state_file)
         self.assertEqual(sm2.get_current_task(), "TASK-2")
+        sm2.close()
+
+    def test_history_is_appended_and_survives_reopening(self):
+        """
+        Test that history entries are logged in order and read back lazily after a restart.
+        """
+        self.sm.update_state("TASK-1", "In Progress", "Started")
+        self.sm.update_state("TASK-1", "Completed", "Done")
+        self.sm.update_state("TASK-2", "In Progress", "Next")
+        self.sm.close()
+
+        self.sm = StateManager(state_file_path=self.state_file)
+        self.assertEqual(self.sm.get_current_task(), "TASK-2")
+        history = self.sm.iter_history()
+        self.assertEqual(next(history), {"task_id": "TASK-1", "status": "In Progress", "details": "Started"})
+        self.assertEqual([entry["status"] for entry in history], ["Completed", "In Progress"])
+
+    def test_segments_rotate_into_compressed_files(self):
+        """
+        Test that full segments are gzip-compressed and still read back in order.
+        """
+        self.sm.close()
+        self.sm = StateManager(state_file_path=self.state_file, segment_max_bytes=200)
+        for index in range(20):
+            self.sm.update_state(f"TASK-{index}", "Completed", "x" * 20)
+
+        names = sorted(os.listdir(self.sm.history_dir))
+        self.assertTrue(all(name.endswith(".jsonl.gz") for name in names[:-1]))
+        self.assertGreater(len(names), 2)
+        self.assertEqual([entry["task_id"] for entry in self.sm.iter_history()],
+                         [f"TASK-{index}" for index in range(20)])
+
+    def test_interrupted_rotation_is_finished_on_load(self):
+        """
+        Test that a segment left behind next to its compressed copy is removed rather than read twice.
+        """
+        self.sm.close()
+        self.sm = StateManager(state_file_path=self.state_file, segment_max_bytes=100)
+        self.sm.update_state("TASK-1", "Completed", "x" * 100)
+        self.sm.close()
+        with open(os.path.join(self.sm.history_dir, "000000.jsonl"), "w") as f:
+            f.write('{"task_id": "TASK-1"}\n')
+
+        self.sm = StateManager(state_file_path=self.state_file)
+        self.assertEqual(len(list(self.sm.iter_history())), 1)
+        self.assertEqual(self.sm.get_current_task(), "TASK-1")
+
+    def test_legacy_history_is_moved_into_the_log(self):
+        """
+        Test that a state file with an embedded history is migrated to the append-only log.
+        """
+        self.sm.close()
+        legacy = {"current_task_id": "TASK-3", "history": [
+            {"task_id": "TASK-3", "status": "In Progress", "details": "Old"}
+        ]}
+        with open(self.state_file, "w") as f:
+            json.dump(legacy, f)
+
+        self.sm = StateManager(state_file_path=self.state_file)
+        self.assertEqual(list(self.sm.iter_history()), legacy["history"])
+        with open(self.state_file, "r") as f:
+            self.assertEqual(json.load(f), {"current_task_id": "TASK-3"})
+
+    def test_write_behind_updates_are_written_on_save(self):
+        """
+        Test that write-behind updates are visible at once and durable after save_state.
+        """
+        self.sm.close()
+        self.sm = StateManager(state_file_path=self.state_file, write_behind=True, flush_interval=60)
+        self.sm.update_state("TASK-1", "In Progress", "Started")
+        self.sm.update_state("TASK-1", "Completed", "Done")
+        self.assertEqual(self.sm.get_current_task(), "TASK-1")
+
+        self.sm.save_state()
+        with open(self.state_file, "r") as f:
+            self.assertEqual(json.load(f)["current_task_id"], "TASK-1")
+        self.assertEqual([entry["status"] for entry in self.sm.iter_history()], ["In Progress", "Completed"])
 
 if __name__ == '__main__':
     unittest.main()
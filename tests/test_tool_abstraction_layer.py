@@ -1,13 +1,91 @@
 # tests/test_tool_abstraction_layer.py
 
+import os
+import threading
+import time
 import unittest
 from jules_hf.tools.abstraction_layer import ToolAbstractionLayer
-from jules_hf.core.exceptions import ToolExecutionError
+from jules_hf.core.exceptions import ConfigurationError, ToolExecutionError
 
 class MockTool:
     def run(self, parameters):
         return f"MockTool executed with: {parameters}"
 
+class MockToolWithSchema:
+    """
+    A mock tool that declares a parameter schema.
+    """
+    parameters_schema = {
+        "type": "object",
+        "properties": {"path": {"type": "string"}},
+        "required": ["path"],
+        "additionalProperties": False,
+    }
+
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, parameters):
+        self.calls += 1
+        return f"read {parameters['path']}"
+
+class SlowTool:
+    """
+    A mock tool that records how many of its calls overlap.
+    """
+    max_concurrency = 2
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def run(self, parameters):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if parameters.get("fail"):
+            raise ValueError("boom")
+        return parameters["n"]
+
+class PidTool:
+    """
+    A mock CPU-bound tool that reports the process it ran in.
+    """
+    cpu_bound = True
+
+    def run(self, parameters):
+        return os.getpid()
+
+class LabelledPidTool(PidTool):
+    """
+    A mock CPU-bound tool that reports the label it was built with.
+    """
+    def __init__(self, label="class"):
+        self.label = label
+
+    def run(self, parameters):
+        return self.label, os.getpid()
+
+def make_labelled_pid_tool():
+    return LabelledPidTool("factory")
+
+class CountingTool:
+    """
+    A mock tool that counts how often it is instantiated.
+    """
+    instances = 0
+
+    def __init__(self):
+        time.sleep(0.01)
+        CountingTool.instances += 1
+
+    def run(self, parameters):
+        return id(self)
+
 class TestToolAbstractionLayer(unittest.TestCase):
     """
     Unit tests for the ToolAbstractionLayer class.
@@ -42,6 +120,124 @@ class TestToolAbstractionLayer(unittest.TestCase):
         with self.assertRaises(ToolExecutionError):
             self.tal.execute_tool("non_existent_tool", {})
 
+    def test_invalid_parameters_are_rejected_before_dispatch(self):
+        """
+        Test that a call violating the tool's schema never reaches the tool.
+        """
+        self.tal.register_tool("schema_tool", MockToolWithSchema)
+        self.assertEqual(self.tal.validate_parameters("schema_tool", {"path": "a"}), [])
+        self.assertEqual(self.tal.validate_parameters("schema_tool", {"path": 1}),
+                         ["parameters.path: expected string, got int"])
+
+        with self.assertRaises(ToolExecutionError):
+            self.tal.execute_tool("schema_tool", {"file": "a"})
+        self.assertEqual(self.tal._tool("schema_tool").calls, 0)
+
+    def test_tool_catalog_publishes_schemas(self):
+        """
+        Test that the tool catalog includes descriptions and declared schemas.
+        """
+        self.tal.register_tool("schema_tool", MockToolWithSchema)
+        catalog = {entry["name"]: entry for entry in self.tal.get_tool_catalog()}
+
+        self.assertEqual(catalog["schema_tool"]["description"], "A mock tool that declares a parameter schema.")
+        self.assertEqual(catalog["schema_tool"]["parameters"], MockToolWithSchema.parameters_schema)
+        self.assertNotIn("parameters", catalog["mock_tool"])
+
+    def test_execute_tools_returns_results_in_order_and_isolates_errors(self):
+        """
+        Test that a batch runs concurrently within the tool's cap and failures stay with their call.
+        """
+        self.tal.register_tool("slow_tool", SlowTool)
+        calls = [("slow_tool", {"n": index, "fail": index == 2}) for index in range(6)] + [("missing", {})]
+        results = self.tal.execute_tools(calls)
+        self.tal.close()
+
+        self.assertEqual(results[:2] + results[3:6], [0, 1, 3, 4, 5])
+        self.assertIsInstance(results[2], ToolExecutionError)
+        self.assertIsInstance(results[6], ToolExecutionError)
+        self.assertEqual(self.tal._tool("slow_tool").peak, 2)
+        with self.assertRaises(ToolExecutionError):
+            self.tal.execute_tools(calls[:3], return_exceptions=False)
+
+    def test_cpu_bound_tools_run_in_worker_processes(self):
+        """
+        Test that tools declared CPU-bound are executed outside the calling process.
+        """
+        self.tal.register_tool("pid_tool", PidTool)
+        try:
+            pids = self.tal.execute_tools([("pid_tool", {}), ("pid_tool", {})])
+        finally:
+            self.tal.close()
+        self.assertTrue(all(isinstance(pid, int) and pid != os.getpid() for pid in pids))
+
+    def test_cpu_bound_tools_are_built_by_their_factory(self):
+        """
+        Test that worker processes build CPU-bound tools with the registered factory, which must be picklable.
+        """
+        self.tal.register_tool("labelled_tool", LabelledPidTool, factory=make_labelled_pid_tool)
+        try:
+            label, pid = self.tal.execute_tool("labelled_tool", {})
+        finally:
+            self.tal.close()
+        self.assertEqual(label, "factory")
+        self.assertNotEqual(pid, os.getpid())
+        with self.assertRaises(ConfigurationError):
+            self.tal.register_tool("lambda_tool", LabelledPidTool, factory=lambda: LabelledPidTool("lambda"))
+
+    def test_tools_are_instantiated_once_on_first_call(self):
+        """
+        Test that registering a tool does not create it and concurrent first calls share one instance.
+        """
+        CountingTool.instances = 0
+        self.tal.register_tool("counting_tool", CountingTool)
+        self.assertEqual(CountingTool.instances, 0)
+        self.assertIn("counting_tool", self.tal.get_tools())
+
+        try:
+            results = self.tal.execute_tools([("counting_tool", {})] * 8)
+        finally:
+            self.tal.close()
+        self.assertEqual(CountingTool.instances, 1)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_failing_factory_raises_and_is_retried(self):
+        """
+        Test that a tool that cannot be created raises a ToolExecutionError on each call instead of being cached.
+        """
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            raise RuntimeError("no credentials")
+
+        self.tal.register_tool("broken_tool", MockTool, factory=factory)
+        for _ in range(2):
+            with self.assertRaises(ToolExecutionError):
+                self.tal.execute_tool("broken_tool", {})
+        self.assertEqual(len(attempts), 2)
+
+    def test_calls_are_counted_and_timed_per_operation(self):
+        """
+        Test that executed calls are counted by outcome and timed, and invalid calls are counted apart.
+        """
+        self.tal.register_tool("schema_tool", MockToolWithSchema)
+        self.tal.execute_tool("mock_tool", {"operation": "read"})
+        with self.assertRaises(ToolExecutionError):
+            self.tal.execute_tool("schema_tool", {"file": "a"})
+        self.tal.register_tool("broken_tool", MockTool, factory=MockToolWithoutRun)
+        with self.assertRaises(ToolExecutionError):
+            self.tal.execute_tool("broken_tool", {})
+
+        metrics = self.tal.metrics.to_json()
+        counts = {tuple(sample["labels"].values()): sample["value"]
+                  for sample in metrics["jules_tool_calls_total"]["samples"] if sample["value"]}
+        self.assertEqual(counts, {("mock_tool", "read", "success"): 1, ("schema_tool", "", "invalid"): 1,
+                                  ("broken_tool", "", "error"): 1})
+        latency = {sample["labels"]["tool"]: sample["count"] for sample in metrics["jules_tool_call_duration_seconds"]["samples"]}
+        self.assertEqual(latency, {"mock_tool": 1, "broken_tool": 1})
+        self.assertTrue(all(sample["value"] == 0 for sample in metrics["jules_tool_calls_in_flight"]["samples"]))
+
 class MockToolWithoutRun:
     pass
 